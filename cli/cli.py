@@ -10,7 +10,8 @@ from builtins import bytes, input
 from snips_nlu_metrics import (
     compute_cross_val_metrics, compute_train_test_metrics)
 
-from snips_nlu import SnipsNLUEngine, NLUEngineConfig, load_resources
+from snips_nlu import (
+    SnipsNLUEngine, NLUEngineConfig, load_engine, load_resources)
 
 
 def parse_train_args(args):
@@ -20,6 +21,9 @@ def parse_train_args(args):
     parser.add_argument("output_path", type=str)
     parser.add_argument("-c", "--config-path", type=str, metavar="",
                         help="Path to the NLU engine configuration")
+    parser.add_argument("-b", "--binary", action="store_true",
+                        help="Persist the engine in the binary format "
+                             "instead of json")
     return parser.parse_args(args)
 
 
@@ -42,9 +46,13 @@ def main_train_engine():
     print("Create and train the engine...")
 
     output_path = args.pop("output_path")
-    serialized_engine = bytes(json.dumps(engine.to_dict()), encoding="utf8")
-    with io.open(output_path, "w", encoding="utf8") as f:
-        f.write(serialized_engine.decode("utf8"))
+    if args.get("binary", False):
+        engine.to_binary(output_path)
+    else:
+        serialized_engine = bytes(json.dumps(engine.to_dict()),
+                                  encoding="utf8")
+        with io.open(output_path, "w", encoding="utf8") as f:
+            f.write(serialized_engine.decode("utf8"))
     print("Saved the trained engine to %s" % output_path)
 
 
@@ -52,20 +60,16 @@ def parse_inference_args(args):
     parser = argparse.ArgumentParser("Load a trained NLU engine and play with "
                                      "its parsing API")
     parser.add_argument("training_path", type=str,
-                        help="Path to a json-serialized trained engine")
+                        help="Path to a json or binary serialized trained "
+                             "engine")
     return parser.parse_args(args)
 
 
 def main_engine_inference():
     args = vars(parse_inference_args(sys.argv[1:]))
 
-    training_path = args.pop("training_path")
-    with io.open(os.path.abspath(training_path), "r", encoding="utf8") as f:
-        engine_dict = json.load(f)
-    engine = SnipsNLUEngine.from_dict(engine_dict)
-    language = engine._dataset_metadata[  # pylint: disable=protected-access
-        "language_code"]
-    load_resources(language)
+    training_path = os.path.abspath(args.pop("training_path"))
+    engine = load_engine(training_path)
 
     while True:
         query = input("Enter a query (type 'q' to quit): ").strip()
@@ -55,6 +55,20 @@ class TestCLI(SnipsTest):
                     trained_engine_dict = json.load(f)
                 SnipsNLUEngine.from_dict(trained_engine_dict)
 
+    def test_main_train_engine_with_binary_output(self):
+        # Given
+        args = [BEVERAGE_DATASET_PATH, self.tmp_file_path, "--binary"]
+        with patch.object(sys, "argv", mk_sys_argv(args)):
+            # When
+            main_train_engine()
+
+            # Then
+            if not os.path.exists(self.tmp_file_path):
+                self.fail("No trained engine generated")
+            msg = "Failed to create an engine from binary file."
+            with self.fail_if_exception(msg):
+                SnipsNLUEngine.from_binary(self.tmp_file_path)
+
     def test_main_cross_val_metrics(self):
         # Given
         args = [BEVERAGE_DATASET_PATH, self.tmp_file_path]
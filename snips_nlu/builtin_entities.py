@@ -7,7 +7,8 @@ from snips_nlu_ontology import (
     get_all_builtin_entities, BuiltinEntityParser as _BuiltinEntityParser,
     get_supported_entities)
 
-from snips_nlu.utils import LimitedSizeDict
+from snips_nlu.constants import END, ENTITY_KIND, RES_MATCH_RANGE, START
+from snips_nlu.utils import get_cache
 
 
 class BuiltinEntityParser(object):
@@ -15,20 +16,99 @@ class BuiltinEntityParser(object):
         self.language = language
         self.parser = _BuiltinEntityParser(language)
         self.supported_entities = get_supported_entities(language)
-        self._cache = LimitedSizeDict(size_limit=1000)
+        self._cache = get_cache("builtin_entities_%s" % language)
+        self._indexes_cache = get_cache(
+            "builtin_entities_indexes_%s" % language)
 
     def parse(self, text, scope=None):
         text = text.lower()  # Rustling only works with lowercase
         cache_key = (text, str(scope))
-        if cache_key not in self._cache:
-            parser_result = self.parser.parse(text, scope)
-            self._cache[cache_key] = parser_result
-        return self._cache[cache_key]
+        return self._cache.get_or_compute(
+            cache_key, lambda: self.parser.parse(text, scope))
+
+    def get_index(self, text):
+        """Returns the :class:`BuiltinEntitiesIndex` of the *text*"""
+        return self._indexes_cache.get_or_compute(
+            text, lambda: BuiltinEntitiesIndex(self, text))
 
     def supports_entity(self, entity):
         return entity in self.supported_entities
 
 
+class BuiltinEntitiesIndex(object):
+    """Builtin entities of a text indexed by entity kind and match range
+
+    Each extraction, identified by its scope, is run at most once per text
+    and shared by all the consumers of the index. Scoped extractions are kept
+    distinct from the unscoped one as the parser resolves overlapping
+    matches across the entity kinds of the scope.
+    """
+
+    def __init__(self, parser, text):
+        self.parser = parser
+        self.text = text
+        self._entities = dict()
+        self._entities_by_range = dict()
+        self._tokens_entities = dict()
+
+    def get_entities(self, scope=None):
+        """Returns the builtin entities of the *scope* found in the text"""
+        scope_key = None if scope is None else tuple(sorted(scope))
+        if scope_key not in self._entities:
+            self._entities[scope_key] = self.parser.parse(self.text, scope)
+        return self._entities[scope_key]
+
+    def get_entity(self, entity_kind, match_range, scope=None):
+        """Returns the builtin entity of kind *entity_kind* which exactly
+        matches *match_range*, or *None*"""
+        scope_key = None if scope is None else tuple(sorted(scope))
+        entities_by_range = self._entities_by_range.get(scope_key)
+        if entities_by_range is None:
+            entities_by_range = dict()
+            for entity in reversed(self.get_entities(scope)):
+                rng = entity[RES_MATCH_RANGE]
+                key = (entity[ENTITY_KIND], rng[START], rng[END])
+                entities_by_range[key] = entity
+            self._entities_by_range[scope_key] = entities_by_range
+        return entities_by_range.get(
+            (entity_kind, match_range[START], match_range[END]))
+
+    def get_tokens_entities(self, entity_kind, tokens):
+        """Maps each token to the indexes of the tokens which belong to the
+        same entity of kind *entity_kind*
+
+        The entities are extracted with the *entity_kind* scope, and the
+        *tokens* must be positioned in the text of the index.
+
+        Returns:
+            list: For each token, the tuple of indexes of the tokens which
+            are fully contained in the first entity containing the token, or
+            *None* when the token does not belong to any entity
+        """
+        key = (entity_kind, tuple((t.start, t.end) for t in tokens))
+        if key not in self._tokens_entities:
+            entities = self.get_entities([entity_kind])
+            tokens_entities = []
+            for token in tokens:
+                token_entity = None
+                for entity in entities:
+                    if _contains(entity, token.start, token.end):
+                        token_entity = tuple(
+                            i for i, t in enumerate(tokens)
+                            if _contains(entity, t.start, t.end))
+                        break
+                tokens_entities.append(token_entity)
+            self._tokens_entities[key] = tokens_entities
+        return self._tokens_entities[key]
+
+
+def _contains(entity, start, end):
+    entity_start = entity[RES_MATCH_RANGE][START]
+    entity_end = entity[RES_MATCH_RANGE][END]
+    return entity_start <= start < entity_end \
+           and entity_start < end <= entity_end
+
+
 _RUSTLING_PARSERS = dict()
 
 
@@ -44,5 +124,11 @@ def get_builtin_entities(text, language, scope=None):
     return parser.parse(text, scope=scope)
 
 
+def get_builtin_entities_index(text, language):
+    """Returns the :class:`BuiltinEntitiesIndex` of the *text*, which is
+    shared by all the callers"""
+    return get_builtin_entity_parser(language).get_index(text)
+
+
 def is_builtin_entity(entity_label):
     return entity_label in get_all_builtin_entities()
@@ -0,0 +1,190 @@
+from __future__ import unicode_literals
+
+import zlib
+from builtins import object, range
+
+import numpy as np
+
+from snips_nlu.serialization import dump_binary, load_binary
+
+try:
+    from collections.abc import Mapping, Set
+except ImportError:  # Python 2
+    from collections import Mapping, Set
+
+_EMPTY_SLOT = np.iinfo(np.uint32).max
+
+
+class _StringsTable(object):
+    """Sorted sequence of utf8 encoded strings, in which strings are looked up
+    through an open addressing hash table
+
+    The strings are concatenated in a single bytes array, delimited by an
+    array of offsets, instead of being stored as one Python object per string.
+    This makes them compact and allows to memory-map them from a file. The
+    hash table maps the crc32 of each string to its rank.
+    """
+
+    def __init__(self, data, offsets, hash_table):
+        self._data = data
+        self._offsets = offsets
+        self._hash_table = hash_table
+        self._data_view = memoryview(data)
+        self._hash_mask = hash_table.size - 1
+
+    @classmethod
+    def _from_strings(cls, strings):
+        keys = sorted(s.encode("utf8") for s in strings)
+        data, offsets = _concatenate(keys)
+        hash_table = np.full(_hash_table_size(len(keys)), _EMPTY_SLOT,
+                             dtype=np.uint32)
+        mask = hash_table.size - 1
+        for i, key in enumerate(keys):
+            slot = zlib.crc32(key) & mask
+            while hash_table[slot] != _EMPTY_SLOT:
+                slot = (slot + 1) & mask
+            hash_table[slot] = i
+        return data, offsets, hash_table
+
+    def _index(self, string):
+        try:
+            key = string.encode("utf8")
+        except AttributeError:
+            return -1
+        offsets = self._offsets
+        slot = zlib.crc32(key) & self._hash_mask
+        while True:
+            i = self._hash_table[slot]
+            if i == _EMPTY_SLOT:
+                return -1
+            if self._data_view[offsets[i]:offsets[i + 1]] == key:
+                return int(i)
+            slot = (slot + 1) & self._hash_mask
+
+    def _to_dict(self):
+        return {
+            "data": self._data,
+            "offsets": self._offsets,
+            "hash_table": self._hash_table
+        }
+
+    def __len__(self):
+        return self._offsets.size - 1
+
+    def __iter__(self):
+        return iter(_split(self._data, self._offsets))
+
+
+class CompactStringSet(_StringsTable, Set):
+    """Read-only set of strings stored in a compact way
+
+    It is used to store the gazetteers, see :func:`.get_gazetteer`.
+    """
+
+    @classmethod
+    def from_strings(cls, strings):
+        """Creates a :class:`CompactStringSet` from an iterable of strings"""
+        return cls(*cls._from_strings(set(strings)))
+
+    def __contains__(self, string):
+        return self._index(string) != -1
+
+    def to_file(self, path):
+        """Persists the set in a binary file which can be memory-mapped"""
+        dump_binary(self._to_dict(), path)
+
+    @classmethod
+    def from_file(cls, path, mmap=True):
+        """Loads a set persisted with :meth:`to_file`, memory-mapping it by
+        default"""
+        obj_dict = load_binary(path, mmap)
+        return cls(obj_dict["data"], obj_dict["offsets"],
+                   obj_dict["hash_table"])
+
+
+class CompactStringMapping(_StringsTable, Mapping):
+    """Read-only mapping from strings to strings stored in a compact way
+
+    The distinct values are stored once, and each key points to the index of
+    its value. It is used to store the word clusters, see
+    :func:`.get_word_clusters`.
+    """
+
+    def __init__(self, data, offsets, hash_table, values_indexes,
+                 values_data, values_offsets):
+        super(CompactStringMapping, self).__init__(data, offsets, hash_table)
+        self._values_indexes = values_indexes
+        self._values_data = values_data
+        self._values_offsets = values_offsets
+        self._decoded_values = _split(values_data, values_offsets)
+
+    @classmethod
+    def from_dict(cls, dictionary):
+        """Creates a :class:`CompactStringMapping` from a dict of strings"""
+        data, offsets, hash_table = cls._from_strings(dictionary)
+        values = sorted(set(dictionary.values()))
+        values_ranks = {v: i for i, v in enumerate(values)}
+        values_indexes = np.array(
+            [values_ranks[dictionary[k]] for k in _split(data, offsets)],
+            dtype=np.uint32)
+        values_data, values_offsets = _concatenate(
+            [v.encode("utf8") for v in values])
+        return cls(data, offsets, hash_table, values_indexes, values_data,
+                   values_offsets)
+
+    def __getitem__(self, string):
+        i = self._index(string)
+        if i == -1:
+            raise KeyError(string)
+        return self._decoded_values[self._values_indexes[i]]
+
+    def get(self, string, default=None):
+        i = self._index(string)
+        if i == -1:
+            return default
+        return self._decoded_values[self._values_indexes[i]]
+
+    def __contains__(self, string):
+        return self._index(string) != -1
+
+    def to_file(self, path):
+        """Persists the mapping in a binary file which can be
+        memory-mapped"""
+        obj_dict = self._to_dict()
+        obj_dict.update({
+            "values_indexes": self._values_indexes,
+            "values_data": self._values_data,
+            "values_offsets": self._values_offsets
+        })
+        dump_binary(obj_dict, path)
+
+    @classmethod
+    def from_file(cls, path, mmap=True):
+        """Loads a mapping persisted with :meth:`to_file`, memory-mapping it
+        by default"""
+        obj_dict = load_binary(path, mmap)
+        return cls(obj_dict["data"], obj_dict["offsets"],
+                   obj_dict["hash_table"], obj_dict["values_indexes"],
+                   obj_dict["values_data"], obj_dict["values_offsets"])
+
+
+def _concatenate(encoded_strings):
+    offsets = np.zeros(len(encoded_strings) + 1, dtype=np.uint32)
+    offsets[1:] = np.cumsum([len(s) for s in encoded_strings])
+    data = np.frombuffer(b"".join(encoded_strings), dtype=np.uint8)
+    return data, offsets
+
+
+def _split(data, offsets):
+    data = data.tobytes()
+    return [data[offsets[i]:offsets[i + 1]].decode("utf8")
+            for i in range(offsets.size - 1)]
+
+
+def _hash_table_size(num_strings):
+    # The table is kept at most half full, so that probing sequences are
+    # short
+    size = 1
+    while size < 2 * num_strings:
+        size *= 2
+    return size
@@ -1,6 +1,7 @@
 from __future__ import division
 from __future__ import unicode_literals
 
+import hashlib
 import json
 from builtins import str
 from copy import deepcopy
@@ -169,3 +170,22 @@ def add_entity_value_if_missing(value, entity, language):
     entity[UTTERANCES] = add_variation_if_needed(entity[UTTERANCES], value,
                                                  value, language)
     return entity
+
+
+def get_intents_hashes(dataset):
+    """Returns a hash of the content of each intent of a formatted dataset"""
+    return {intent_name: _get_content_hash(intent)
+            for intent_name, intent in iteritems(dataset[INTENTS])}
+
+
+def get_entities_hashes(dataset):
+    """Returns a hash of the content of each custom entity of a formatted
+    dataset"""
+    return {entity_name: _get_content_hash(entity)
+            for entity_name, entity in iteritems(dataset[ENTITIES])
+            if not is_builtin_entity(entity_name)}
+
+
+def _get_content_hash(obj):
+    serialized = json.dumps(obj, sort_keys=True)
+    return hashlib.sha1(serialized.encode("utf8")).hexdigest()
@@ -5,24 +5,21 @@ from collections import defaultdict
 
 
 
-from builtins import object, range
+from builtins import object, range, zip
 from future.utils import iteritems
 import numpy as np
-import scipy.sparse as sp
-from sklearn.feature_extraction.text import TfidfTransformer, TfidfVectorizer
-from sklearn.feature_selection import chi2
-from snips_nlu_utils import normalize
 
 from snips_nlu.builtin_entities import is_builtin_entity
 from snips_nlu.constants import ENTITIES, UTTERANCES
 from snips_nlu.constants import NGRAM
 from snips_nlu.languages import get_default_sep
 from snips_nlu.pipeline.configs import FeaturizerConfig
-from snips_nlu.preprocessing import stem
-from snips_nlu.resources import (get_stop_words, get_word_clusters,
-                                 UnknownResource)
+from snips_nlu.preprocessing import normalize_and_stem
+from snips_nlu.query import get_parsed_query
+from snips_nlu.resources import get_stop_words, get_word_clusters
 from snips_nlu.slot_filler.features_utils import get_all_ngrams
 from snips_nlu.tokenization import tokenize_light
+from snips_nlu.trie import TokenTrie
 
 CLUSTER_USED_PER_LANGUAGES = {}
 
@@ -35,25 +32,70 @@ class Featurizer(object):
                  pvalue_threshold=0.4):
         self.config = config
         self.language = language
-        if tfidf_vectorizer is None:
-            tfidf_vectorizer = _get_tfidf_vectorizer(
-                self.language, self.config.to_dict())
-        self.tfidf_vectorizer = tfidf_vectorizer
+        self._tfidf_vectorizer = tfidf_vectorizer
+        self._tfidf_vectorizer_dict = None
         self.best_features = best_features
         self.pvalue_threshold = pvalue_threshold
         self.entity_utterances_to_feature_names = \
             entity_utterances_to_feature_names
+        self._entity_utterances_trie = _build_entity_utterances_trie(
+            entity_utterances_to_feature_names)
 
         self.unknown_words_replacement_string = \
             unknown_words_replacement_string
+        self._terms_index = None
+
+    @property
+    def tfidf_vectorizer(self):
+        """:class:`TfidfVectorizer` used to fit the featurizer
+
+        As sklearn is not needed at inference, the vectorizer of a
+        deserialized featurizer is only built when it is accessed.
+        """
+        if self._tfidf_vectorizer is None:
+            if self._tfidf_vectorizer_dict is None:
+                self._tfidf_vectorizer = _get_tfidf_vectorizer(
+                    self.language, self.config.to_dict())
+            else:
+                self._tfidf_vectorizer = _deserialize_tfidf_vectorizer(
+                    self._tfidf_vectorizer_dict, self.language, self.config)
+                self._tfidf_vectorizer_dict = None
+        return self._tfidf_vectorizer
+
+    @tfidf_vectorizer.setter
+    def tfidf_vectorizer(self, value):
+        self._tfidf_vectorizer = value
+        self._tfidf_vectorizer_dict = None
+        self._terms_index = None
+
+    def _get_vocabulary_and_idf(self):
+        """Returns the vocabulary and the idf vector of the featurizer, or
+        *(None, None)* when it is not fitted"""
+        if self._tfidf_vectorizer_dict is not None:
+            vectorizer_dict = self._tfidf_vectorizer_dict
+            if vectorizer_dict["vocab"] is None:
+                return None, None
+            # Arrays loaded from a binary file are used without being copied
+            return vectorizer_dict["vocab"], np.asarray(
+                vectorizer_dict["idf_diag"])
+        if self._tfidf_vectorizer is None \
+                or not hasattr(self._tfidf_vectorizer, "vocabulary_"):
+            return None, None
+        # pylint: disable=W0212
+        idf = self._tfidf_vectorizer._tfidf._idf_diag.data
+        # pylint: enable=W0212
+        return self._tfidf_vectorizer.vocabulary_, idf
 
     def fit(self, dataset, queries, y):
+        from sklearn.feature_selection import chi2
+
+        self._terms_index = None
         utterances_to_features = _get_utterances_to_features_names(
             dataset, self.language)
         normalized_utterances_to_features = defaultdict(set)
         for k, v in iteritems(utterances_to_features):
             normalized_utterances_to_features[
-                _normalize_stem(k, self.language)].update(v)
+                normalize_and_stem(k, self.language)].update(v)
         if self.unknown_words_replacement_string is not None \
                 and self.unknown_words_replacement_string in \
                 normalized_utterances_to_features:
@@ -61,6 +103,8 @@ class Featurizer(object):
                 self.unknown_words_replacement_string)
         self.entity_utterances_to_feature_names = dict(
             normalized_utterances_to_features)
+        self._entity_utterances_trie = _build_entity_utterances_trie(
+            self.entity_utterances_to_feature_names)
 
         if all(not "".join(tokenize_light(q, self.language)) for q in queries):
             return None
@@ -90,16 +134,128 @@ class Featurizer(object):
                 if feature_names[feat]['pval'] > self.pvalue_threshold / 2.0:
                     self.best_features.remove(feat)
 
+        self._prune_vocabulary(list_index_words)
         return self
 
+    def _prune_vocabulary(self, index_to_words):
+        """Restricts the vocabulary and the idf vector of the vectorizer to
+        the selected features
+
+        After pruning, the selected features are the whole vocabulary. Models
+        persisted before pruning was introduced still hold the full
+        vocabulary along with the indexes of the selected features, and are
+        handled as well by :meth:`transform`.
+        """
+        # pylint: disable=W0212
+        idf = self.tfidf_vectorizer._tfidf._idf_diag.data
+        self.tfidf_vectorizer.vocabulary_ = {
+            index_to_words[feature_index]: i
+            for i, feature_index in enumerate(self.best_features)}
+        self.tfidf_vectorizer._tfidf._idf_diag = _get_idf_diag(
+            idf[self.best_features])
+        # pylint: enable=W0212
+        self.best_features = list(range(len(self.best_features)))
+
     def transform(self, queries):
-        preprocessed_queries = self.preprocess_queries(queries)
+        """Computes the tf-idf vectors of the *queries*, restricted to the
+        selected features
+
+        The vectors are built directly in the CSR format from the terms of
+        each query, which is equivalent to running the fitted
+        :class:`TfidfVectorizer` and slicing its output on
+        :attr:`best_features`, but much cheaper.
+        """
+        import scipy.sparse as sp
+
+        data = []
+        indices = []
+        indptr = [0]
+        for query in queries:
+            columns, values = self._vectorize_query(query)
+            indices.extend(columns)
+            data.extend(values)
+            indptr.append(len(indices))
         # pylint: disable=C0103
-        X_train_tfidf = self.tfidf_vectorizer.transform(preprocessed_queries)
-        X = X_train_tfidf[:, self.best_features]
+        X = sp.csr_matrix(
+            (np.array(data, dtype=np.float64),
+             np.array(indices, dtype=np.int32),
+             np.array(indptr, dtype=np.int32)),
+            shape=(len(queries), len(self.best_features)))
         # pylint: enable=C0103
         return X
 
+    @property
+    def terms_index(self):
+        """dict mapping each term of the vocabulary to the triplet made of its
+        index in the vocabulary, its idf and its column among the selected
+        features, or -1 when it is not selected"""
+        if self._terms_index is None:
+            self._terms_index = self._build_terms_index()
+        return self._terms_index
+
+    def _build_terms_index(self):
+        vocabulary, idf = self._get_vocabulary_and_idf()
+        columns = {feature_index: column for column, feature_index
+                   in enumerate(self.best_features)}
+        return {
+            term: (index, float(idf[index]), columns.get(index, -1))
+            for term, index in iteritems(vocabulary)
+        }
+
+    def _get_query_terms(self, query):
+        """Returns the terms which the vectorizer analyzer would extract from
+        the preprocessed query, see :func:`_preprocess_query`"""
+        normalized_stemmed_tokens, entities_features, clusters_features = \
+            _get_query_features(query, self.language,
+                                self._entity_utterances_trie)
+        sep = get_default_sep(self.language)
+        if sep == " ":
+            chunks = normalized_stemmed_tokens
+        else:
+            chunks = [sep.join(normalized_stemmed_tokens)]
+        terms = []
+        for chunk in chunks + entities_features + clusters_features:
+            if chunk in self.terms_index:
+                # Chunks found in the vocabulary are already analyzed terms
+                terms.append(chunk)
+            else:
+                terms += tokenize_light(chunk.lower(), self.language)
+        return terms
+
+    def get_terms_frequencies(self, query):
+        """Returns the term frequencies of the vocabulary terms found in the
+        *query*
+
+        Returns:
+            tuple: The list of entries of :attr:`terms_index` of the terms
+            found, in vocabulary order, and the array of their term
+            frequencies, which are sublinear if the config says so
+        """
+        counts = defaultdict(int)
+        for term in self._get_query_terms(query):
+            if term in self.terms_index:
+                counts[term] += 1
+        # Terms are processed in vocabulary order, as the vectorizer does
+        terms = sorted((self.terms_index[term], count)
+                       for term, count in iteritems(counts))
+        frequencies = np.array([count for _, count in terms],
+                               dtype=np.float64)
+        if self.config.sublinear_tf:
+            frequencies = np.log(frequencies) + 1
+        return [term for term, _ in terms], frequencies
+
+    def _vectorize_query(self, query):
+        terms, weights = self.get_terms_frequencies(query)
+        if not terms:
+            return [], []
+        weights *= np.array([idf for _, idf, _ in terms])
+        norm = np.sqrt(np.sum(weights ** 2))
+        if norm > 0.0:
+            weights /= norm
+        selected = sorted((column, weight) for (_, _, column), weight
+                          in zip(terms, weights) if column != -1)
+        return [c for c, _ in selected], [float(w) for _, w in selected]
+
     def fit_transform(self, dataset, queries, y):
         return self.fit(dataset, queries, y).transform(queries)
 
@@ -107,18 +263,16 @@ class Featurizer(object):
         preprocessed_queries = []
         for q in queries:
             processed_query = _preprocess_query(
-                q, self.language, self.entity_utterances_to_feature_names)
+                q, self.language, self._entity_utterances_trie)
             preprocessed_queries.append(processed_query)
         return preprocessed_queries
 
     def to_dict(self):
         """Returns a json-serializable dict"""
-        if hasattr(self.tfidf_vectorizer, "vocabulary_"):
-            # pylint: # pylint: disable=W0212
-            vocab = {k: int(v) for k, v in
-                     iteritems(self.tfidf_vectorizer.vocabulary_)}
-            idf_diag = self.tfidf_vectorizer._tfidf._idf_diag.data.tolist()
-            # pylint: enable=W0212
+        vocabulary, idf = self._get_vocabulary_and_idf()
+        if vocabulary is not None:
+            vocab = {k: int(v) for k, v in iteritems(vocabulary)}
+            idf_diag = idf.tolist()
             entity_utterances_to_entity_names = {
                 k: list(v)
                 for k, v in iteritems(self.entity_utterances_to_feature_names)
@@ -153,15 +307,12 @@ class Featurizer(object):
         """
         language = obj_dict['language_code']
         config = FeaturizerConfig.from_dict(obj_dict["config"])
-        tfidf_vectorizer = _deserialize_tfidf_vectorizer(
-            obj_dict["tfidf_vectorizer"], language, config)
         entity_utterances_to_entity_names = {
             k: set(v) for k, v in
             iteritems(obj_dict['entity_utterances_to_feature_names'])
         }
         self = cls(
             language=language,
-            tfidf_vectorizer=tfidf_vectorizer,
             pvalue_threshold=obj_dict['pvalue_threshold'],
             entity_utterances_to_feature_names=
             entity_utterances_to_entity_names,
@@ -170,10 +321,14 @@ class Featurizer(object):
             unknown_words_replacement_string=obj_dict[
                 "unknown_words_replacement_string"]
         )
+        # The vectorizer is deserialized when accessed for the first time
+        self._tfidf_vectorizer_dict = obj_dict["tfidf_vectorizer"]
         return self
 
 
 def _get_tfidf_vectorizer(language, extra_args=None):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
     if extra_args is None:
         extra_args = dict()
     return TfidfVectorizer(tokenizer=lambda x: tokenize_light(x, language),
@@ -190,15 +345,6 @@ def _entity_name_to_feature(entity_name, language):
         entity_name, language=language))
 
 
-def _normalize_stem(text, language):
-    normalized_stemmed = normalize(text)
-    try:
-        normalized_stemmed = stem(normalized_stemmed, language)
-    except UnknownResource:
-        pass
-    return normalized_stemmed
-
-
 def _get_word_cluster_features(query_tokens, language):
     cluster_name = CLUSTER_USED_PER_LANGUAGES.get(language, False)
     if not cluster_name:
@@ -213,24 +359,52 @@ def _get_word_cluster_features(query_tokens, language):
     return cluster_features
 
 
+def _build_entity_utterances_trie(entity_utterances_to_feature_names):
+    """Compiles the normalized and stemmed entity utterances into a
+    :class:`.TokenTrie` mapping their words to their entity features"""
+    trie = TokenTrie()
+    if entity_utterances_to_feature_names is None:
+        return trie
+    for utterance, features_names in iteritems(
+            entity_utterances_to_feature_names):
+        for feature_name in sorted(features_names):
+            trie.add(utterance.split(" "), feature_name)
+    return trie
+
+
 def _get_dataset_entities_features(normalized_stemmed_tokens,
-                                   entity_utterances_to_entity_names):
-    ngrams = get_all_ngrams(normalized_stemmed_tokens)
+                                   entity_utterances_trie):
+    # Normalized and stemmed tokens may contain several words, hence the
+    # matches must start and end on token boundaries
+    words = []
+    tokens_starts = []
+    tokens_ends = set()
+    for token in normalized_stemmed_tokens:
+        tokens_starts.append(len(words))
+        words += token.split(" ")
+        tokens_ends.add(len(words))
     entity_features = []
-    for ngram in ngrams:
-        entity_features += entity_utterances_to_entity_names.get(
-            ngram[NGRAM], [])
+    for start in tokens_starts:
+        for end, features in entity_utterances_trie.prefix_matches(
+                words, start):
+            if end in tokens_ends:
+                entity_features += features
     return entity_features
 
 
-def _preprocess_query(query, language, entity_utterances_to_features_names):
-    query_tokens = tokenize_light(query, language)
+def _get_query_features(query, language, entity_utterances_trie):
+    query_tokens = get_parsed_query(query, language).light_tokens
     word_clusters_features = _get_word_cluster_features(query_tokens, language)
-    normalized_stemmed_tokens = [_normalize_stem(t, language)
+    normalized_stemmed_tokens = [normalize_and_stem(t, language)
                                  for t in query_tokens]
     entities_features = _get_dataset_entities_features(
-        normalized_stemmed_tokens, entity_utterances_to_features_names)
+        normalized_stemmed_tokens, entity_utterances_trie)
+    return normalized_stemmed_tokens, entities_features, word_clusters_features
+
 
+def _preprocess_query(query, language, entity_utterances_trie):
+    normalized_stemmed_tokens, entities_features, word_clusters_features = \
+        _get_query_features(query, language, entity_utterances_trie)
     features = get_default_sep(language).join(normalized_stemmed_tokens)
     if entities_features:
         features += " " + " ".join(sorted(entities_features))
@@ -252,18 +426,26 @@ def _get_utterances_to_features_names(dataset, language):
 
 def _deserialize_tfidf_vectorizer(vectorizer_dict, language,
                                   featurizer_config):
+    from sklearn.feature_extraction.text import TfidfTransformer
+
     tfidf_vectorizer = _get_tfidf_vectorizer(language,
                                              featurizer_config.to_dict())
     tfidf_transformer = TfidfTransformer()
     vocab = vectorizer_dict["vocab"]
     if vocab is not None:  # If the vectorizer has been fitted
         tfidf_vectorizer.vocabulary_ = vocab
-        idf_diag_data = np.array(vectorizer_dict["idf_diag"])
-        idf_diag_shape = (len(idf_diag_data), len(idf_diag_data))
-        row = list(range(idf_diag_shape[0]))
-        col = list(range(idf_diag_shape[0]))
-        idf_diag = sp.csr_matrix((idf_diag_data, (row, col)),
-                                 shape=idf_diag_shape)
+        # Arrays loaded from a binary file are used without being copied
+        idf_diag = _get_idf_diag(np.asarray(vectorizer_dict["idf_diag"]))
         tfidf_transformer._idf_diag = idf_diag  # pylint: disable=W0212
     tfidf_vectorizer._tfidf = tfidf_transformer  # pylint: disable=W0212
     return tfidf_vectorizer
+
+
+def _get_idf_diag(idf):
+    import scipy.sparse as sp
+
+    size = len(idf)
+    indices = np.arange(size, dtype=np.int32)
+    indptr = np.arange(size + 1, dtype=np.int32)
+    return sp.csr_matrix((idf, indices, indptr), shape=(size, size),
+                         copy=False)
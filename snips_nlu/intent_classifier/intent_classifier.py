@@ -36,3 +36,14 @@ class IntentClassifier(with_metaclass(ABCMeta, ProcessingUnit)):
             :func:`.intent_classification_result` for the output format.
         """
         pass
+
+    def get_intent_batch(self, texts, intents_filter=None):
+        """Performs intent classification on a batch of *texts*
+
+        The default implementation calls :meth:`get_intent` on each text.
+
+        Returns:
+            list of dict or None: The classification results, in the same
+            order as *texts*
+        """
+        return [self.get_intent(text, intents_filter) for text in texts]
@@ -0,0 +1,117 @@
+from __future__ import division
+from __future__ import unicode_literals
+
+from builtins import object
+
+import numpy as np
+
+
+class LinearScorer(object):
+    """Inference-only logistic regression working directly on queries
+
+    The :class:`.LogRegIntentClassifier` is trained with a sklearn
+    *SGDClassifier*, but predicting with it requires to featurize queries
+    into sparse matrices and goes through the sklearn input validation.
+    Instead, the :class:`LinearScorer` folds the idf of each selected feature
+    into its per-intent coefficients, so that the scores of a query are
+    simply the sum of the folded coefficients of its terms weighted by their
+    term frequencies, divided by the norm of its tf-idf vector.
+
+    The probabilities are the same as the ones of the *predict_proba* method
+    of the *SGDClassifier* trained with a log loss.
+
+    Attributes:
+        coef_ (:class:`numpy.ndarray`): Coefficients of the classifier, of
+            shape *(n_classes, n_features)*, or *(1, n_features)* for binary
+            classification
+        intercept_ (:class:`numpy.ndarray`): Intercepts of the classifier
+        t_ (float): Number of weight updates performed during training, which
+            is only kept for serialization purposes
+    """
+
+    def __init__(self, featurizer, coef, intercept, t_=None):
+        self.featurizer = featurizer
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.t_ = t_
+        self._weights = None
+
+    @classmethod
+    def from_classifier(cls, featurizer, classifier):
+        """Creates a :class:`LinearScorer` from a fitted *SGDClassifier*"""
+        return cls(featurizer, classifier.coef_, classifier.intercept_,
+                   classifier.t_)
+
+    def _compile(self):
+        # Selected features are the columns of the coefficients matrix
+        idf = np.zeros(self.coef_.shape[1])
+        for _, term_idf, column in self.featurizer.terms_index.values():
+            if column != -1:
+                idf[column] = term_idf
+        self._weights = (self.coef_ * idf).T
+
+    def get_scores(self, query):
+        """Returns the decision function of the classifier on the *query*"""
+        return self.get_batch_scores([query])[0]
+
+    def get_batch_scores(self, queries):
+        """Returns the decision function of the classifier on each query
+
+        The queries are featurized into a single sparse matrix, in CSR format,
+        which is multiplied once by the folded coefficients.
+        """
+        if self._weights is None:
+            self._compile()
+        data, indices, indptr = self._featurize(queries)
+        return _csr_dot(data, indices, indptr, self._weights) \
+            + self.intercept_
+
+    def _featurize(self, queries):
+        # Each row is the tf-idf vector of a query, normalized over all its
+        # terms and restricted to the selected features
+        rows = []
+        columns = []
+        frequencies = []
+        idfs = []
+        for i, query in enumerate(queries):
+            terms, query_frequencies = self.featurizer.get_terms_frequencies(
+                query)
+            rows.extend(i for _ in terms)
+            columns.extend(column for _, _, column in terms)
+            idfs.extend(term_idf for _, term_idf, _ in terms)
+            frequencies.extend(query_frequencies)
+        rows = np.array(rows, dtype=np.int64)
+        columns = np.array(columns, dtype=np.int64)
+        frequencies = np.array(frequencies, dtype=np.float64)
+        norms = np.sqrt(np.bincount(
+            rows, weights=(frequencies * np.array(idfs)) ** 2,
+            minlength=len(queries)))
+        selected = (columns != -1) & (norms[rows] > 0.0)
+        rows = rows[selected]
+        data = frequencies[selected] / norms[rows]
+        indptr = np.zeros(len(queries) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(rows, minlength=len(queries)))
+        return data, columns[selected], indptr
+
+    def predict_proba(self, queries):
+        """Returns the probabilities of each class for each query
+
+        As in sklearn, the probabilities are computed with a logistic
+        function on the scores, followed by a one-vs-rest normalization in the
+        multiclass case.
+        """
+        scores = self.get_batch_scores(queries)
+        probas = 1. / (1. + np.exp(-scores))
+        if probas.shape[1] == 1:
+            return np.hstack([1. - probas, probas])
+        return probas / probas.sum(axis=1)[:, np.newaxis]
+
+
+def _csr_dot(data, indices, indptr, dense):
+    # Product of a CSR matrix with a dense matrix, done with numpy as scipy is
+    # only a training dependency
+    num_rows = indptr.size - 1
+    rows = np.repeat(np.arange(num_rows), np.diff(indptr))
+    product = np.zeros((num_rows, dense.shape[1]))
+    np.add.at(product, rows, data[:, np.newaxis] * dense[indices])
+    return product
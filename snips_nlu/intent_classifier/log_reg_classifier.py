@@ -3,12 +3,12 @@ from __future__ import unicode_literals
 from builtins import str, zip
 
 import numpy as np
-from sklearn.linear_model import SGDClassifier
 
 from snips_nlu.constants import LANGUAGE
 from snips_nlu.dataset import validate_and_format_dataset
 from snips_nlu.intent_classifier.featurizer import Featurizer
 from snips_nlu.intent_classifier.intent_classifier import IntentClassifier
+from snips_nlu.intent_classifier.linear_scorer import LinearScorer
 from snips_nlu.intent_classifier.log_reg_classifier_utils import \
     remove_builtin_slots, get_regularization_factor, build_training_data
 from snips_nlu.pipeline.configs import LogRegIntentClassifierConfig
@@ -38,6 +38,7 @@ class LogRegIntentClassifier(IntentClassifier):
             config = LogRegIntentClassifierConfig()
         super(LogRegIntentClassifier, self).__init__(config)
         self.classifier = None
+        """:class:`.LinearScorer` used at inference"""
         self.intent_list = None
         self.featurizer = None
 
@@ -54,6 +55,8 @@ class LogRegIntentClassifier(IntentClassifier):
         Returns:
             :class:`LogRegIntentClassifier`: The same instance, trained
         """
+        from sklearn.linear_model import SGDClassifier
+
         dataset = validate_and_format_dataset(dataset)
         language = dataset[LANGUAGE]
         random_state = check_random_state(self.config.random_seed)
@@ -76,9 +79,11 @@ class LogRegIntentClassifier(IntentClassifier):
 
         X = self.featurizer.transform(utterances)  # pylint: disable=C0103
         alpha = get_regularization_factor(filtered_dataset)
-        self.classifier = SGDClassifier(random_state=random_state,
-                                        alpha=alpha, **LOG_REG_ARGS)
-        self.classifier.fit(X, y)
+        classifier = SGDClassifier(random_state=random_state,
+                                   alpha=alpha, **LOG_REG_ARGS)
+        classifier.fit(X, y)
+        self.classifier = LinearScorer.from_classifier(
+            self.featurizer, classifier)
         return self
 
     def get_intent(self, text, intents_filter=None):
@@ -98,23 +103,56 @@ class LogRegIntentClassifier(IntentClassifier):
             NotTrained: When the intent classifier is not fitted
 
         """
+        return self.get_intent_batch([text], intents_filter)[0]
+
+    def get_intent_batch(self, texts, intents_filter=None):
+        """Performs intent classification on a batch of *texts*
+
+        The probabilities of the intents are computed by a
+        :class:`.LinearScorer`, which does not need to featurize the texts
+        into a sparse matrix.
+
+        Args:
+            texts (list of str): Inputs
+            intents_filter (str or list of str): When defined, it will find
+                the most likely intent among the list, otherwise it will use
+                the whole list of intents defined in the dataset
+
+        Returns:
+            list of dict or None: The classification results, in the same
+            order as *texts*
+
+        Raises:
+            NotTrained: When the intent classifier is not fitted
+        """
         if not self.fitted:
             raise NotTrained('LogRegIntentClassifier must be fitted')
 
         if isinstance(intents_filter, str):
             intents_filter = [intents_filter]
 
-        if not text or not self.intent_list \
+        results = [None for _ in texts]
+        if not self.intent_list \
                 or self.featurizer is None or self.classifier is None:
-            return None
+            return results
 
-        if len(self.intent_list) == 1:
-            if self.intent_list[0] is None:
-                return None
-            return intent_classification_result(self.intent_list[0], 1.0)
+        indexes = [i for i, text in enumerate(texts) if text]
+        if not indexes:
+            return results
 
-        X = self.featurizer.transform([text])  # pylint: disable=C0103
-        proba_vec = self.classifier.predict_proba(X)[0]
+        if len(self.intent_list) == 1:
+            if self.intent_list[0] is not None:
+                for i in indexes:
+                    results[i] = intent_classification_result(
+                        self.intent_list[0], 1.0)
+            return results
+
+        probas = self.classifier.predict_proba([texts[i] for i in indexes])
+        for i, proba_vec in zip(indexes, probas):
+            results[i] = self._get_best_intent(proba_vec, intents_filter)
+        return results
+
+    def _get_best_intent(self, proba_vec, intents_filter):
         intents_probas = sorted(zip(self.intent_list, proba_vec),
                                 key=lambda p: -p[1])
         for intent, proba in intents_probas:
@@ -156,18 +194,15 @@ class LogRegIntentClassifier(IntentClassifier):
         """
         config = LogRegIntentClassifierConfig.from_dict(unit_dict["config"])
         intent_classifier = cls(config=config)
-        sgd_classifier = None
-        coeffs = unit_dict['coeffs']
-        intercept = unit_dict['intercept']
-        t_ = unit_dict["t_"]
-        if coeffs is not None and intercept is not None:
-            sgd_classifier = SGDClassifier(**LOG_REG_ARGS)
-            sgd_classifier.coef_ = np.array(coeffs)
-            sgd_classifier.intercept_ = np.array(intercept)
-            sgd_classifier.t_ = t_
-        intent_classifier.classifier = sgd_classifier
         intent_classifier.intent_list = unit_dict['intent_list']
         featurizer = unit_dict['featurizer']
         if featurizer is not None:
             intent_classifier.featurizer = Featurizer.from_dict(featurizer)
+        coeffs = unit_dict['coeffs']
+        intercept = unit_dict['intercept']
+        if coeffs is not None and intercept is not None:
+            # Arrays loaded from a binary file are used without being copied
+            intent_classifier.classifier = LinearScorer(
+                intent_classifier.featurizer, np.asarray(coeffs),
+                np.asarray(intercept), unit_dict["t_"])
         return intent_classifier
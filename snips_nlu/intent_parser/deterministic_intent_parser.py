@@ -1,9 +1,8 @@
 from __future__ import unicode_literals
 
-import re
 from copy import deepcopy
 
-from builtins import str
+from builtins import object, str
 from future.utils import itervalues, iteritems
 
 from snips_nlu.builtin_entities import (is_builtin_entity,
@@ -13,13 +12,16 @@ from snips_nlu.constants import (
     RES_MATCH_RANGE, LANGUAGE, RES_VALUE, START, END, ENTITY_KIND)
 from snips_nlu.dataset import validate_and_format_dataset
 from snips_nlu.intent_parser.intent_parser import IntentParser
-from snips_nlu.languages import get_ignored_characters_pattern
+from snips_nlu.languages import get_ignored_characters
 from snips_nlu.pipeline.configs import DeterministicIntentParserConfig
+from snips_nlu.query import get_parsed_query
 from snips_nlu.result import (unresolved_slot, parsing_result,
                               intent_classification_result, empty_result)
 from snips_nlu.tokenization import tokenize, tokenize_light
-from snips_nlu.utils import regex_escape, ranges_overlap, NotTrained
+from snips_nlu.trie import TokenTrie
+from snips_nlu.utils import ranges_overlap, NotTrained
 
+GROUP = "group"
 GROUP_NAME_PREFIX = "group"
 GROUP_NAME_SEPARATOR = "_"
 
@@ -30,6 +32,12 @@ class DeterministicIntentParser(IntentParser):
     This intent parser is very strict by nature, and tends to have a very good
     precision but a low recall. For this reason, it is interesting to use it
     first before potentially falling back to another parser.
+
+    The patterns of all the intents are compiled into a single token-level
+    automaton, in which the slots are matched against a trie of the entity
+    values, so that the input is matched against all the patterns in one scan
+    of its tokens. Tokens made only of whitespaces and punctuation are
+    ignored, both in the patterns and in the input.
     """
 
     unit_name = "deterministic_intent_parser"
@@ -42,52 +50,78 @@ class DeterministicIntentParser(IntentParser):
             config = self.config_type()
         super(DeterministicIntentParser, self).__init__(config)
         self.language = None
-        self.regexes_per_intent = None
+        self.patterns = None
+        """Dictionary of patterns per intent, where a pattern is a list of
+        tokens and slot groups"""
+        self.entity_utterances = None
         self.group_names_to_slot_names = None
         self.slot_names_to_entities = None
-
-    @property
-    def patterns(self):
-        """Dictionary of patterns per intent"""
-        if self.regexes_per_intent is not None:
-            return {i: [r.pattern for r in regex_list] for i, regex_list in
-                    iteritems(self.regexes_per_intent)}
-        return None
-
-    @patterns.setter
-    def patterns(self, value):
-        if value is not None:
-            self.regexes_per_intent = dict()
-            for intent, pattern_list in iteritems(value):
-                regexes = [re.compile(r"%s" % p, re.IGNORECASE)
-                           for p in pattern_list]
-                self.regexes_per_intent[intent] = regexes
+        self._automaton = None
 
     @property
     def fitted(self):
         """Whether or not the intent parser has already been trained"""
-        return self.regexes_per_intent is not None
+        return self.patterns is not None
 
     def fit(self, dataset, force_retrain=True):
         """Fit the intent parser with a valid Snips dataset"""
         dataset = validate_and_format_dataset(dataset)
         self.language = dataset[LANGUAGE]
-        self.regexes_per_intent = dict()
+        self.patterns = dict()
         self.group_names_to_slot_names = dict()
-        joined_entity_utterances = _get_joined_entity_utterances(
-            dataset, self.language)
+        self._fit_patterns(dataset, list(dataset[INTENTS]))
+        return self
+
+    def refit(self, dataset, intents):
+        """Updates the fitted intent parser with a new version of its
+        training dataset
+
+        Only the patterns of the provided *intents* are generated again, the
+        patterns of the other intents of the dataset are kept.
+        """
+        dataset = validate_and_format_dataset(dataset)
+        if not self.fitted or self.language != dataset[LANGUAGE]:
+            return self.fit(dataset)
+        self._fit_patterns(dataset, intents)
+        return self
+
+    def _fit_patterns(self, dataset, intents):
         self.slot_names_to_entities = _get_slot_names_mapping(dataset)
+        # Patterns are ordered as the intents of the dataset, as the order is
+        # used to break ties between intents when parsing
+        patterns = dict()
         for intent_name, intent in iteritems(dataset[INTENTS]):
+            if intent_name not in intents and intent_name in self.patterns:
+                patterns[intent_name] = self.patterns[intent_name]
+                continue
             if not self._is_trainable(intent, dataset):
-                self.regexes_per_intent[intent_name] = []
+                patterns[intent_name] = []
                 continue
             utterances = [_preprocess_builtin_entities(u, self.language)
                           for u in intent[UTTERANCES]]
-            regexes, self.group_names_to_slot_names = _generate_regexes(
-                utterances, joined_entity_utterances,
-                self.group_names_to_slot_names, self.language)
-            self.regexes_per_intent[intent_name] = regexes
-        return self
+            patterns[intent_name], self.group_names_to_slot_names = \
+                _generate_patterns(utterances, self.group_names_to_slot_names,
+                                   self.language)
+        self.patterns = patterns
+        used_groups = set(
+            item[GROUP] for intent_patterns in itervalues(self.patterns)
+            for pattern in intent_patterns for item in pattern
+            if isinstance(item, dict))
+        self.group_names_to_slot_names = {
+            group_name: slot_name for group_name, slot_name
+            in iteritems(self.group_names_to_slot_names)
+            if group_name in used_groups}
+        used_entities = set(
+            self.slot_names_to_entities[slot_name]
+            for slot_name in itervalues(self.group_names_to_slot_names))
+        self.entity_utterances = _get_entity_utterances(
+            dataset, used_entities, self.language)
+        self._build_automaton()
+
+    def _build_automaton(self):
+        self._automaton = _PatternsAutomaton(
+            self.patterns, self.entity_utterances,
+            self.group_names_to_slot_names, self.slot_names_to_entities)
 
     def parse(self, text, intents=None):
         """Performs intent parsing on the provided *text*
@@ -112,44 +146,45 @@ class DeterministicIntentParser(IntentParser):
         if isinstance(intents, str):
             intents = [intents]
 
+        query = get_parsed_query(text, self.language)
         ranges_mapping, processed_text = _replace_builtin_entities(
-            text, self.language)
-
-        for intent, regexes in iteritems(self.regexes_per_intent):
-            if intents is not None and intent not in intents:
-                continue
-            for regex in regexes:
-                match = regex.match(processed_text)
-                if match is None:
-                    continue
-                parsed_intent = intent_classification_result(
-                    intent_name=intent, probability=1.0)
-                slots = []
-                for group_name in match.groupdict():
-                    slot_name = self.group_names_to_slot_names[group_name]
-                    entity = self.slot_names_to_entities[slot_name]
-                    rng = (match.start(group_name), match.end(group_name))
-                    value = match.group(group_name)
-                    if rng in ranges_mapping:
-                        rng = ranges_mapping[rng]
-                        value = text[rng[START]:rng[END]]
-                    else:
-                        rng = {START: rng[0], END: rng[1]}
-                    parsed_slot = unresolved_slot(
-                        match_range=rng, value=value, entity=entity,
-                        slot_name=slot_name)
-                    slots.append(parsed_slot)
-                parsed_slots = _deduplicate_overlapping_slots(
-                    slots, self.language)
-                parsed_slots = sorted(parsed_slots,
-                                      key=lambda s: s[RES_MATCH_RANGE][START])
-                return parsing_result(text, parsed_intent, parsed_slots)
-        return empty_result(text)
+            query.text, self.language, query.builtin_entities)
+        tokens = _tokenize(processed_text, self.language)
+        match = self._automaton.match(
+            [t.value.lower() for t in tokens], intents)
+        if match is None:
+            return empty_result(text)
+
+        intent, captures = match
+        parsed_intent = intent_classification_result(
+            intent_name=intent, probability=1.0)
+        slots = []
+        for slot_name, start, end in captures:
+            entity = self.slot_names_to_entities[slot_name]
+            rng = (tokens[start].start, tokens[end - 1].end)
+            value = processed_text[rng[0]:rng[1]]
+            original_range = _get_original_range(ranges_mapping, rng)
+            if original_range is not None:
+                rng = original_range
+                value = text[rng[START]:rng[END]]
+            else:
+                rng = {START: rng[0], END: rng[1]}
+            parsed_slot = unresolved_slot(
+                match_range=rng, value=value, entity=entity,
+                slot_name=slot_name)
+            slots.append(parsed_slot)
+        parsed_slots = _deduplicate_overlapping_slots(slots, self.language)
+        parsed_slots = sorted(parsed_slots,
+                              key=lambda s: s[RES_MATCH_RANGE][START])
+        return parsing_result(text, parsed_intent, parsed_slots)
 
     def _is_trainable(self, intent, dataset):
-        if len(intent[UTTERANCES]) >= self.config.max_queries:
+        if self.config.max_queries is not None \
+                and len(intent[UTTERANCES]) >= self.config.max_queries:
             return False
 
+        if self.config.max_entities is None:
+            return True
         intent_entities = set(chunk[ENTITY] for query in intent[UTTERANCES]
                               for chunk in query[DATA] if ENTITY in chunk)
         total_entities = sum(len(dataset[ENTITIES][ent][UTTERANCES])
@@ -166,6 +201,7 @@ class DeterministicIntentParser(IntentParser):
             "config": self.config.to_dict(),
             "language_code": self.language,
             "patterns": self.patterns,
+            "entity_utterances": self.entity_utterances,
             "group_names_to_slot_names": self.group_names_to_slot_names,
             "slot_names_to_entities": self.slot_names_to_entities
         }
@@ -180,13 +216,139 @@ class DeterministicIntentParser(IntentParser):
         config = cls.config_type.from_dict(unit_dict["config"])
         parser = cls(config=config)
         parser.patterns = unit_dict["patterns"]
+        parser.entity_utterances = unit_dict["entity_utterances"]
         parser.language = unit_dict["language_code"]
         parser.group_names_to_slot_names = unit_dict[
             "group_names_to_slot_names"]
         parser.slot_names_to_entities = unit_dict["slot_names_to_entities"]
+        if parser.fitted:
+            parser._build_automaton()  # pylint:disable=protected-access
         return parser
 
 
+class _PatternsNode(object):
+    __slots__ = ("tokens", "slots", "intents")
+
+    def __init__(self):
+        self.tokens = dict()
+        self.slots = dict()
+        self.intents = []
+
+
+class _PatternsAutomaton(object):
+    """Token-level automaton matching the patterns of all the intents
+
+    The patterns are stored in a trie whose edges are either tokens or slots.
+    Slot edges consume any sequence of tokens which is a value of the slot
+    entity, using a :class:`.TokenTrie` of the entity values.
+    """
+
+    def __init__(self, patterns, entity_utterances, group_names_to_slot_names,
+                 slot_names_to_entities):
+        self.root = _PatternsNode()
+        self.intents_ranks = dict()
+        for intent, intent_patterns in iteritems(patterns):
+            self.intents_ranks[intent] = len(self.intents_ranks)
+            for pattern in intent_patterns:
+                node = self.root
+                for item in pattern:
+                    if isinstance(item, dict):
+                        slot_name = group_names_to_slot_names[item[GROUP]]
+                        node = node.slots.setdefault(slot_name,
+                                                     _PatternsNode())
+                    else:
+                        node = node.tokens.setdefault(item, _PatternsNode())
+                if intent not in node.intents:
+                    node.intents.append(intent)
+        self.slots_tries = dict()
+        for slot_name, entity in iteritems(slot_names_to_entities):
+            if entity in entity_utterances:
+                trie = TokenTrie()
+                for utterance_tokens in entity_utterances[entity]:
+                    trie.add(utterance_tokens)
+                self.slots_tries[slot_name] = trie
+
+    def match(self, tokens, intents=None):
+        """Matches the *tokens* against all the patterns at once
+
+        Returns:
+            tuple or None: The best *(intent, captures)* match, where captures
+            is a tuple of *(slot_name, start, end)* token spans
+        """
+        # A state is a tuple (node, captures, slot) where slot is None, or
+        # (slot_name, entity_node, start) when a slot value is being consumed
+        states = [(self.root, (), None)]
+        for i, token in enumerate(tokens):
+            next_states = dict()
+            for node, captures, slot in states:
+                if slot is None:
+                    child = node.tokens.get(token)
+                    if child is not None:
+                        _add_state(next_states, child, captures, None)
+                    for slot_name, target in iteritems(node.slots):
+                        trie = self.slots_tries.get(slot_name)
+                        if trie is None:
+                            continue
+                        entity_node = TokenTrie.child(trie.root, token)
+                        if entity_node is not None:
+                            _add_slot_states(next_states, target, captures,
+                                             slot_name, entity_node, i)
+                else:
+                    slot_name, entity_node, start = slot
+                    entity_node = TokenTrie.child(entity_node, token)
+                    if entity_node is not None:
+                        _add_slot_states(next_states, node, captures,
+                                         slot_name, entity_node, start, i)
+            states = list(itervalues(next_states))
+            if not states:
+                return None
+
+        best_match = None
+        best_key = None
+        for node, captures, slot in states:
+            if slot is not None:
+                continue
+            for intent in node.intents:
+                if intents is not None and intent not in intents:
+                    continue
+                # Prefer the first intent, then the longest first slot values
+                key = (self.intents_ranks[intent],
+                       tuple(start - end for _, start, end in captures))
+                if best_key is None or key < best_key:
+                    best_key = key
+                    best_match = (intent, captures)
+        return best_match
+
+
+def _add_state(states, node, captures, slot):
+    if slot is None:
+        key = (id(node), captures, None)
+    else:
+        key = (id(node), captures, (slot[0], id(slot[1]), slot[2]))
+    if key not in states:
+        states[key] = (node, captures, slot)
+
+
+def _add_slot_states(states, target, captures, slot_name, entity_node, start,
+                     index=None):
+    if index is None:
+        index = start
+    is_complete_value = TokenTrie.node_values(entity_node) is not None
+    if len(entity_node) > int(is_complete_value):
+        # The entity value can be continued with the next tokens
+        _add_state(states, target, captures, (slot_name, entity_node, start))
+    if is_complete_value:
+        _add_state(states, target, captures + ((slot_name, start, index + 1),),
+                   None)
+
+
+def _get_original_range(ranges_mapping, rng):
+    for (start, end), original_range in iteritems(ranges_mapping):
+        if start <= rng[0] and rng[1] <= end:
+            return original_range
+    return None
+
+
 def _get_index(index):
     split = index.split(GROUP_NAME_SEPARATOR)
     if len(split) != 2 or split[0] != GROUP_NAME_PREFIX:
@@ -220,25 +382,15 @@ def _get_slot_names_mapping(dataset):
     return slot_names_to_entities
 
 
-def _query_to_pattern(query, joined_entity_utterances,
-                      group_names_to_slot_names, language):
+def _query_to_pattern(query, language):
     pattern = []
     for chunk in query[DATA]:
         if SLOT_NAME in chunk:
-            max_index = _generate_new_index(group_names_to_slot_names)
-            slot_name = chunk[SLOT_NAME]
-            entity = chunk[ENTITY]
-            group_names_to_slot_names[max_index] = slot_name
-            pattern.append(
-                r"(?P<%s>%s)" % (max_index, joined_entity_utterances[entity]))
+            pattern.append({SLOT_NAME: chunk[SLOT_NAME]})
         else:
-            tokens = tokenize_light(chunk[TEXT], language)
-            pattern += [regex_escape(t) for t in tokens]
-    ignored_char_pattern = get_ignored_characters_pattern(language)
-    pattern = r"^%s%s%s$" % (ignored_char_pattern,
-                             ignored_char_pattern.join(pattern),
-                             ignored_char_pattern)
-    return pattern, group_names_to_slot_names
+            tokens = _tokenize(chunk[TEXT], language)
+            pattern += [t.value.lower() for t in tokens]
+    return pattern
 
 
 def _get_queries_with_unique_context(intent_queries, language):
@@ -256,31 +408,48 @@ def _get_queries_with_unique_context(intent_queries, language):
     return queries
 
 
-def _generate_regexes(intent_queries, joined_entity_utterances,
-                      group_names_to_labels, language):
+def _generate_patterns(intent_queries, group_names_to_slot_names, language):
     queries = _get_queries_with_unique_context(intent_queries, language)
-    # Join all the entities utterances with a "|" to create the patterns
-    patterns = set()
+    patterns = []
+    patterns_keys = set()
     for query in queries:
-        pattern, group_names_to_labels = _query_to_pattern(
-            query, joined_entity_utterances, group_names_to_labels, language)
-        patterns.add(pattern)
-    regexes = [re.compile(p, re.IGNORECASE) for p in patterns]
-    return regexes, group_names_to_labels
-
-
-def _get_joined_entity_utterances(dataset, language):
-    joined_entity_utterances = dict()
-    for entity_name, entity in iteritems(dataset[ENTITIES]):
+        pattern = _query_to_pattern(query, language)
+        key = tuple(item[SLOT_NAME] if isinstance(item, dict) else (item,)
+                    for item in pattern)
+        if key in patterns_keys:
+            continue
+        patterns_keys.add(key)
+        for i, item in enumerate(pattern):
+            if isinstance(item, dict):
+                group_name = _generate_new_index(group_names_to_slot_names)
+                group_names_to_slot_names[group_name] = item[SLOT_NAME]
+                pattern[i] = {GROUP: group_name}
+        patterns.append(pattern)
+    return patterns, group_names_to_slot_names
+
+
+def _get_entity_utterances(dataset, entities, language):
+    entity_utterances = dict()
+    for entity_name in entities:
         if is_builtin_entity(entity_name):
             utterances = [_get_builtin_entity_name(entity_name, language)]
         else:
-            utterances = list(entity[UTTERANCES])
-        utterances_patterns = map(regex_escape, utterances)
-        utterances_patterns = (p for p in utterances_patterns if p)
-        joined_entity_utterances[entity_name] = r"|".join(
-            sorted(utterances_patterns, key=len, reverse=True))
-    return joined_entity_utterances
+            utterances = dataset[ENTITIES][entity_name][UTTERANCES]
+        tokenized_utterances = set(
+            tuple(t.value.lower() for t in _tokenize(u, language))
+            for u in utterances)
+        entity_utterances[entity_name] = [
+            list(tokens) for tokens in sorted(tokenized_utterances) if tokens]
+    return entity_utterances
+
+
+def _tokenize(string, language):
+    # Tokens made only of ignored characters, such as punctuation, are
+    # dropped, so that the patterns tolerate missing or extra punctuation.
+    # The remaining tokens keep their ranges in the string.
+    ignored_characters = get_ignored_characters(language)
+    return [t for t in tokenize(string, language)
+            if any(c not in ignored_characters for c in t.value)]
 
 
 def _deduplicate_overlapping_slots(slots, language):
@@ -317,8 +486,9 @@ def _preprocess_builtin_entities(utterance, language):
     return new_utterance
 
 
-def _replace_builtin_entities(text, language):
-    builtin_entities = get_builtin_entities(text, language)
+def _replace_builtin_entities(text, language, builtin_entities=None):
+    if builtin_entities is None:
+        builtin_entities = get_builtin_entities(text, language)
     if not builtin_entities:
         return dict(), text
 
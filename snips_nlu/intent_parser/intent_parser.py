@@ -23,6 +23,24 @@ class IntentParser(with_metaclass(ABCMeta, ProcessingUnit)):
         """
         pass
 
+    def refit(self, dataset, intents):
+        """Updates the fitted intent parser with a new version of its
+        training dataset
+
+        This is called by the :class:`.SnipsNLUEngine` when the dataset has
+        changed since the last training. The default implementation fits the
+        intent parser from scratch. Intent parsers which are able to retrain
+        only a part of their sub units should override it.
+
+        Args:
+            dataset (dict): Valid Snips NLU dataset
+            intents (list of str): Intents of the dataset which are impacted
+                by the changes, either because their utterances or one of
+                their entities changed, or because they are new. Intents which
+                are no longer in the dataset are not listed.
+        """
+        return self.fit(dataset, force_retrain=True)
+
     @abstractproperty
     def fitted(self):
         """Whether or not the intent parser has already been trained"""
@@ -33,7 +51,8 @@ class IntentParser(with_metaclass(ABCMeta, ProcessingUnit)):
         """Performs intent parsing on the provide *text*
 
         Args:
-            text (str): Input
+            text (str): Input, which may be a :class:`.ParsedQuery` when the
+                parser is called by a :class:`.SnipsNLUEngine`
             intents (str or list of str): If provided, reduces the scope of
             intent parsing to the provided list of intents
 
@@ -42,3 +61,19 @@ class IntentParser(with_metaclass(ABCMeta, ProcessingUnit)):
             :func:`.parsing_result` for the output format.
         """
         pass
+
+    def parse_batch(self, texts, intents=None):
+        """Performs intent parsing on a batch of *texts*
+
+        The default implementation calls :meth:`parse` on each text. Intent
+        parsers which can share work across inputs should override it.
+
+        Args:
+            texts (list of str): Inputs
+            intents (str or list of str): If provided, reduces the scope of
+            intent parsing to the provided list of intents
+
+        Returns:
+            list of dict: The parsing results, in the same order as *texts*
+        """
+        return [self.parse(text, intents) for text in texts]
@@ -1,16 +1,19 @@
 from __future__ import unicode_literals
 
-from builtins import str
+from builtins import str, zip
+from collections import defaultdict
 from copy import deepcopy
+from multiprocessing import Pool, cpu_count
 
 from future.utils import itervalues, iteritems
 
-from snips_nlu.constants import INTENTS, RES_INTENT_NAME
+from snips_nlu.constants import INTENTS, LANGUAGE, RES_INTENT_NAME
 from snips_nlu.dataset import validate_and_format_dataset
 from snips_nlu.intent_parser.intent_parser import IntentParser
 from snips_nlu.pipeline.configs import ProbabilisticIntentParserConfig
 from snips_nlu.pipeline.processing_unit import (
-    build_processing_unit, load_processing_unit)
+    build_processing_unit, get_processing_unit_config, load_processing_unit)
+from snips_nlu.resources import load_resources
 from snips_nlu.result import empty_result, parsing_result
 from snips_nlu.utils import NotTrained
 
@@ -65,6 +68,7 @@ class ProbabilisticIntentParser(IntentParser):
 
         if self.slot_fillers is None:
             self.slot_fillers = dict()
+        intents_to_fit = []
         for intent_name in intents:
             # We need to copy the slot filler config as it may be mutated
             if self.slot_fillers.get(intent_name) is None:
@@ -72,9 +76,75 @@ class ProbabilisticIntentParser(IntentParser):
                 self.slot_fillers[intent_name] = build_processing_unit(
                     slot_filler_config)
             if force_retrain or not self.slot_fillers[intent_name].fitted:
-                self.slot_fillers[intent_name].fit(dataset, intent_name)
+                intents_to_fit.append(intent_name)
+        self._fit_slot_fillers(dataset, intents_to_fit)
+        return self
+
+    def refit(self, dataset, intents):
+        """Updates the fitted intent parser with a new version of its
+        training dataset
+
+        The intent classifier is retrained, as it depends on all the intents
+        and entities, but only the slot fillers of the provided *intents* are
+        retrained. The slot fillers of the intents which are no longer in the
+        dataset are dropped.
+
+        Args:
+            dataset (dict): A valid Snips dataset
+            intents (list of str): Intents whose slot fillers must be
+                retrained
+
+        Returns:
+            :class:`ProbabilisticIntentParser`: The same instance, trained
+        """
+        dataset = validate_and_format_dataset(dataset)
+        if self.intent_classifier is None:
+            self.intent_classifier = build_processing_unit(
+                self.config.intent_classifier_config)
+        self.intent_classifier.fit(dataset)
+
+        self.slot_fillers = {
+            intent_name: slot_filler
+            for intent_name, slot_filler in iteritems(self.slot_fillers)
+            if intent_name in dataset[INTENTS]}
+        intents_to_fit = []
+        for intent_name in dataset[INTENTS]:
+            if self.slot_fillers.get(intent_name) is None:
+                slot_filler_config = deepcopy(self.config.slot_filler_config)
+                self.slot_fillers[intent_name] = build_processing_unit(
+                    slot_filler_config)
+            if intent_name in intents \
+                    or not self.slot_fillers[intent_name].fitted:
+                intents_to_fit.append(intent_name)
+        self._fit_slot_fillers(dataset, intents_to_fit)
         return self
 
+    def _fit_slot_fillers(self, dataset, intents):
+        n_jobs = self.config.n_jobs
+        if n_jobs is not None and n_jobs < 0:
+            n_jobs = max(cpu_count() + 1 + n_jobs, 1)
+        n_jobs = min(n_jobs or 1, len(intents))
+        if n_jobs <= 1:
+            for intent_name in intents:
+                self.slot_fillers[intent_name].fit(dataset, intent_name)
+            return
+
+        # Each slot filler is trained in a separate process from its config,
+        # and sent back in its serialized form. Each slot filler seeds its
+        # own random state, hence the results do not depend on n_jobs.
+        fit_args = [
+            (self.slot_fillers[intent_name].config.to_dict(), dataset,
+             intent_name) for intent_name in intents]
+        pool = Pool(n_jobs)
+        try:
+            slot_fillers_dicts = pool.map(_fit_slot_filler, fit_args)
+        finally:
+            pool.close()
+            pool.join()
+        for intent_name, slot_filler_dict in zip(intents, slot_fillers_dicts):
+            self.slot_fillers[intent_name] = load_processing_unit(
+                slot_filler_dict)
+
     # pylint:enable=arguments-differ
 
     def parse(self, text, intents=None):
@@ -107,6 +177,46 @@ class ProbabilisticIntentParser(IntentParser):
         slots = self.slot_fillers[intent_name].get_slots(text)
         return parsing_result(text, intent_result, slots)
 
+    def parse_batch(self, texts, intents=None):
+        """Performs intent parsing on a batch of *texts*
+
+        The intents of all the texts are classified at once, then the texts
+        are grouped by intent before being passed to the corresponding slot
+        fillers.
+
+        Args:
+            texts (list of str): Inputs
+            intents (str or list of str): If provided, reduces the scope of
+                intent parsing to the provided list of intents
+
+        Returns:
+            list of dict: The parsing results, in the same order as *texts*.
+            See :func:`.parsing_result` for the output format.
+
+        Raises:
+            NotTrained: When the intent parser is not fitted
+        """
+        if not self.fitted:
+            raise NotTrained("ProbabilisticIntentParser must be fitted")
+
+        if isinstance(intents, str):
+            intents = [intents]
+
+        intent_results = self.intent_classifier.get_intent_batch(
+            texts, intents)
+        texts_per_intent = defaultdict(list)
+        for i, intent_result in enumerate(intent_results):
+            if intent_result is not None:
+                texts_per_intent[intent_result[RES_INTENT_NAME]].append(i)
+
+        results = [empty_result(text) for text in texts]
+        for intent_name, indexes in iteritems(texts_per_intent):
+            slot_filler = self.slot_fillers[intent_name]
+            for i in indexes:
+                slots = slot_filler.get_slots(texts[i])
+                results[i] = parsing_result(texts[i], intent_results[i], slots)
+        return results
+
     def to_dict(self):
         """Returns a json-serializable dict"""
         intent_classifier_dict = None
@@ -144,3 +254,12 @@ class ProbabilisticIntentParser(IntentParser):
         parser.intent_classifier = classifier
         parser.slot_fillers = slot_fillers
         return parser
+
+
+def _fit_slot_filler(args):
+    slot_filler_config, dataset, intent = args
+    load_resources(dataset[LANGUAGE])
+    slot_filler = build_processing_unit(
+        get_processing_unit_config(slot_filler_config))
+    slot_filler.fit(dataset, intent)
+    return slot_filler.to_dict()
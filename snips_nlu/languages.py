@@ -3,8 +3,6 @@ from __future__ import unicode_literals
 import re
 import string
 
-from num2words import num2words
-
 from snips_nlu.utils import regex_escape
 
 SPACE = " "
@@ -41,6 +39,10 @@ def get_punctuation_regex(language):
 
 
 # pylint:disable=unused-argument
+def get_ignored_characters(language):
+    return COMMONLY_IGNORED_CHARACTERS
+
+
 def get_ignored_characters_pattern(language):
     return COMMONLY_IGNORED_CHARACTERS_PATTERN
 
@@ -52,6 +54,8 @@ def supports_num2words(language):
     global _NUM2WORDS_SUPPORT
 
     if language not in _NUM2WORDS_SUPPORT:
+        from num2words import num2words
+
         try:
             num2words(0, lang=language)
             _NUM2WORDS_SUPPORT[language] = True
@@ -1 +1 @@
-from .nlu_engine import SnipsNLUEngine
+from .nlu_engine import SnipsNLUEngine, load_engine
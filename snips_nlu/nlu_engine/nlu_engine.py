@@ -1,22 +1,33 @@
 from __future__ import unicode_literals
 
-from builtins import str
+import io
+import json
+from builtins import range, str, zip
 from copy import deepcopy
 
-from future.utils import iteritems
+from future.utils import iteritems, itervalues
 
 from snips_nlu.builtin_entities import is_builtin_entity
 from snips_nlu.constants import (
     ENTITIES, CAPITALIZE, LANGUAGE, RES_SLOTS, RES_ENTITY, RES_INTENT)
-from snips_nlu.dataset import validate_and_format_dataset
+from snips_nlu.dataset import (
+    get_entities_hashes, get_intents_hashes, validate_and_format_dataset)
 from snips_nlu.nlu_engine.utils import resolve_slots
 from snips_nlu.pipeline.configs import NLUEngineConfig
 from snips_nlu.pipeline.processing_unit import (
-    ProcessingUnit, build_processing_unit, load_processing_unit)
+    ProcessingUnit, build_processing_unit, get_binary_unit_dict,
+    load_processing_unit)
+from snips_nlu.query import ParsedQuery
+from snips_nlu.resources import load_resources
 from snips_nlu.result import empty_result, is_empty, parsing_result
-from snips_nlu.utils import get_slot_name_mappings, NotTrained
+from snips_nlu.serialization import dump_binary, is_binary_file, load_binary
+from snips_nlu.utils import LRUCache, get_slot_name_mappings, NotTrained
 from snips_nlu.version import __model_version__, __version__
 
+INTENTS_HASHES = "intents_hashes"
+ENTITIES_HASHES = "entities_hashes"
+DEFAULT_PARSE_CACHE_CAPACITY = 1000
+
 
 class SnipsNLUEngine(ProcessingUnit):
     """Main class to use for intent parsing
@@ -49,6 +60,9 @@ class SnipsNLUEngine(ProcessingUnit):
         super(SnipsNLUEngine, self).__init__(config)
         self.intent_parsers = []
         """list of :class:`.IntentParser`"""
+        self.parse_cache = None
+        """:class:`.LRUCache` of the parsing results, see
+        :meth:`enable_parse_cache`"""
         self._dataset_metadata = None
 
     @property
@@ -59,6 +73,12 @@ class SnipsNLUEngine(ProcessingUnit):
     def fit(self, dataset, force_retrain=True):
         """Fit the NLU engine
 
+        When *force_retrain* is *False* and the engine has already been fitted,
+        the intent parsers which are already fitted are only updated with the
+        changes of the dataset since the last training, see
+        :meth:`.IntentParser.refit`. Changes are detected thanks to hashes of
+        the intents and entities which are stored in the dataset metadata.
+
         Args:
             dataset (dict): A valid Snips dataset
             force_retrain (bool, optional): If *False*, will not retrain intent
@@ -68,7 +88,10 @@ class SnipsNLUEngine(ProcessingUnit):
             The same object, trained.
         """
         dataset = validate_and_format_dataset(dataset)
+        previous_metadata = self._dataset_metadata
         self._dataset_metadata = _get_dataset_metadata(dataset)
+        changed_intents = _get_changed_intents(previous_metadata,
+                                               self._dataset_metadata)
 
         parsers = []
         for parser_config in self.config.intent_parsers_configs:
@@ -82,15 +105,49 @@ class SnipsNLUEngine(ProcessingUnit):
                 recycled_parser = build_processing_unit(parser_config)
             if force_retrain or not recycled_parser.fitted:
                 recycled_parser.fit(dataset, force_retrain)
+            elif changed_intents is not None:
+                recycled_parser.refit(dataset, changed_intents)
             parsers.append(recycled_parser)
 
         self.intent_parsers = parsers
+        if self.parse_cache is not None:
+            self.parse_cache.clear()
+        return self
+
+    def enable_parse_cache(self, capacity=DEFAULT_PARSE_CACHE_CAPACITY,
+                           ttl=None):
+        """Enables the caching of the parsing results
+
+        Results are cached by input text and intents filter, in a bounded
+        :class:`.LRUCache` which is exposed as :attr:`parse_cache` along with
+        its hits and misses counters. Copies of the cached results are
+        returned, so that modifying them does not alter the cache. The cache
+        is cleared whenever the engine is fitted again.
+
+        Args:
+            capacity (int, optional): Maximum number of cached results.
+                Default to 1000.
+            ttl (float, optional): If defined, cached results expire *ttl*
+                seconds after having been computed
+
+        Returns:
+            The same object, with a new empty cache
+        """
+        self.parse_cache = LRUCache(capacity, ttl)
+        return self
+
+    def disable_parse_cache(self):
+        """Disables the caching of the parsing results"""
+        self.parse_cache = None
         return self
 
     def parse(self, text, intents=None):
         """Performs intent parsing on the provided *text* by calling its intent
         parsers successively
 
+        When the parse cache is enabled, see :meth:`enable_parse_cache`,
+        results of texts which have already been parsed are retrieved from it.
+
         Args:
             text (str): Input
             intents (str or list of str): If provided, reduces the scope of
@@ -114,22 +171,105 @@ class SnipsNLUEngine(ProcessingUnit):
         if isinstance(intents, str):
             intents = [intents]
 
-        language = self._dataset_metadata["language_code"]
-        entities = self._dataset_metadata["entities"]
-
+        if self.parse_cache is None:
+            return self._parse(text, intents)
+        key = _get_parse_cache_key(text, intents)
+        result = self.parse_cache.get(key)
+        if result is None:
+            result = self._parse(text, intents)
+            self.parse_cache.put(key, deepcopy(result))
+            return result
+        return deepcopy(result)
+
+    def _parse(self, text, intents):
+        # The query analysis is shared by all the intent parsers
+        query = ParsedQuery(text, self._dataset_metadata["language_code"])
         for parser in self.intent_parsers:
-            res = parser.parse(text, intents)
+            res = parser.parse(query, intents)
             if is_empty(res):
                 continue
-            slots = res[RES_SLOTS]
-            scope = [s[RES_ENTITY] for s in slots
-                     if is_builtin_entity(s[RES_ENTITY])]
-            resolved_slots = resolve_slots(text, slots, entities, language,
-                                           scope)
-            return parsing_result(text, intent=res[RES_INTENT],
-                                  slots=resolved_slots)
+            return self._resolve_result(text, res)
         return empty_result(text)
 
+    def parse_batch(self, texts, intents=None):
+        """Performs intent parsing on a batch of *texts*
+
+        Each intent parser is called once on the whole batch of texts which
+        have not been parsed by the previous parsers, which allows parsers to
+        share work across inputs.
+
+        Args:
+            texts (list of str): Inputs
+            intents (str or list of str): If provided, reduces the scope of
+                intent parsing to the provided list of intents
+
+        Returns:
+            list of dict: The parsing results, in the same order as *texts*.
+            See :func:`.parsing_result` for the output format.
+
+        Raises:
+            NotTrained: When the nlu engine is not fitted
+            TypeError: When one of the inputs is not unicode
+        """
+        for text in texts:
+            if not isinstance(text, str):
+                raise TypeError(
+                    "Expected unicode but received: %s" % type(text))
+
+        if not self.fitted:
+            raise NotTrained("SnipsNLUEngine must be fitted")
+
+        if isinstance(intents, str):
+            intents = [intents]
+
+        results = [None for _ in texts]
+        if self.parse_cache is None:
+            remaining_indexes = list(range(len(texts)))
+        else:
+            remaining_indexes = []
+            for i, text in enumerate(texts):
+                result = self.parse_cache.get(
+                    _get_parse_cache_key(text, intents))
+                if result is None:
+                    remaining_indexes.append(i)
+                else:
+                    results[i] = deepcopy(result)
+        parsed_indexes = list(remaining_indexes)
+
+        language = self._dataset_metadata["language_code"]
+        queries = {i: ParsedQuery(texts[i], language)
+                   for i in remaining_indexes}
+        for parser in self.intent_parsers:
+            if not remaining_indexes:
+                break
+            batch = [queries[i] for i in remaining_indexes]
+            parser_results = parser.parse_batch(batch, intents)
+            unparsed_indexes = []
+            for i, res in zip(remaining_indexes, parser_results):
+                if is_empty(res):
+                    unparsed_indexes.append(i)
+                else:
+                    results[i] = self._resolve_result(texts[i], res)
+            remaining_indexes = unparsed_indexes
+
+        for i in remaining_indexes:
+            results[i] = empty_result(texts[i])
+        if self.parse_cache is not None:
+            for i in parsed_indexes:
+                self.parse_cache.put(_get_parse_cache_key(texts[i], intents),
+                                     deepcopy(results[i]))
+        return results
+
+    def _resolve_result(self, text, result):
+        language = self._dataset_metadata["language_code"]
+        entities = self._dataset_metadata["entities"]
+        slots = result[RES_SLOTS]
+        scope = [s[RES_ENTITY] for s in slots
+                 if is_builtin_entity(s[RES_ENTITY])]
+        resolved_slots = resolve_slots(text, slots, entities, language, scope)
+        return parsing_result(text, intent=result[RES_INTENT],
+                              slots=resolved_slots)
+
     def to_dict(self):
         """Returns a json-serializable dict"""
         intent_parsers = [parser.to_dict() for parser in self.intent_parsers]
@@ -167,6 +307,69 @@ class SnipsNLUEngine(ProcessingUnit):
 
         return nlu_engine
 
+    def to_binary(self, path):
+        """Persists the engine in a binary file
+
+        The dense arrays of the engine, such as the weights of the intent
+        classifier and of the CRFs, are stored as raw buffers, see
+        :func:`.dump_binary`.
+        """
+        dump_binary(get_binary_unit_dict(self.to_dict()), path)
+
+    @classmethod
+    def from_binary(cls, path, mmap=True):
+        """Creates a :class:`SnipsNLUEngine` instance from a binary file
+        generated with :func:`~SnipsNLUEngine.to_binary`
+
+        Args:
+            path (str): Path of the binary file
+            mmap (bool, optional): If *True*, the dense arrays of the engine
+                are memory-mapped on the file instead of being read in memory.
+                Default to *True*.
+
+        Raises:
+            ValueError: When there is a mismatch with the model version or
+                with the binary format version
+        """
+        return cls.from_dict(load_binary(path, mmap))
+
+
+def load_engine(path, mmap=True):
+    """Loads a trained :class:`SnipsNLUEngine` ready to parse, along with the
+    resources of its language
+
+    This is the entry point to use at inference: the dependencies which are
+    only needed for training, such as sklearn, scipy or num2words, are not
+    imported when loading and parsing with the engine, provided that its
+    slot fillers use the numpy inference backend.
+
+    Args:
+        path (str): Path of the engine persisted either in json, see
+            :meth:`~SnipsNLUEngine.to_dict`, or in the binary format, see
+            :meth:`~SnipsNLUEngine.to_binary`
+        mmap (bool, optional): If *True*, the dense arrays of an engine
+            persisted in the binary format are memory-mapped. Default to
+            *True*.
+
+    Returns:
+        :class:`SnipsNLUEngine`: The loaded engine
+    """
+    if is_binary_file(path):
+        engine_dict = load_binary(path, mmap)
+    else:
+        with io.open(path, encoding="utf8") as f:
+            engine_dict = json.load(f)
+    dataset_metadata = engine_dict["dataset_metadata"]
+    if dataset_metadata is not None:
+        load_resources(dataset_metadata["language_code"])
+    return SnipsNLUEngine.from_dict(engine_dict)
+
+
+def _get_parse_cache_key(text, intents):
+    if intents is not None:
+        intents = tuple(sorted(set(intents)))
+    return text, intents
+
 
 def _get_dataset_metadata(dataset):
     entities = dict()
@@ -180,5 +383,41 @@ def _get_dataset_metadata(dataset):
     return {
         "language_code": dataset[LANGUAGE],
         "entities": entities,
-        "slot_name_mappings": slot_name_mappings
+        "slot_name_mappings": slot_name_mappings,
+        INTENTS_HASHES: get_intents_hashes(dataset),
+        ENTITIES_HASHES: get_entities_hashes(dataset)
     }
+
+
+def _get_changed_intents(previous_metadata, metadata):
+    """Returns the intents impacted by the changes between the datasets
+    described by *previous_metadata* and *metadata*
+
+    None is returned when the dataset did not change, or when the changes
+    cannot be tracked because the previous metadata has no hashes.
+    """
+    if previous_metadata is None or INTENTS_HASHES not in previous_metadata:
+        return None
+    intents_hashes = metadata[INTENTS_HASHES]
+    if previous_metadata["language_code"] != metadata["language_code"]:
+        return sorted(intents_hashes)
+
+    previous_intents_hashes = previous_metadata[INTENTS_HASHES]
+    previous_entities_hashes = previous_metadata[ENTITIES_HASHES]
+    entities_hashes = metadata[ENTITIES_HASHES]
+    if previous_intents_hashes == intents_hashes \
+            and previous_entities_hashes == entities_hashes:
+        return None
+
+    all_entities = set(previous_entities_hashes).union(entities_hashes)
+    changed_entities = set(
+        entity for entity in all_entities
+        if previous_entities_hashes.get(entity) != entities_hashes.get(entity))
+    changed_intents = []
+    for intent, intent_hash in sorted(iteritems(intents_hashes)):
+        intent_entities = set(
+            itervalues(metadata["slot_name_mappings"][intent]))
+        if previous_intents_hashes.get(intent) != intent_hash \
+                or intent_entities.intersection(changed_entities):
+            changed_intents.append(intent)
+    return changed_intents
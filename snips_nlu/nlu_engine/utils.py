@@ -1,27 +1,25 @@
-from snips_nlu.builtin_entities import get_builtin_entities, is_builtin_entity
+from snips_nlu.builtin_entities import (
+    get_builtin_entities, get_builtin_entities_index, is_builtin_entity)
 from snips_nlu.constants import (
     UTTERANCES, AUTOMATICALLY_EXTENSIBLE, INTENTS, DATA, SLOT_NAME, ENTITY,
-    RES_MATCH_RANGE, RES_VALUE, RES_ENTITY, VALUE, ENTITY_KIND)
+    RES_MATCH_RANGE, RES_VALUE, RES_ENTITY, VALUE)
 from snips_nlu.result import custom_slot, builtin_slot
 
 
 # pylint:disable=redefined-builtin
 def resolve_slots(input, slots, dataset_entities, language, scope):
-    builtin_entities = get_builtin_entities(input, language, scope)
+    builtin_entities_index = get_builtin_entities_index(input, language)
     resolved_slots = []
     for slot in slots:
         entity_name = slot[RES_ENTITY]
         raw_value = slot[RES_VALUE]
         if is_builtin_entity(entity_name):
-            found = False
-            for ent in builtin_entities:
-                if ent[ENTITY_KIND] == entity_name and \
-                        ent[RES_MATCH_RANGE] == slot[RES_MATCH_RANGE]:
-                    resolved_slot = builtin_slot(slot, ent[ENTITY])
-                    resolved_slots.append(resolved_slot)
-                    found = True
-                    break
-            if not found:
+            ent = builtin_entities_index.get_entity(
+                entity_name, slot[RES_MATCH_RANGE], scope)
+            if ent is not None:
+                resolved_slot = builtin_slot(slot, ent[ENTITY])
+                resolved_slots.append(resolved_slot)
+            else:
                 builtin_matches = get_builtin_entities(raw_value, language,
                                                        scope=[entity_name])
                 if builtin_matches:
@@ -15,10 +15,14 @@ class ProbabilisticIntentParserConfig(ProcessingUnitConfig):
         slot_filler_config (:class:`.ProcessingUnitConfig`): The configuration
             that will be used for the underlying slot fillers, by default it
             uses a :class:`.CRFSlotFillerConfig`
+        n_jobs (int, optional): Number of processes used to train the slot
+            fillers in parallel, -1 meaning as many as there are CPUs
+            (default=1)
     """
 
     # pylint: disable=super-init-not-called
-    def __init__(self, intent_classifier_config=None, slot_filler_config=None):
+    def __init__(self, intent_classifier_config=None, slot_filler_config=None,
+                 n_jobs=1):
         if intent_classifier_config is None:
             from snips_nlu.pipeline.configs import LogRegIntentClassifierConfig
             intent_classifier_config = LogRegIntentClassifierConfig()
@@ -29,6 +33,7 @@ class ProbabilisticIntentParserConfig(ProcessingUnitConfig):
             intent_classifier_config)
         self.slot_filler_config = get_processing_unit_config(
             slot_filler_config)
+        self.n_jobs = n_jobs
 
     # pylint: enable=super-init-not-called
 
@@ -41,7 +46,9 @@ class ProbabilisticIntentParserConfig(ProcessingUnitConfig):
         return {
             "unit_name": self.unit_name,
             "slot_filler_config": self.slot_filler_config.to_dict(),
-            "intent_classifier_config": self.intent_classifier_config.to_dict()
+            "intent_classifier_config":
+                self.intent_classifier_config.to_dict(),
+            "n_jobs": self.n_jobs
         }
 
     @classmethod
@@ -61,18 +68,15 @@ class DeterministicIntentParserConfig(ProcessingUnitConfig):
             in the dataset is above *max_queries* then the patterns for this
             intent will be skipped. 50 by default.
         max_entities (int, optional): Same as *max_queries* but regarding
-            entity values.
+            entity values. Entity values are matched with a trie, so their
+            number does not impact the parsing time, hence the default is
+            *None* which means no limit.
 
-    This allows to deactivate the usage of regular expression when they are
-    too big to avoid explosion in time and memory
-
-    Note:
-        In the future, a FST will be used insted of regexps, removing the need
-        for all this
+    Setting one of these limits to *None* deactivates it.
     """
 
     # pylint: disable=super-init-not-called
-    def __init__(self, max_queries=50, max_entities=200):
+    def __init__(self, max_queries=50, max_entities=None):
         self.max_queries = max_queries
         self.max_entities = max_entities
 
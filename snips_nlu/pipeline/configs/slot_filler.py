@@ -6,6 +6,10 @@ from snips_nlu.pipeline.configs import Config, ProcessingUnitConfig
 from snips_nlu.pipeline.configs import default_features_factories
 from snips_nlu.utils import classproperty
 
+CRFSUITE_BACKEND = "crfsuite"
+NUMPY_BACKEND = "numpy"
+INFERENCE_BACKENDS = (CRFSUITE_BACKEND, NUMPY_BACKEND)
+
 
 class CRFSlotFillerConfig(ProcessingUnitConfig):
     # pylint: disable=line-too-long
@@ -26,6 +30,16 @@ class CRFSlotFillerConfig(ProcessingUnitConfig):
             corresponding config object for more details.
         random_seed (int, optional): Specify to make the CRF training
             deterministic and reproducible (default=None)
+        inference_backend (str, optional): Backend used to run the CRF at
+            inference time, either "crfsuite" to use the crfsuite tagger or
+            "numpy" to decode with the weights of the model loaded in memory,
+            see :class:`.CRFDecoder` (default="crfsuite")
+        constrained_decoding (bool, optional): If *True*, the slot names of
+            the builtin entities detected in a query are found with a single
+            constrained Viterbi decoding of the CRF, which explores every
+            assignment of slot names to the builtin entities, instead of
+            scoring the permutations of slot names one by one
+            (default=False)
     """
 
     # pylint: enable=line-too-long
@@ -34,7 +48,9 @@ class CRFSlotFillerConfig(ProcessingUnitConfig):
     def __init__(self, feature_factory_configs=None,
                  tagging_scheme=None, crf_args=None,
                  exhaustive_permutations_threshold=4 ** 3,
-                 data_augmentation_config=None, random_seed=None):
+                 data_augmentation_config=None, random_seed=None,
+                 inference_backend=CRFSUITE_BACKEND,
+                 constrained_decoding=False):
         if tagging_scheme is None:
             from snips_nlu.slot_filler.crf_utils import TaggingScheme
             tagging_scheme = TaggingScheme.BIO
@@ -53,6 +69,9 @@ class CRFSlotFillerConfig(ProcessingUnitConfig):
         self._data_augmentation_config = None
         self.data_augmentation_config = data_augmentation_config
         self.random_seed = random_seed
+        self._inference_backend = None
+        self.inference_backend = inference_backend
+        self.constrained_decoding = constrained_decoding
 
     # pylint: enable=super-init-not-called
 
@@ -87,6 +106,17 @@ class CRFSlotFillerConfig(ProcessingUnitConfig):
                             "SlotFillerDataAugmentationConfig or dict but "
                             "received: %s" % type(value))
 
+    @property
+    def inference_backend(self):
+        return self._inference_backend
+
+    @inference_backend.setter
+    def inference_backend(self, value):
+        if value not in INFERENCE_BACKENDS:
+            raise ValueError("Expected inference backend in %s but received: "
+                             "%s" % (list(INFERENCE_BACKENDS), value))
+        self._inference_backend = value
+
     @classproperty
     def unit_name(cls):  # pylint:disable=no-self-argument
         from snips_nlu.slot_filler import CRFSlotFiller
@@ -102,7 +132,9 @@ class CRFSlotFillerConfig(ProcessingUnitConfig):
                 self.exhaustive_permutations_threshold,
             "data_augmentation_config":
                 self.data_augmentation_config.to_dict(),
-            "random_seed": self.random_seed
+            "random_seed": self.random_seed,
+            "inference_backend": self.inference_backend,
+            "constrained_decoding": self.constrained_decoding
         }
 
     @classmethod
@@ -1,7 +1,7 @@
 from abc import ABCMeta, abstractmethod
 from builtins import object
 
-from future.utils import with_metaclass
+from future.utils import iteritems, with_metaclass
 
 from snips_nlu.pipeline.configs import ProcessingUnitConfig
 from snips_nlu.utils import classproperty
@@ -41,6 +41,16 @@ class ProcessingUnit(with_metaclass(ABCMeta, object)):
     def from_dict(cls, unit_dict):
         raise NotImplementedError
 
+    @classmethod
+    def to_binary_dict(cls, unit_dict):
+        """Returns the version of a persisted unit dict which is stored in the
+        binary format, see :func:`.dump_binary`
+
+        By default this is the unit dict itself, units can override it to add
+        dense arrays which are not worth storing in the json format.
+        """
+        return unit_dict
+
 
 def _get_unit_type(unit_name):
     from snips_nlu.pipeline.units_registry import NLU_PROCESSING_UNITS
@@ -51,6 +61,25 @@ def _get_unit_type(unit_name):
     return unit
 
 
+def get_binary_unit_dict(unit_dict):
+    """Returns the version of a persisted processing unit dict, and of the
+    units it contains, which is stored in the binary format"""
+    from snips_nlu.pipeline.units_registry import NLU_PROCESSING_UNITS
+
+    if isinstance(unit_dict, list):
+        return [get_binary_unit_dict(value) for value in unit_dict]
+    if not isinstance(unit_dict, dict):
+        return unit_dict
+    binary_dict = {key: get_binary_unit_dict(value)
+                   for key, value in iteritems(unit_dict)}
+    # Unit configs also have a unit name but no config
+    if "config" in binary_dict:
+        unit = NLU_PROCESSING_UNITS.get(binary_dict.get("unit_name"))
+        if unit is not None:
+            binary_dict = unit.to_binary_dict(binary_dict)
+    return binary_dict
+
+
 def get_processing_unit_config(unit_config):
     """Returns the :class:`.ProcessingUnitConfig` corresponding to
         *unit_config*"""
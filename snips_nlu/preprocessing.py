@@ -1,14 +1,54 @@
 from __future__ import unicode_literals
 
+from snips_nlu_utils import normalize
+
 from snips_nlu.resources import get_stems
 from snips_nlu.tokenization import tokenize_light
+from snips_nlu.utils import get_cache
+
+STEMS_CACHE_CAPACITY = 10000
+
+_LANGUAGES_CACHES = dict()
 
 
 def stem(string, language):
-    tokens = tokenize_light(string, language)
-    stemmed_tokens = [_stem(token, language) for token in tokens]
-    return ' '.join(stemmed_tokens)
+    """Stems each token of the *string*
+
+    Results are memoized per language, as the same vocabulary words are
+    stemmed over and over.
+    """
+    return _get_cache("stems", language).get_or_compute(
+        string, lambda: _stem(string, language))
+
+
+def normalize_and_stem(string, language):
+    """Normalizes then stems the *string*, see :func:`stem`
+
+    Results are memoized per language.
+    """
+    return _get_cache("normalized_stems", language).get_or_compute(
+        string, lambda: stem(normalize(string), language))
+
+
+def has_stems(language):
+    """Whether or not stems are available for the *language*"""
+    return len(get_stems(language)) > 0
 
 
 def _stem(string, language):
-    return get_stems(language).get(string, string)
+    tokens = tokenize_light(string, language)
+    if has_stems(language):
+        stems = get_stems(language)
+        tokens = [stems.get(token, token) for token in tokens]
+    return ' '.join(tokens)
+
+
+def _get_cache(name, language):
+    # The registered caches are resolved once per language and then
+    # referenced, so that stemming does not go through the registry lock
+    key = (name, language)
+    cache = _LANGUAGES_CACHES.get(key)
+    if cache is None:
+        cache = get_cache("%s_%s" % key, capacity=STEMS_CACHE_CAPACITY)
+        _LANGUAGES_CACHES[key] = cache
+    return cache
@@ -0,0 +1,83 @@
+from __future__ import unicode_literals
+
+from builtins import str
+
+from snips_nlu.builtin_entities import get_builtin_entities_index
+from snips_nlu.preprocessing import stem
+from snips_nlu.tokenization import Token, tokenize, tokenize_light
+
+
+class ParsedQuery(str):
+    """Analysis of an input text which is shared by all the processing units
+    involved in its parsing
+
+    A :class:`ParsedQuery` behaves as the text it wraps, hence it can be
+    passed wherever a text is expected. The tokenization, the stemming and
+    the builtin entities extraction are lazily computed at most once and then
+    reused by all the units which receive the query.
+
+    Attributes:
+        language (str): Language of the text
+    """
+
+    def __new__(cls, text, language):
+        query = super(ParsedQuery, cls).__new__(cls, text)
+        query.language = language
+        query._tokens = None
+        query._stemmed_tokens = None
+        query._light_tokens = None
+        query._builtin_entities_index = None
+        return query
+
+    def __getnewargs__(self):
+        return self.text, self.language
+
+    @property
+    def text(self):
+        """The wrapped text, as a plain string"""
+        return str(self)
+
+    @property
+    def tokens(self):
+        """List of :class:`.Token` of the text"""
+        if self._tokens is None:
+            self._tokens = tokenize(self.text, self.language)
+        return self._tokens
+
+    @property
+    def stemmed_tokens(self):
+        """Same as :attr:`tokens` but with the stem of the tokens"""
+        if self._stemmed_tokens is None:
+            self._stemmed_tokens = [
+                Token(t.value, t.start, t.end, normalized=t.normalized_value,
+                      stem=stem(t.normalized_value, self.language))
+                for t in self.tokens]
+        return self._stemmed_tokens
+
+    @property
+    def light_tokens(self):
+        """List of tokenized strings, see :func:`.tokenize_light`"""
+        if self._light_tokens is None:
+            self._light_tokens = tokenize_light(self.text, self.language)
+        return self._light_tokens
+
+    @property
+    def builtin_entities_index(self):
+        """:class:`.BuiltinEntitiesIndex` of the text"""
+        if self._builtin_entities_index is None:
+            self._builtin_entities_index = get_builtin_entities_index(
+                self.text, self.language)
+        return self._builtin_entities_index
+
+    @property
+    def builtin_entities(self):
+        """Builtin entities found in the text"""
+        return self.builtin_entities_index.get_entities()
+
+
+def get_parsed_query(text, language):
+    """Returns *text* when it is already a :class:`ParsedQuery` of the
+    *language*, and wraps it in a new :class:`ParsedQuery` otherwise"""
+    if isinstance(text, ParsedQuery) and text.language == language:
+        return text
+    return ParsedQuery(text, language)
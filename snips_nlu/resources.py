@@ -1,21 +1,30 @@
 from __future__ import unicode_literals
 
 import glob
+import hashlib
 import io
 import os
+import re
+import tempfile
 from collections import defaultdict
+from threading import RLock
+from weakref import WeakValueDictionary
 
 from builtins import next
 from future.utils import iteritems
 from snips_nlu_utils import normalize
 
+from snips_nlu.compact_storage import CompactStringMapping, CompactStringSet
 from snips_nlu.constants import (STOP_WORDS, WORD_CLUSTERS, GAZETTEERS, NOISE,
                                  RESOURCES_PATH, LANGUAGE_EN, LANGUAGE_FR,
                                  LANGUAGE_ES, LANGUAGE_KO, LANGUAGE_DE,
                                  LANGUAGE_JA, STEMS)
 from snips_nlu.languages import get_ignored_characters_pattern
 from snips_nlu.tokenization import tokenize
-from snips_nlu.utils import get_resources_path
+from snips_nlu.utils import get_resources_path, mkdir_p
+from snips_nlu.version import __version__
+
+RESOURCES_CACHE_DIR_ENV = "SNIPS_NLU_RESOURCES_CACHE_DIR"
 
 RESOURCE_INDEX = {
     LANGUAGE_DE: {
@@ -58,6 +67,8 @@ RESOURCE_INDEX = {
 }
 
 _RESOURCES = defaultdict(dict)
+_RESOURCES_LOCK = RLock()
+_SHARED_RESOURCES = WeakValueDictionary()
 
 
 class UnknownResource(LookupError):
@@ -77,12 +88,64 @@ def get_language_resource(language):
 
 
 def get_resource(language, resource_name):
+    """Returns a resource of the language, which is loaded the first time it
+    is accessed
+
+    Raises:
+        UnloadedResources: When the resources of the language have not been
+            loaded with :func:`load_resources`
+        UnknownResource: When the resource does not exist for the language
+    """
     language_resource = get_language_resource(language)
-    try:
-        return language_resource[resource_name]
-    except KeyError:
+    if resource_name not in language_resource:
+        _load_resource(language, resource_name)
+    resource = language_resource.get(resource_name)
+    if resource is None:
         raise UnknownResource("Unknown resource '{}' for '{}' "
                               "language".format(resource_name, language))
+    return resource
+
+
+def get_shared_resource(language, resource_name, use_stemming, build_fn):
+    """Returns the object derived from the resources of the language which is
+    shared across the process under the (*language*, *resource_name*,
+    *use_stemming*) key, building it with *build_fn* when needed
+
+    Objects derived from the resources, such as stemmed gazetteers, are
+    needed by the feature factories of every slot filler. Sharing them avoids
+    building and storing one identical copy per slot filler.
+
+    The registry only keeps weak references to the shared objects, which are
+    thus reference counted: an object is released as soon as no slot filler
+    uses it anymore, and built again by the next call.
+
+    Args:
+        language (str): Language of the resource
+        resource_name (str): Name identifying the derived object
+        use_stemming (bool): Whether or not the object is built with stemming
+        build_fn (callable): Function without arguments building the object,
+            which must support weak references, as sets and compact storages
+            do
+    """
+    key = (language, resource_name, use_stemming)
+    with _RESOURCES_LOCK:
+        resource = _SHARED_RESOURCES.get(key)
+        if resource is None:
+            resource = build_fn()
+            _SHARED_RESOURCES[key] = resource
+        return resource
+
+
+def _load_resource(language, resource_name):
+    loader = _RESOURCES_LOADERS.get(resource_name)
+    if loader is None:
+        return
+    with _RESOURCES_LOCK:
+        language_resource = get_language_resource(language)
+        # The resource may have been loaded by another thread meanwhile
+        if resource_name not in language_resource:
+            # None is stored when the language does not have the resource
+            language_resource[resource_name] = loader(language)
 
 
 def _load_stop_words(language):
@@ -92,7 +155,8 @@ def _load_stop_words(language):
             RESOURCE_INDEX[language][STOP_WORDS])
         with io.open(stop_words_file_path, encoding='utf8') as f:
             lines = (normalize(l) for l in f)
-            _RESOURCES[language][STOP_WORDS] = set(l for l in lines if l)
+            return set(l for l in lines if l)
+    return None
 
 
 def get_stop_words(language):
@@ -110,7 +174,8 @@ def _load_noises(language):
             # We don't really care about tokenizing precisely as this noise
             #  is just used to generate fake query that will be
             # re-tokenized
-            _RESOURCES[language][NOISE] = next(f).split()
+            return next(f).split()
+    return None
 
 
 def get_noises(language):
@@ -126,16 +191,26 @@ def _load_clusters(language):
     if WORD_CLUSTERS in RESOURCE_INDEX[language]:
         clusters = dict()
         for name, path in iteritems(word_clusters_paths):
-            with io.open(path, encoding="utf8") as f:
-                clusters[name] = dict()
-                for l in f:
-                    split = l.rstrip().split("\t")
-                    if len(split) == 2:
-                        clusters[name][split[0]] = split[1]
-        _RESOURCES[language][WORD_CLUSTERS] = clusters
+            clusters[name] = _load_precompiled(
+                language, "%s_%s" % (WORD_CLUSTERS, name), [path],
+                CompactStringMapping, lambda p=path: _compile_clusters(p))
+        return clusters
+    return None
+
+
+def _compile_clusters(path):
+    with io.open(path, encoding="utf8") as f:
+        words_clusters = dict()
+        for l in f:
+            split = l.rstrip().split("\t")
+            if len(split) == 2:
+                words_clusters[split[0]] = split[1]
+    return CompactStringMapping.from_dict(words_clusters)
 
 
 def get_word_clusters(language):
+    """Returns a dict mapping the name of each word cluster of the language
+    to a :class:`.CompactStringMapping` from words to clusters"""
     return get_resource(language, WORD_CLUSTERS)
 
 
@@ -147,15 +222,22 @@ def _load_gazetteers(language):
     }
     gazetteers = dict()
     for name, path in iteritems(gazetteers_paths):
-        with io.open(path, encoding="utf8") as f:
-            gazetteers[name] = set()
-            for l in f:
-                normalized = normalize(l.strip())
-                if normalized:
-                    normalized = get_ignored_characters_pattern(language).join(
-                        [t.value for t in tokenize(normalized, language)])
-                    gazetteers[name].add(normalized)
-    _RESOURCES[language][GAZETTEERS] = gazetteers
+        gazetteers[name] = _load_precompiled(
+            language, "%s_%s" % (GAZETTEERS, name), [path], CompactStringSet,
+            lambda p=path: _compile_gazetteer(p, language))
+    return gazetteers
+
+
+def _compile_gazetteer(path, language):
+    with io.open(path, encoding="utf8") as f:
+        gazetteer = set()
+        for l in f:
+            normalized = normalize(l.strip())
+            if normalized:
+                normalized = get_ignored_characters_pattern(language).join(
+                    [t.value for t in tokenize(normalized, language)])
+                gazetteer.add(normalized)
+    return CompactStringSet.from_strings(gazetteer)
 
 
 def get_gazetteers(language):
@@ -163,17 +245,16 @@ def get_gazetteers(language):
 
 
 def get_gazetteer(language, gazetteer_name):
+    """Returns the gazetteer as a :class:`.CompactStringSet`"""
     return get_gazetteers(language)[gazetteer_name]
 
 
-def _verbs_lexemes(language):
-    stems_paths = glob.glob(os.path.join(RESOURCES_PATH, language,
-                                         "top_*_verbs_lexemes.txt"))
-    if not stems_paths:
+def _verbs_lexemes(stems_path):
+    if stems_path is None:
         return dict()
 
     verb_lexemes = dict()
-    with io.open(stems_paths[0], encoding="utf8") as f:
+    with io.open(stems_path, encoding="utf8") as f:
         for line in f:
             elements = line.strip().split(';')
             verb = normalize(elements[0])
@@ -183,14 +264,12 @@ def _verbs_lexemes(language):
     return verb_lexemes
 
 
-def _word_inflections(language):
-    inflection_paths = glob.glob(os.path.join(RESOURCES_PATH, language,
-                                              "top_*_words_inflected.txt"))
-    if not inflection_paths:
+def _word_inflections(inflection_path):
+    if inflection_path is None:
         return dict()
 
     inflections = dict()
-    with io.open(inflection_paths[0], encoding="utf8") as f:
+    with io.open(inflection_path, encoding="utf8") as f:
         for line in f:
             elements = line.strip().split(';')
             inflections[normalize(elements[0])] = normalize(elements[1])
@@ -198,28 +277,166 @@ def _word_inflections(language):
 
 
 def _load_stems(language):
-    stems = _word_inflections(language)
-    stems.update(_verbs_lexemes(language))
-    _RESOURCES[language][STEMS] = stems
+    inflection_path = _find_resource_file(language,
+                                          "top_*_words_inflected.txt")
+    stems_path = _find_resource_file(language, "top_*_verbs_lexemes.txt")
+    source_paths = [path for path in (inflection_path, stems_path)
+                    if path is not None]
+
+    def compile_stems():
+        stems = _word_inflections(inflection_path)
+        stems.update(_verbs_lexemes(stems_path))
+        return CompactStringMapping.from_dict(stems)
+
+    return _load_precompiled(language, STEMS, source_paths,
+                             CompactStringMapping, compile_stems)
+
+
+def _find_resource_file(language, pattern):
+    paths = glob.glob(os.path.join(RESOURCES_PATH, language, pattern))
+    if not paths:
+        return None
+    return paths[0]
 
 
 def get_stems(language):
     return get_resource(language, STEMS)
 
 
-def load_resources(language):
+def get_resources_cache_dir():
+    """Returns the directory in which the precompiled resources are cached,
+    or None when the cache is disabled
+
+    Processing the resources files, for instance tokenizing the gazetteers
+    or normalizing the stems, can be done once and its result cached in a
+    binary file which is memory-mapped by the next loadings. The cache files
+    are keyed by the hash of the resources files and by the versions of the
+    library and of *snips_nlu_utils*, and outdated ones are removed.
+
+    The cache is disabled by default, it is enabled by setting the
+    *SNIPS_NLU_RESOURCES_CACHE_DIR* environment variable to the directory to
+    use.
+    """
+    return os.environ.get(RESOURCES_CACHE_DIR_ENV) or None
+
+
+def _load_precompiled(language, cache_name, source_paths, storage_type,
+                      compile_fn):
+    cache_path = _get_cache_path(language, cache_name, source_paths)
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            return storage_type.from_file(cache_path)
+        except (IOError, OSError, KeyError, ValueError):
+            # The cache file is corrupted or has an outdated layout, it is
+            # compiled again
+            pass
+    resource = compile_fn()
+    if cache_path is not None and _write_cache(resource, cache_path):
+        _remove_outdated_caches(language, cache_name, cache_path)
+    return resource
+
+
+def _get_cache_path(language, cache_name, source_paths):
+    cache_dir = get_resources_cache_dir()
+    if cache_dir is None or not source_paths:
+        return None
+    # The compiled resources depend on the tokenization and normalization
+    # done by snips_nlu_utils
+    utils_version = _get_utils_version()
+    if utils_version is None:
+        return None
+    digest = hashlib.sha1(__version__.encode("utf8"))
+    digest.update(utils_version.encode("utf8"))
+    for path in source_paths:
+        with io.open(path, "rb") as f:
+            digest.update(f.read())
+    return os.path.join(cache_dir, "%s_%s_%s.bin" % (
+        language, cache_name, digest.hexdigest()))
+
+
+def _write_cache(resource, cache_path):
+    # The file is written under a temporary name and then renamed, so that
+    # processes which load the resources concurrently never read a partially
+    # written file
+    tmp_path = None
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        mkdir_p(cache_dir)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+        os.close(fd)
+        resource.to_file(tmp_path)
+        os.rename(tmp_path, cache_path)
+        return True
+    except (IOError, OSError):
+        # The cache is only an optimization, hence failing to write it is not
+        # an error
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def _remove_outdated_caches(language, cache_name, cache_path):
+    # Cache files of the same resource with another digest were compiled from
+    # other resources files or versions, and would never be used again
+    cache_dir, cache_file = os.path.split(cache_path)
+    prefix = re.escape("%s_%s_" % (language, cache_name))
+    cache_file_regex = re.compile(r"^%s[0-9a-f]{40}\.bin$" % prefix)
+    for filename in os.listdir(cache_dir):
+        if filename == cache_file or not cache_file_regex.match(filename):
+            continue
+        try:
+            os.remove(os.path.join(cache_dir, filename))
+        except OSError:
+            pass  # The file may have been removed by another process
+
+
+def _get_utils_version():
+    try:
+        from pkg_resources import DistributionNotFound, get_distribution
+    except ImportError:
+        return None
+    try:
+        return get_distribution("snips_nlu_utils").version
+    except DistributionNotFound:
+        return None
+
+
+_RESOURCES_LOADERS = {
+    WORD_CLUSTERS: _load_clusters,
+    GAZETTEERS: _load_gazetteers,
+    STOP_WORDS: _load_stop_words,
+    NOISE: _load_noises,
+    STEMS: _load_stems
+}
+
+
+def load_resources(language, only=None):
     """Load language specific resources
 
+    By default, each resource is lazily loaded the first time it is accessed,
+    so that resources which are only used for training, such as the noise, or
+    which are not used by the configuration are never loaded.
+
     Args:
         language (str): language
+        only (list of str, optional): Names of the resources to load eagerly,
+            among "word_clusters", "gazetteers", "stop_words", "noise" and
+            "stems"
+
+    Raises:
+        ValueError: When one of the provided resource names is unknown
 
     Note:
         Language resources must be loaded before fitting or parsing
     """
-    if language in _RESOURCES:
-        return
-    _load_clusters(language)
-    _load_gazetteers(language)
-    _load_stop_words(language)
-    _load_noises(language)
-    _load_stems(language)
+    if only is not None:
+        for resource_name in only:
+            if resource_name not in _RESOURCES_LOADERS:
+                raise ValueError("Unknown resource name: '%s'"
+                                 % resource_name)
+    with _RESOURCES_LOCK:
+        if language not in _RESOURCES:
+            _RESOURCES[language] = dict()
+    if only is not None:
+        for resource_name in only:
+            _load_resource(language, resource_name)
@@ -0,0 +1,180 @@
+from __future__ import unicode_literals
+
+import io
+import json
+import struct
+from builtins import zip
+
+import numpy as np
+from future.utils import iteritems
+
+BINARY_MAGIC = b"SNIPSNLU"
+BINARY_FORMAT_VERSION = 1
+ARRAY_KEY = "__ndarray__"
+
+_HEADER_SIZE_STRUCT = struct.Struct(str("<Q"))
+_ALIGNMENT = 64
+
+
+def dump_binary(unit_dict, path):
+    """Persists a processing unit dict in a binary file
+
+    The dense float arrays of the dict, such as the coefficients of a
+    classifier or the weights of a CRF, are stored as raw buffers which can be
+    memory-mapped at loading, see :func:`load_binary`. The rest of the dict is
+    stored in a compact json header.
+
+    The file layout is the following:
+
+    - the magic bytes *SNIPSNLU*
+    - the size of the header, as a little-endian unsigned 64 bits integer
+    - the json header, which contains the format version, the description of
+      the arrays and the dict in which arrays are replaced by references
+    - the arrays buffers, each one being aligned on 64 bytes
+
+    Args:
+        unit_dict (dict): A processing unit dict, as returned by
+            :meth:`.ProcessingUnit.to_dict`
+        path (str): Path of the file to create
+    """
+    arrays = []
+    header_dict = _extract_arrays(unit_dict, arrays)
+    arrays_descriptions = []
+    offset = 0
+    for array in arrays:
+        offset = _align(offset)
+        arrays_descriptions.append({
+            "offset": offset,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape)
+        })
+        offset += array.nbytes
+
+    header = json.dumps({
+        "format_version": BINARY_FORMAT_VERSION,
+        "arrays": arrays_descriptions,
+        "unit": header_dict
+    }, separators=(",", ":")).encode("utf8")
+    data_start = _align(
+        len(BINARY_MAGIC) + _HEADER_SIZE_STRUCT.size + len(header))
+
+    with io.open(path, "wb") as f:
+        f.write(BINARY_MAGIC)
+        f.write(_HEADER_SIZE_STRUCT.pack(len(header)))
+        f.write(header)
+        for array, description in zip(arrays, arrays_descriptions):
+            _write_padding(f, data_start + description["offset"])
+            f.write(array.tobytes())
+        _write_padding(f, data_start + offset)
+
+
+def load_binary(path, mmap=True):
+    """Loads a processing unit dict persisted with :func:`dump_binary`
+
+    Args:
+        path (str): Path of the binary file
+        mmap (bool, optional): If *True*, the arrays are memory-mapped
+            read-only views on the file, so that they are loaded lazily by the
+            OS and shared between the processes loading the same file.
+            Otherwise, the arrays are read in memory. Default to *True*.
+
+    Returns:
+        dict: The processing unit dict, in which the dense arrays are
+        :class:`numpy.ndarray` instead of lists
+
+    Raises:
+        ValueError: When the file is not a binary snips nlu file or when its
+            format version is not supported
+    """
+    with io.open(path, "rb") as f:
+        magic = f.read(len(BINARY_MAGIC))
+        if magic != BINARY_MAGIC:
+            raise ValueError("Not a binary snips nlu file: %s" % path)
+        header_size = _HEADER_SIZE_STRUCT.unpack(
+            f.read(_HEADER_SIZE_STRUCT.size))[0]
+        header = json.loads(f.read(header_size).decode("utf8"))
+        data_start = _align(
+            len(BINARY_MAGIC) + _HEADER_SIZE_STRUCT.size + header_size)
+        if header["format_version"] != BINARY_FORMAT_VERSION:
+            raise ValueError(
+                "Incompatible binary format: persisted file=%s, python lib=%s"
+                % (header["format_version"], BINARY_FORMAT_VERSION))
+        arrays_descriptions = header["arrays"]
+        if not arrays_descriptions:
+            buf = None
+        elif mmap:
+            buf = np.memmap(f, dtype=np.uint8, mode="r")
+        else:
+            f.seek(0)
+            buf = np.frombuffer(f.read(), dtype=np.uint8)
+
+    arrays = []
+    for description in arrays_descriptions:
+        dtype = np.dtype(str(description["dtype"]))
+        shape = tuple(description["shape"])
+        size = int(np.prod(shape)) * dtype.itemsize
+        start = data_start + description["offset"]
+        array = buf[start:start + size].view(dtype).reshape(shape)
+        arrays.append(array)
+    return _restore_arrays(header["unit"], arrays)
+
+
+def is_binary_file(path):
+    """Whether or not the file has been written by :func:`dump_binary`"""
+    with io.open(path, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def _extract_arrays(obj, arrays):
+    if isinstance(obj, dict):
+        return {k: _extract_arrays(v, arrays) for k, v in iteritems(obj)}
+    if isinstance(obj, list):
+        array = _to_float_array(obj)
+        if array is None:
+            return [_extract_arrays(v, arrays) for v in obj]
+        arrays.append(array)
+        return {ARRAY_KEY: len(arrays) - 1}
+    if isinstance(obj, np.ndarray):
+        arrays.append(np.ascontiguousarray(obj))
+        return {ARRAY_KEY: len(arrays) - 1}
+    return obj
+
+
+def _restore_arrays(obj, arrays):
+    if isinstance(obj, dict):
+        if len(obj) == 1 and ARRAY_KEY in obj:
+            return arrays[obj[ARRAY_KEY]]
+        return {k: _restore_arrays(v, arrays) for k, v in iteritems(obj)}
+    if isinstance(obj, list):
+        return [_restore_arrays(v, arrays) for v in obj]
+    return obj
+
+
+def _to_float_array(values):
+    # Only non-empty and rectangular lists of floats are stored as arrays, so
+    # that lists of integers, such as the feature offsets in the configs, are
+    # kept as is
+    leaf = values
+    while isinstance(leaf, list):
+        if not leaf:
+            return None
+        leaf = leaf[0]
+    if not isinstance(leaf, float):
+        return None
+    try:
+        array = np.asarray(values)
+    except ValueError:
+        return None
+    if array.dtype != np.float64:
+        return None
+    return array
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _write_padding(f, position):
+    current_position = f.tell()
+    if position > current_position:
+        f.write(b"\0" * (position - current_position))
@@ -0,0 +1,294 @@
+from __future__ import division
+from __future__ import unicode_literals
+
+import struct
+from builtins import object, range
+
+import numpy as np
+from future.utils import iteritems, string_types
+
+
+class CRFDecoder(object):
+    """Pure NumPy inference for a linear-chain CRF trained with crfsuite
+
+    The state and transition weights of the crfsuite model are extracted once
+    into dense arrays, the rows of the state weights being indexed by the
+    crfsuite attributes. Decoding and scoring are then done in memory, without
+    going through the crfsuite tagger.
+
+    The weights are read from the binary crfsuite model as they are stored,
+    hence probabilities computed here match the crfsuite ones.
+    """
+
+    def __init__(self, labels, attributes, state_weights, transition_weights):
+        self.labels = labels
+        self.attributes = attributes
+        self.state_weights = state_weights
+        self.transition_weights = transition_weights
+        self._labels_indexes = {label: i for i, label in enumerate(labels)}
+
+    @classmethod
+    def from_model_data(cls, model_data):
+        """Creates a :class:`CRFDecoder` from the content of a binary crfsuite
+        model file"""
+        labels, attributes, features = _read_crfsuite_model(model_data)
+        attributes = {attribute: i for i, attribute in enumerate(attributes)}
+        state_weights = np.zeros((len(attributes), len(labels)))
+        transition_weights = np.zeros((len(labels), len(labels)))
+        states = features[features["type"] == _STATE_FEATURE]
+        state_weights[states["source"], states["target"]] = states["weight"]
+        transitions = features[features["type"] == _TRANSITION_FEATURE]
+        transition_weights[transitions["source"], transitions["target"]] = \
+            transitions["weight"]
+        return cls(labels, attributes, state_weights, transition_weights)
+
+    def to_dict(self):
+        """Returns a dict in which the weights are arrays, meant to be
+        persisted in the binary format, see :func:`.dump_binary`"""
+        attributes = sorted(self.attributes, key=self.attributes.get)
+        return {
+            "labels": self.labels,
+            "attributes": attributes,
+            "state_weights": self.state_weights,
+            "transition_weights": self.transition_weights
+        }
+
+    @classmethod
+    def from_dict(cls, obj_dict):
+        """Creates a :class:`CRFDecoder` from a dict generated with
+        :func:`~CRFDecoder.to_dict`
+
+        The weights are used without being copied when they are already
+        arrays, which is the case when they are loaded from a binary file.
+        """
+        attributes = {attribute: i for i, attribute
+                      in enumerate(obj_dict["attributes"])}
+        labels = obj_dict["labels"]
+        state_weights = np.asarray(obj_dict["state_weights"]).reshape(
+            (len(attributes), len(labels)))
+        transition_weights = np.asarray(
+            obj_dict["transition_weights"]).reshape((len(labels), len(labels)))
+        return cls(labels, attributes, state_weights, transition_weights)
+
+    def feature_index(self, feature_names):
+        """Maps each (feature name, feature value) pair known by the model to
+        the index of its attribute
+
+        Args:
+            feature_names (iterable of str): Names of the CRF features
+
+        Returns:
+            dict: Mapping from feature name to a dict mapping each feature
+            value to an attribute index. Numeric features, which do not have
+            a value in their attribute, are stored under the *None* key.
+        """
+        feature_names = set(feature_names)
+        index = {name: dict() for name in feature_names}
+        for attribute, attribute_index in iteritems(self.attributes):
+            if attribute in feature_names:
+                index[attribute][None] = attribute_index
+            separator = attribute.find(":")
+            while separator != -1:
+                name = attribute[:separator]
+                if name in feature_names:
+                    value = attribute[separator + 1:]
+                    index[name][value] = attribute_index
+                separator = attribute.find(":", separator + 1)
+        return index
+
+    def index_features(self, features):
+        """Converts features in the format used by
+        :class:`sklearn_crfsuite.CRF` to indexed features
+
+        The indexed features of a token are a pair of arrays containing
+        respectively the indexes and the weights of its attributes. Attributes
+        unknown to the model are dropped.
+        """
+        indexed_features = []
+        for token_features in features:
+            indexes = []
+            weights = []
+            for name, value in iteritems(token_features):
+                attribute, weight = _to_attribute(name, value)
+                index = self.attributes.get(attribute)
+                if index is not None:
+                    indexes.append(index)
+                    weights.append(weight)
+            indexed_features.append(
+                (np.array(indexes, dtype=np.int64), np.array(weights)))
+        return indexed_features
+
+    def predict_single(self, features):
+        """Returns the most likely sequence of labels, using the Viterbi
+        algorithm
+
+        Args:
+            features (list of dict): Features of each token, in the format
+                used by :class:`sklearn_crfsuite.CRF`
+        """
+        return self.decode(self.index_features(features))
+
+    def probability(self, features, labels):
+        """Returns the conditional probability of the sequence of *labels*
+        given the *features*"""
+        return self.sequence_probability(self.index_features(features),
+                                         labels)
+
+    def decode(self, indexed_features):
+        """Same as :meth:`predict_single` but with indexed features, see
+        :meth:`index_features`"""
+        if not indexed_features:
+            return []
+        scores = self._state_scores(indexed_features)
+        num_tokens = scores.shape[0]
+        backpointers = np.zeros(scores.shape, dtype=np.int64)
+        best_scores = scores[0]
+        for i in range(1, num_tokens):
+            candidates = best_scores[:, np.newaxis] + self.transition_weights
+            backpointers[i] = candidates.argmax(axis=0)
+            best_scores = candidates.max(axis=0) + scores[i]
+        best_index = int(best_scores.argmax())
+        path = [best_index]
+        for i in range(num_tokens - 1, 0, -1):
+            best_index = int(backpointers[i, best_index])
+            path.append(best_index)
+        return [self.labels[i] for i in reversed(path)]
+
+    def constrained_decode(self, indexed_features, segments):
+        """Returns the most likely sequence of labels among the ones allowed
+        by the *segments*, using a constrained Viterbi algorithm
+
+        Args:
+            indexed_features (list): Indexed features of the tokens, see
+                :meth:`index_features`
+            segments (list of list of list of str): Consecutive segments of
+                tokens covering the whole sequence, each one being described
+                by its candidate sequences of labels, which must all have the
+                length of the segment
+
+        Returns:
+            list of int: The index of the best candidate of each segment
+        """
+        if not segments:
+            return []
+        scores = self._state_scores(indexed_features)
+        backpointers = []
+        best_scores = None
+        last_indexes = None
+        start = 0
+        for candidates in segments:
+            end = start + len(candidates[0])
+            candidates_scores = np.array(
+                [self._sequence_score(scores[start:end], candidate)
+                 for candidate in candidates])
+            first_indexes = [self._labels_indexes[candidate[0]]
+                             for candidate in candidates]
+            if best_scores is None:
+                best_scores = candidates_scores
+            else:
+                transitions = self.transition_weights[
+                    np.ix_(last_indexes, first_indexes)]
+                paths_scores = best_scores[:, np.newaxis] + transitions
+                backpointers.append(paths_scores.argmax(axis=0))
+                best_scores = paths_scores.max(axis=0) + candidates_scores
+            last_indexes = [self._labels_indexes[candidate[-1]]
+                            for candidate in candidates]
+            start = end
+        best_index = int(best_scores.argmax())
+        path = [best_index]
+        for segment_backpointers in reversed(backpointers):
+            best_index = int(segment_backpointers[best_index])
+            path.append(best_index)
+        return list(reversed(path))
+
+    def sequence_probability(self, indexed_features, labels):
+        """Same as :meth:`probability` but with indexed features, see
+        :meth:`index_features`"""
+        if not indexed_features:
+            return 1.0
+        scores = self._state_scores(indexed_features)
+        return np.exp(self._sequence_score(scores, labels)
+                      - self._log_partition(scores))
+
+    def _sequence_score(self, scores, labels):
+        indexes = [self._labels_indexes[label] for label in labels]
+        score = scores[np.arange(len(indexes)), indexes].sum()
+        for i in range(1, len(indexes)):
+            score += self.transition_weights[indexes[i - 1], indexes[i]]
+        return score
+
+    def _log_partition(self, scores):
+        alpha = scores[0]
+        for i in range(1, scores.shape[0]):
+            alpha = _log_sum_exp(
+                alpha[:, np.newaxis] + self.transition_weights) + scores[i]
+        return _log_sum_exp(alpha[:, np.newaxis])[0]
+
+    def _state_scores(self, indexed_features):
+        scores = np.zeros((len(indexed_features), len(self.labels)))
+        for i, (indexes, weights) in enumerate(indexed_features):
+            if indexes.size:
+                scores[i] = np.dot(weights, self.state_weights[indexes])
+        return scores
+
+
+# Layout of the binary crfsuite models, see the crf1d_model.c and cqdb.c
+# files of crfsuite
+_MODEL_MAGIC = b"lCRF"
+_FEATURES_CHUNK = b"FEAT"
+_CQDB_CHUNK = b"CQDB"
+_STATE_FEATURE = 0
+_TRANSITION_FEATURE = 1
+_FEATURE_DTYPE = np.dtype([
+    ("type", "<u4"),
+    ("source", "<u4"),
+    ("target", "<u4"),
+    ("weight", "<f8")
+])
+
+
+def _read_crfsuite_model(model_data):
+    model_data = bytes(model_data)
+    if model_data[:4] != _MODEL_MAGIC:
+        raise ValueError("Invalid crfsuite model")
+    features_offset, labels_offset, attributes_offset = struct.unpack_from(
+        "<3I", model_data, 28)
+    if model_data[features_offset:features_offset + 4] != _FEATURES_CHUNK:
+        raise ValueError("Invalid crfsuite model")
+    num_features, = struct.unpack_from("<I", model_data, features_offset + 8)
+    features = np.frombuffer(model_data, dtype=_FEATURE_DTYPE,
+                             count=num_features, offset=features_offset + 12)
+    labels = _read_cqdb_strings(model_data, labels_offset)
+    attributes = _read_cqdb_strings(model_data, attributes_offset)
+    return labels, attributes, features
+
+
+def _read_cqdb_strings(model_data, offset):
+    # Strings of a CQDB chunk are listed by id in its backward array
+    if model_data[offset:offset + 4] != _CQDB_CHUNK:
+        raise ValueError("Invalid crfsuite model")
+    num_strings, backward_offset = struct.unpack_from(
+        "<2I", model_data, offset + 16)
+    records_offsets = struct.unpack_from(
+        "<%dI" % num_strings, model_data, offset + backward_offset)
+    strings = []
+    for record_offset in records_offsets:
+        start = offset + record_offset
+        # The key size includes a trailing null byte
+        key_size, = struct.unpack_from("<I", model_data, start + 4)
+        strings.append(
+            model_data[start + 8:start + 7 + key_size].decode("utf8"))
+    return strings
+
+
+def _to_attribute(name, value):
+    # Reproduces the conversion of dict features done by pycrfsuite
+    if isinstance(value, string_types):
+        return "%s:%s" % (name, value), 1.0
+    return name, float(value)
+
+
+def _log_sum_exp(values):
+    # Column-wise log-sum-exp
+    max_values = values.max(axis=0)
+    return max_values + np.log(np.exp(values - max_values).sum(axis=0))
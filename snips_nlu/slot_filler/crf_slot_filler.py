@@ -6,31 +6,37 @@ import io
 import math
 import os
 import tempfile
-from builtins import range
+import threading
+from builtins import range, zip
 from copy import copy
 from itertools import groupby, permutations, product
 
-from future.utils import iteritems
-from sklearn_crfsuite import CRF
+import numpy as np
+from future.utils import iteritems, string_types
 
-from snips_nlu.builtin_entities import is_builtin_entity, get_builtin_entities
+from snips_nlu.builtin_entities import is_builtin_entity
 from snips_nlu.constants import (
     RES_MATCH_RANGE, LANGUAGE, DATA, RES_ENTITY, START, END, RES_VALUE,
     ENTITY_KIND)
 from snips_nlu.data_augmentation import augment_utterances
 from snips_nlu.dataset import validate_and_format_dataset
 from snips_nlu.pipeline.configs import CRFSlotFillerConfig
+from snips_nlu.pipeline.configs.slot_filler import NUMPY_BACKEND
 from snips_nlu.preprocessing import stem
+from snips_nlu.query import get_parsed_query
 from snips_nlu.slot_filler.crf_utils import (
     TOKENS, TAGS, OUTSIDE, tags_to_slots, tag_name_to_slot_name,
     tags_to_preslots, positive_tagging, utterance_to_sample)
+from snips_nlu.slot_filler.crf_decoder import CRFDecoder
 from snips_nlu.slot_filler.feature import TOKEN_NAME
 from snips_nlu.slot_filler.feature_factory import get_feature_factory
 from snips_nlu.slot_filler.slot_filler import SlotFiller
-from snips_nlu.tokenization import Token, tokenize
+from snips_nlu.tokenization import Token
 from snips_nlu.utils import (
     UnupdatableDict, mkdir_p, check_random_state, get_slot_name_mapping,
-    ranges_overlap, NotTrained)
+    ranges_overlap, NotTrained, LRUCache)
+
+TOKEN_FEATURES_CACHE_CAPACITY = 1000
 
 
 class CRFSlotFiller(SlotFiller):
@@ -38,6 +44,12 @@ class CRFSlotFiller(SlotFiller):
 
     Check https://en.wikipedia.org/wiki/Conditional_random_field to learn
     more about CRFs
+
+    Note:
+        A fitted slot filler can be used concurrently by several threads:
+        with the crfsuite inference backend, the threads share a single
+        tagger which is used by one thread at a time, while the numpy backend
+        does not hold any state.
     """
 
     unit_name = "crf_slot_filler"
@@ -51,9 +63,17 @@ class CRFSlotFiller(SlotFiller):
             config = self.config_type()
         super(CRFSlotFiller, self).__init__(config)
         self.crf_model = None
+        self.crf_decoder = None
+        self._crf_model_data = None
+        self._feature_index = None
+        self._lattice_decoder = None
+        self._labels = None
+        self._tagger_lock = threading.Lock()
+        self._lattice_decoder_lock = threading.Lock()
         self.features_factories = [get_feature_factory(conf) for conf in
                                    config.feature_factory_configs]
         self._features = None
+        self._token_features_cache = LRUCache(TOKEN_FEATURES_CACHE_CAPACITY)
         self.language = None
         self.intent = None
         self.slot_name_mapping = None
@@ -62,14 +82,17 @@ class CRFSlotFiller(SlotFiller):
     def features(self):
         """List of :class:`.Feature` used by the CRF"""
         if self._features is None:
-            self._features = []
+            # The features are assigned once complete, as they may be built
+            # concurrently by several threads
+            features = []
             feature_names = set()
             for factory in self.features_factories:
                 for feature in factory.build_features():
                     if feature.name in feature_names:
                         raise KeyError("Duplicated feature: %s" % feature.name)
                     feature_names.add(feature.name)
-                    self._features.append(feature)
+                    features.append(feature)
+            self._features = features
         return self._features
 
     @property
@@ -80,15 +103,25 @@ class CRFSlotFiller(SlotFiller):
         prefix which depends on the :class:`.TaggingScheme` that is used
         (BIO by default).
         """
+        if self._labels is not None:
+            return self._labels
+        # The labels are decoded once the slot filler is fitted or loaded
         labels = []
-        if self.crf_model.tagger_ is not None:
+        if self.crf_decoder is not None:
+            labels = [_decode_tag(label) for label in self.crf_decoder.labels]
+        elif self.crf_model is not None \
+                and self.crf_model.tagger_ is not None:
             labels = [_decode_tag(label) for label in
                       self.crf_model.tagger_.labels()]
+        if self.fitted:
+            self._labels = labels
         return labels
 
     @property
     def fitted(self):
         """Whether or not the slot filler has already been fitted"""
+        if self.crf_decoder is not None:
+            return True
         return self.crf_model is not None \
                and self.crf_model.tagger_ is not None
 
@@ -123,6 +156,7 @@ class CRFSlotFiller(SlotFiller):
 
         for factory in self.features_factories:
             factory.fit(dataset, intent)
+        self._token_features_cache.clear()
 
         # pylint: disable=C0103
         X = [self.compute_features(sample[TOKENS], drop_out=True)
@@ -133,6 +167,13 @@ class CRFSlotFiller(SlotFiller):
         # pylint: enable=C0103
         self.crf_model = _get_crf_model(self.config.crf_args)
         self.crf_model.fit(X, Y)
+        self.crf_decoder = None
+        self._crf_model_data = None
+        self._feature_index = None
+        self._lattice_decoder = None
+        self._labels = None
+        if self.config.inference_backend == NUMPY_BACKEND:
+            self.crf_decoder = _get_crf_decoder(self.crf_model)
         if verbose:
             self.print_weights()
 
@@ -151,12 +192,17 @@ class CRFSlotFiller(SlotFiller):
         """
         if not self.fitted:
             raise NotTrained("CRFSlotFiller must be fitted")
-        tokens = tokenize(text, self.language)
+        query = get_parsed_query(text, self.language)
+        tokens = query.stemmed_tokens
         if not tokens:
             return []
-        features = self.compute_features(tokens)
-        tags = [_decode_tag(tag) for tag in
-                self.crf_model.predict_single(features)]
+        features = self._compute_inference_features(tokens)
+        if self.crf_decoder is not None:
+            tags = self.crf_decoder.decode(features)
+        else:
+            with self._tagger_lock:
+                tags = self.crf_model.tagger_.tag(features)
+        tags = [_decode_tag(tag) for tag in tags]
         slots = tags_to_slots(text, tokens, tags, self.config.tagging_scheme,
                               self.slot_name_mapping)
 
@@ -168,7 +214,7 @@ class CRFSlotFiller(SlotFiller):
 
         # Replace tags corresponding to builtin entities by outside tags
         tags = _replace_builtin_tags(tags, builtin_slots_names)
-        return self._augment_slots(text, tokens, tags, builtin_slots_names)
+        return self._augment_slots(query, tokens, tags, builtin_slots_names)
 
     def compute_features(self, tokens, drop_out=False):
         """Compute features on the provided tokens
@@ -177,11 +223,15 @@ class CRFSlotFiller(SlotFiller):
         have a positive drop out ratio. This should only be used during
         training.
         """
-        tokens = [
-            Token(t.value, t.start, t.end,
-                  stem=stem(t.normalized_value, self.language))
-            for t in tokens]
+        tokens = self._stem_tokens(tokens)
         cache = [{TOKEN_NAME: token} for token in tokens]
+        for token_cache, token_features in zip(
+                cache, self._get_tokens_features(tokens)):
+            token_cache.update(token_features)
+        for base_name, values in iteritems(
+                self._compute_query_features(tokens)):
+            for token_cache, value in zip(cache, values):
+                token_cache[base_name] = value
         features = []
         random_state = check_random_state(self.config.random_seed)
         for i in range(len(tokens)):
@@ -196,6 +246,91 @@ class CRFSlotFiller(SlotFiller):
             features.append(token_features)
         return features
 
+    def _get_tokens_features(self, tokens):
+        # Position independent features only depend on the token, hence they
+        # are memoized across queries and then used for all the offsets
+        cache = self._token_features_cache
+        return [
+            cache.get_or_compute((t.value, t.normalized_value, t.stem),
+                                 lambda t=t: self._compute_token_features(t))
+            for t in tokens]
+
+    def _compute_token_features(self, token):
+        token_features = dict()
+        for feature in self.features:
+            if feature.position_independent \
+                    and feature.base_name not in token_features:
+                token_features[feature.base_name] = feature.function(
+                    [token], 0)
+        return token_features
+
+    def _compute_query_features(self, tokens):
+        # Some factories compute their features on the whole query at once
+        query_features = dict()
+        for factory in self.features_factories:
+            factory_features = factory.compute_query_features(tokens)
+            if factory_features is not None:
+                query_features.update(factory_features)
+        return query_features
+
+    def _stem_tokens(self, tokens):
+        # Tokens coming from a ParsedQuery are already stemmed
+        return [t if t.stem is not None else
+                Token(t.value, t.start, t.end,
+                      stem=stem(t.normalized_value, self.language))
+                for t in tokens]
+
+    def _compute_inference_features(self, tokens):
+        if self.crf_decoder is not None:
+            return self._compute_indexed_features(tokens)
+        return self.compute_features(tokens)
+
+    def _compute_indexed_features(self, tokens):
+        # Features are directly mapped to the attributes indexes of the CRF
+        # decoder: each feature function is called once per token whatever
+        # the number of offsets, and values unseen during training are
+        # dropped without building any intermediate feature dict
+        if self._feature_index is None:
+            self._feature_index = self.crf_decoder.feature_index(
+                feature.name for feature in self.features)
+        tokens = self._stem_tokens(tokens)
+        num_tokens = len(tokens)
+        indexes = [[] for _ in range(num_tokens)]
+        weights = [[] for _ in range(num_tokens)]
+        tokens_features = self._get_tokens_features(tokens)
+        base_features_values = self._compute_query_features(tokens)
+        for feature in self.features:
+            values_index = self._feature_index[feature.name]
+            if not values_index:
+                continue
+            values = base_features_values.get(feature.base_name)
+            if values is None:
+                if feature.position_independent:
+                    values = [token_features[feature.base_name]
+                              for token_features in tokens_features]
+                else:
+                    values = [feature.function(tokens, i)
+                              for i in range(num_tokens)]
+                base_features_values[feature.base_name] = values
+            offset = feature.offset
+            for i in range(max(0, -offset), min(num_tokens,
+                                                num_tokens - offset)):
+                value = values[i + offset]
+                if value is None:
+                    continue
+                if isinstance(value, string_types):
+                    attribute_index = values_index.get(value)
+                    weight = 1.0
+                else:
+                    attribute_index = values_index.get(None)
+                    weight = float(value)
+                if attribute_index is not None:
+                    indexes[i].append(attribute_index)
+                    weights[i].append(weight)
+        return [(np.array(token_indexes, dtype=np.int64),
+                 np.array(token_weights))
+                for token_indexes, token_weights in zip(indexes, weights)]
+
     def get_sequence_probability(self, tokens, labels):
         """Gives the joint probability of a sequence of tokens and CRF labels
 
@@ -209,22 +344,34 @@ class CRFSlotFiller(SlotFiller):
             however it can be used to compare a sequence of labels relatively
             to another one.
         """
-        features = self.compute_features(tokens)
+        features = self._compute_inference_features(tokens)
         return self._get_sequence_probability(features, labels)
 
     def _get_sequence_probability(self, features, labels):
         if not self.fitted:
             raise NotTrained("CRFSlotFiller must be fitted")
 
+        cleaned_labels = self._clean_labels(labels)
+        if self.crf_decoder is not None:
+            cleaned_labels = [l.decode("ascii") for l in cleaned_labels]
+            return self.crf_decoder.sequence_probability(features,
+                                                         cleaned_labels)
+        # The crfsuite tagger holds the sequence of features it works on, so
+        # it is used by one thread at a time. As pycrfsuite does not release
+        # the GIL while tagging, a tagger per thread would only cost memory.
+        with self._tagger_lock:
+            tagger = self.crf_model.tagger_
+            tagger.set(features)
+            return tagger.probability(cleaned_labels)
+
+    def _clean_labels(self, labels):
         # Use a default substitution label when a label was not seen during
         # training
-        substitution_label = OUTSIDE if OUTSIDE in self.labels else \
+        known_labels = set(self.labels)
+        substitution_label = OUTSIDE if OUTSIDE in known_labels else \
             self.labels[0]
-        cleaned_labels = [
-            _encode_tag(substitution_label if l not in self.labels else l)
-            for l in labels]
-        self.crf_model.tagger_.set(features)
-        return self.crf_model.tagger_.probability(cleaned_labels)
+        return [_encode_tag(l if l in known_labels else substitution_label)
+                for l in labels]
 
     def print_weights(self):
         """Print both the label-to-label and label-to-features weights"""
@@ -249,7 +396,8 @@ class CRFSlotFiller(SlotFiller):
     def _augment_slots(self, text, tokens, tags, builtin_slots_names):
         augmented_tags = tags
         scope = [self.slot_name_mapping[slot] for slot in builtin_slots_names]
-        builtin_entities = get_builtin_entities(text, self.language, scope)
+        query = get_parsed_query(text, self.language)
+        builtin_entities = query.builtin_entities_index.get_entities(scope)
 
         builtin_entities = _filter_overlapping_builtins(
             builtin_entities, tokens, tags, self.config.tagging_scheme)
@@ -264,6 +412,12 @@ class CRFSlotFiller(SlotFiller):
             related_slots = list(
                 set(s for s in builtin_slots_names if
                     self.slot_name_mapping[s] == entity))
+            if self.config.constrained_decoding:
+                if features is None:
+                    features = self._compute_lattice_features(tokens)
+                augmented_tags = self._decode_builtin_slots(
+                    features, augmented_tags, tokens_indexes, related_slots)
+                continue
             best_updated_tags = augmented_tags
             best_permutation_score = -1
 
@@ -280,7 +434,7 @@ class CRFSlotFiller(SlotFiller):
                     updated_tags[indexes[0]:indexes[-1] + 1] = \
                         sub_tags_sequence
                 if features is None:
-                    features = self.compute_features(tokens)
+                    features = self._compute_inference_features(tokens)
                 score = self._get_sequence_probability(features, updated_tags)
                 if score > best_permutation_score:
                     best_updated_tags = updated_tags
@@ -291,9 +445,64 @@ class CRFSlotFiller(SlotFiller):
                               self.slot_name_mapping)
         return _reconciliate_builtin_slots(text, slots, builtin_entities)
 
+    def _get_lattice_decoder(self):
+        if self.crf_decoder is not None:
+            return self.crf_decoder
+        with self._lattice_decoder_lock:
+            if self._lattice_decoder is None:
+                self._lattice_decoder = _get_crf_decoder(self.crf_model)
+            return self._lattice_decoder
+
+    def _compute_lattice_features(self, tokens):
+        features = self._compute_inference_features(tokens)
+        if self.crf_decoder is None:
+            features = self._get_lattice_decoder().index_features(features)
+        return features
+
+    def _decode_builtin_slots(self, features, tags, tokens_indexes,
+                              slots_names):
+        # The tags outside of the builtin entities are fixed, and each builtin
+        # entity is tagged either with one of the slot names or with outside
+        # tags. The best assignment is found with a single constrained Viterbi
+        # decoding, whatever the number of builtin entities.
+        spans = dict()
+        last_index = -1
+        for indexes in sorted(tokens_indexes, key=lambda ix: ix[:1]):
+            if not indexes or indexes[0] <= last_index:
+                continue
+            spans[indexes[0]] = indexes
+            last_index = indexes[-1]
+
+        segments = []
+        i = 0
+        while i < len(tags):
+            indexes = spans.get(i)
+            if indexes is None:
+                segments.append([[tags[i]]])
+                i += 1
+                continue
+            segments.append([
+                positive_tagging(self.config.tagging_scheme, slot_name,
+                                 len(indexes))
+                for slot_name in slots_names + [OUTSIDE]])
+            i = indexes[-1] + 1
+
+        distinct_tags = list(set(
+            tag for candidates in segments for candidate in candidates
+            for tag in candidate))
+        cleaned_tags = {
+            tag: cleaned_tag.decode("ascii") for tag, cleaned_tag in
+            zip(distinct_tags, self._clean_labels(distinct_tags))}
+        choices = self._get_lattice_decoder().constrained_decode(
+            features, [[[cleaned_tags[tag] for tag in candidate]
+                        for candidate in candidates]
+                       for candidates in segments])
+        return [tag for candidates, choice in zip(segments, choices)
+                for tag in candidates[choice]]
+
     def to_dict(self):
         """Returns a json-serializable dict"""
-        crf_model_data = None
+        crf_model_data = self._crf_model_data
 
         if self.crf_model is not None:
             crf_model_data = _serialize_crf_model(self.crf_model)
@@ -307,6 +516,21 @@ class CRFSlotFiller(SlotFiller):
             "config": self.config.to_dict(),
         }
 
+    @classmethod
+    def to_binary_dict(cls, unit_dict):
+        """Adds the dense weights of the CRF decoder to the unit dict when the
+        numpy inference backend is used, so that they are memory-mapped
+        instead of being read from the crfsuite model at loading"""
+        config = cls.config_type.from_dict(unit_dict["config"])
+        crf_model_data = unit_dict["crf_model_data"]
+        if config.inference_backend != NUMPY_BACKEND \
+                or crf_model_data is None:
+            return unit_dict
+        binary_dict = dict(unit_dict)
+        binary_dict["crf_decoder"] = _deserialize_crf_decoder(
+            crf_model_data).to_dict()
+        return binary_dict
+
     @classmethod
     def from_dict(cls, unit_dict):
         """Creates a :class:`CRFSlotFiller` instance from a dict
@@ -318,8 +542,22 @@ class CRFSlotFiller(SlotFiller):
 
         crf_model_data = unit_dict["crf_model_data"]
         if crf_model_data is not None:
-            crf = _deserialize_crf_model(crf_model_data)
-            slot_filler.crf_model = crf
+            if slot_filler_config.inference_backend == NUMPY_BACKEND:
+                # The crfsuite model is only kept in its serialized form, in
+                # order to be able to serialize the slot filler again. The
+                # decoder weights come with the dict when it is loaded from a
+                # binary file, see to_binary_dict.
+                crf_decoder_dict = unit_dict.get("crf_decoder")
+                if crf_decoder_dict is not None:
+                    slot_filler.crf_decoder = CRFDecoder.from_dict(
+                        crf_decoder_dict)
+                else:
+                    slot_filler.crf_decoder = _deserialize_crf_decoder(
+                        crf_model_data)
+                slot_filler._crf_model_data = crf_model_data
+            else:
+                crf = _deserialize_crf_model(crf_model_data)
+                slot_filler.crf_model = crf
         slot_filler.language = unit_dict["language_code"]
         slot_filler.intent = unit_dict["intent"]
         slot_filler.slot_name_mapping = unit_dict["slot_name_mapping"]
@@ -335,6 +573,8 @@ class CRFSlotFiller(SlotFiller):
 
 
 def _get_crf_model(crf_args):
+    from sklearn_crfsuite import CRF
+
     model_filename = crf_args.get("model_filename", None)
     if model_filename is not None:
         directory = os.path.dirname(model_filename)
@@ -455,6 +695,8 @@ def _serialize_crf_model(crf_model):
 
 
 def _deserialize_crf_model(crf_model_data):
+    from sklearn_crfsuite import CRF
+
     b64_data = base64.b64decode(crf_model_data)
     with tempfile.NamedTemporaryFile(suffix=".crfsuite", prefix="model",
                                      delete=False) as f:
@@ -462,3 +704,12 @@ def _deserialize_crf_model(crf_model_data):
         f.flush()
         crf = CRF(model_filename=f.name)
     return crf
+
+
+def _get_crf_decoder(crf_model):
+    with io.open(crf_model.modelfile.name, mode="rb") as f:
+        return CRFDecoder.from_model_data(f.read())
+
+
+def _deserialize_crf_decoder(crf_model_data):
+    return CRFDecoder.from_model_data(base64.b64decode(crf_model_data))
@@ -19,13 +19,18 @@ class Feature(object):
             the feature (e.g -1 for computing the feature on the previous word)
         drop_out (float, optional): Drop out to use when computing the
             feature during training
+        position_independent (bool, optional): Whether or not the feature
+            only depends on the value of the token, and not on its position
+            nor on the other tokens, which allows to memoize it across
+            queries
 
     Note:
         The easiest way to add additional features to the existing ones is
         to create a :class:`.CRFFeatureFactory`
     """
 
-    def __init__(self, base_name, func, offset=0, drop_out=0):
+    def __init__(self, base_name, func, offset=0, drop_out=0,
+                 position_independent=False):
         if base_name == TOKEN_NAME:
             raise ValueError("'%s' name is reserved" % TOKEN_NAME)
         self.offset = offset
@@ -34,6 +39,7 @@ class Feature(object):
         self.base_name = base_name
         self.function = func
         self.drop_out = drop_out
+        self.position_independent = position_independent
 
     @property
     def name(self):
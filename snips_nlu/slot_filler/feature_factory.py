@@ -1,23 +1,27 @@
 from __future__ import unicode_literals
 
+import hashlib
+import json
 from abc import ABCMeta, abstractmethod
-from builtins import map, object
+from builtins import object, range
 
 from future.utils import with_metaclass, iteritems
 from snips_nlu_utils import normalize
 from snips_nlu_ontology.builtin_entities import get_supported_entities
 
-from snips_nlu.builtin_entities import get_builtin_entities
+from snips_nlu.builtin_entities import get_builtin_entities_index
 from snips_nlu.constants import (
-    LANGUAGE, UTTERANCES, TOKEN_INDEXES, NGRAM, RES_MATCH_RANGE, START, END)
+    LANGUAGE, UTTERANCES, GAZETTEERS)
 from snips_nlu.languages import get_default_sep
-from snips_nlu.preprocessing import stem
-from snips_nlu.resources import get_gazetteer, get_word_clusters
+from snips_nlu.preprocessing import normalize_and_stem, stem
+from snips_nlu.resources import (
+    get_gazetteer, get_word_clusters, get_shared_resource)
 from snips_nlu.slot_filler.crf_utils import TaggingScheme, get_scheme_prefix
 from snips_nlu.slot_filler.feature import Feature
 from snips_nlu.slot_filler.features_utils import (
-    get_word_chunk, get_shape, get_all_ngrams, initial_string_from_tokens,
-    entity_filter, get_intent_custom_entities)
+    get_word_chunk, get_shape, initial_string_from_tokens,
+    get_intent_custom_entities)
+from snips_nlu.trie import TokenTrie
 
 
 class CRFFeatureFactory(with_metaclass(ABCMeta, object)):
@@ -64,10 +68,26 @@ class CRFFeatureFactory(with_metaclass(ABCMeta, object)):
         """Build a list of :class:`.Feature`"""
         pass
 
+    def compute_query_features(self, tokens):
+        """Computes at once, on the whole sequence of *tokens*, the features
+        which are cheaper to compute together than token by token
+
+        Returns:
+            dict: Mapping from the base names of such features to the list of
+            their values for each token, or *None* when the features of the
+            factory are computed token by token
+        """
+        # pylint: disable=unused-argument
+        return None
+
 
 class SingleFeatureFactory(with_metaclass(ABCMeta, CRFFeatureFactory)):
     """A CRF feature factory which produces only one feature"""
 
+    # Whether or not the feature only depends on the value of the token, see
+    # :class:`.Feature`
+    position_independent = False
+
     @property
     def feature_name(self):
         # by default, use the factory name
@@ -83,7 +103,9 @@ class SingleFeatureFactory(with_metaclass(ABCMeta, CRFFeatureFactory)):
                 base_name=self.feature_name,
                 func=self.compute_feature,
                 offset=offset,
-                drop_out=self.drop_out) for offset in self.offsets
+                drop_out=self.drop_out,
+                position_independent=self.position_independent)
+            for offset in self.offsets
         ]
 
 
@@ -91,6 +113,7 @@ class IsDigitFactory(SingleFeatureFactory):
     """Feature: is the considered token a digit?"""
 
     name = "is_digit"
+    position_independent = True
 
     def compute_feature(self, tokens, token_index):
         return "1" if tokens[token_index].value.isdigit() else None
@@ -122,6 +145,7 @@ class PrefixFactory(SingleFeatureFactory):
     """
 
     name = "prefix"
+    position_independent = True
 
     @property
     def feature_name(self):
@@ -144,6 +168,7 @@ class SuffixFactory(SingleFeatureFactory):
     """
 
     name = "suffix"
+    position_independent = True
 
     @property
     def feature_name(self):
@@ -163,6 +188,7 @@ class LengthFactory(SingleFeatureFactory):
     """Feature: the length (characters) of the considered token"""
 
     name = "length"
+    position_independent = True
 
     def compute_feature(self, tokens, token_index):
         return len(tokens[token_index].value)
@@ -194,9 +220,9 @@ class NgramFactory(SingleFeatureFactory):
         self.use_stemming = self.args["use_stemming"]
         self.common_words_gazetteer_name = self.args[
             "common_words_gazetteer_name"]
+        self.gazetteer = None
         self._language = None
         self.language = self.args.get("language_code")
-        self.gazetteer = None
 
     @property
     def language(self):
@@ -208,11 +234,23 @@ class NgramFactory(SingleFeatureFactory):
             self._language = value
             self.args["language_code"] = self.language
             if self.common_words_gazetteer_name is not None:
-                gazetteer = get_gazetteer(self.language,
-                                          self.common_words_gazetteer_name)
-                if self.use_stemming:
-                    gazetteer = set(stem(w, self.language) for w in gazetteer)
-                self.gazetteer = gazetteer
+                # The stemmed gazetteer is shared by the factories of all the
+                # slot fillers
+                self.gazetteer = get_shared_resource(
+                    self.language,
+                    "%s_%s" % (GAZETTEERS, self.common_words_gazetteer_name),
+                    self.use_stemming, self._build_gazetteer)
+
+    def _build_gazetteer(self):
+        gazetteer = get_gazetteer(self.language,
+                                  self.common_words_gazetteer_name)
+        if self.use_stemming:
+            gazetteer = set(stem(w, self.language) for w in gazetteer)
+        return gazetteer
+
+    @property
+    def position_independent(self):
+        return self.n == 1
 
     @property
     def feature_name(self):
@@ -276,6 +314,10 @@ class ShapeNgramFactory(SingleFeatureFactory):
             self._language = value
             self.args["language_code"] = value
 
+    @property
+    def position_independent(self):
+        return self.n == 1
+
     @property
     def feature_name(self):
         return "shape_ngram_%s" % self.n
@@ -307,6 +349,7 @@ class WordClusterFactory(SingleFeatureFactory):
     """
 
     name = "word_cluster"
+    position_independent = True
 
     def __init__(self, factory_config):
         super(WordClusterFactory, self).__init__(factory_config)
@@ -337,8 +380,7 @@ class WordClusterFactory(SingleFeatureFactory):
     def compute_feature(self, tokens, token_index):
         normalized_value = tokens[token_index].stem if self.use_stemming \
             else tokens[token_index].normalized_value
-        cluster = get_word_clusters(self.language)[self.cluster_name]
-        return cluster.get(normalized_value, None)
+        return self.cluster.get(normalized_value, None)
 
 
 class EntityMatchFactory(CRFFeatureFactory):
@@ -364,6 +406,7 @@ class EntityMatchFactory(CRFFeatureFactory):
         self.tagging_scheme = TaggingScheme(
             self.args["tagging_scheme_code"])
         self.collections = self.args.get("collections")
+        self._entities_trie = None
         self._language = None
         self.language = self.args.get("language_code")
 
@@ -379,11 +422,12 @@ class EntityMatchFactory(CRFFeatureFactory):
 
     def fit(self, dataset, intent):
         self.language = dataset[LANGUAGE]
+        self._entities_trie = None
 
         def preprocess(string):
-            normalized = normalize(string)
-            return stem(normalized, self.language) if self.use_stemming \
-                else normalized
+            if self.use_stemming:
+                return normalize_and_stem(string, self.language)
+            return normalize(string)
 
         intent_entities = get_intent_custom_entities(dataset, intent)
         self.collections = dict()
@@ -400,10 +444,9 @@ class EntityMatchFactory(CRFFeatureFactory):
 
     def build_features(self):
         features = []
-        for name, collection in iteritems(self.collections):
-            # We need to call this wrapper in order to properly capture
-            # `collection`
-            collection_match = self._build_collection_match_fn(collection)
+        for name in self.collections:
+            # We need to call this wrapper in order to properly capture `name`
+            collection_match = self._build_collection_match_fn(name)
 
             for offset in self.offsets:
                 feature = Feature("entity_match_%s" % name,
@@ -411,25 +454,63 @@ class EntityMatchFactory(CRFFeatureFactory):
                 features.append(feature)
         return features
 
-    def _build_collection_match_fn(self, collection):
-        collection_set = set(collection)
-
+    def _build_collection_match_fn(self, name):
         def collection_match(tokens, token_index):
-            normalized_tokens = list(map(self._transform, tokens))
-            ngrams = get_all_ngrams(normalized_tokens)
-            ngrams = [ngram for ngram in ngrams if
-                      token_index in ngram[TOKEN_INDEXES]]
-            ngrams = sorted(ngrams, key=lambda ng: len(ng[TOKEN_INDEXES]),
-                            reverse=True)
-            for ngram in ngrams:
-                if ngram[NGRAM] in collection_set:
-                    return get_scheme_prefix(token_index,
-                                             sorted(ngram[TOKEN_INDEXES]),
-                                             self.tagging_scheme)
-            return None
+            return self._compute_tokens_matches(tokens)[token_index].get(name)
 
         return collection_match
 
+    def compute_query_features(self, tokens):
+        # The features of all the entities are computed in a single scan of
+        # the query, see _compute_tokens_matches
+        tokens_matches = self._compute_tokens_matches(tokens)
+        return {
+            "entity_match_%s" % name: [token_matches.get(name)
+                                       for token_matches in tokens_matches]
+            for name in self.collections
+        }
+
+    def _get_entities_trie(self):
+        # All the collections are compiled in a single trie, which is shared
+        # by the slot fillers of the intents having the same entities
+        if self._entities_trie is None:
+            entities = sorted((name, sorted(collection)) for name, collection
+                              in iteritems(self.collections))
+            digest = hashlib.sha1(json.dumps(entities).encode("utf8"))
+            self._entities_trie = get_shared_resource(
+                self.language, "entities_trie_%s" % digest.hexdigest(),
+                self.use_stemming, lambda: _build_entities_trie(entities))
+        return self._entities_trie
+
+    def _compute_tokens_matches(self, tokens):
+        # Each token is matched, for each entity, with the longest entity
+        # value containing it, or the first one in case of tie
+        normalized_tokens = [self._transform(t) for t in tokens]
+        trie = self._get_entities_trie()
+        best_matches = [dict() for _ in normalized_tokens]
+        for start in range(len(normalized_tokens)):
+            for end, names in trie.prefix_matches(normalized_tokens, start):
+                for name in names:
+                    for i in range(start, end):
+                        match = best_matches[i].get(name)
+                        if match is None or match[1] - match[0] < end - start:
+                            best_matches[i][name] = (start, end)
+        return [
+            {name: get_scheme_prefix(i, list(range(start, end)),
+                                     self.tagging_scheme)
+             for name, (start, end) in iteritems(token_matches)}
+            for i, token_matches in enumerate(best_matches)]
+
+
+def _build_entities_trie(entities):
+    trie = TokenTrie()
+    for name, collection in entities:
+        for value in collection:
+            # Entity values are already normalized, or stemmed, and their
+            # tokens are joined with spaces
+            trie.add(value.split(" "), name)
+    return trie
+
 
 class BuiltinEntityMatchFactory(CRFFeatureFactory):
     """Features: is the considered token part of a builtin entity such as a
@@ -488,23 +569,13 @@ class BuiltinEntityMatchFactory(CRFFeatureFactory):
 
         def builtin_entity_match(tokens, token_index):
             text = initial_string_from_tokens(tokens)
-            start = tokens[token_index].start
-            end = tokens[token_index].end
-
-            builtin_entities = get_builtin_entities(
-                text, self.language, scope=[builtin_entity])
-            builtin_entities = [ent for ent in builtin_entities
-                                if entity_filter(ent, start, end)]
-            for ent in builtin_entities:
-                entity_start = ent[RES_MATCH_RANGE][START]
-                entity_end = ent[RES_MATCH_RANGE][END]
-                indexes = []
-                for index, token in enumerate(tokens):
-                    if (entity_start <= token.start < entity_end) \
-                            and (entity_start < token.end <= entity_end):
-                        indexes.append(index)
-                return get_scheme_prefix(token_index, indexes,
-                                         self.tagging_scheme)
+            index = get_builtin_entities_index(text, self.language)
+            indexes = index.get_tokens_entities(
+                builtin_entity, tokens)[token_index]
+            if indexes is None:
+                return None
+            return get_scheme_prefix(token_index, indexes,
+                                     self.tagging_scheme)
 
         return builtin_entity_match
 
@@ -3,19 +3,16 @@ from __future__ import unicode_literals
 from snips_nlu_utils import compute_all_ngrams
 
 from snips_nlu.builtin_entities import is_builtin_entity
-from snips_nlu.constants import (
-    RES_MATCH_RANGE, INTENTS, UTTERANCES, DATA, ENTITY, ENTITIES, END, START)
-from snips_nlu.utils import LimitedSizeDict
+from snips_nlu.constants import INTENTS, UTTERANCES, DATA, ENTITY, ENTITIES
+from snips_nlu.utils import get_cache
 
-_NGRAMS_CACHE = LimitedSizeDict(size_limit=1000)
+_NGRAMS_CACHE = get_cache("ngrams")
 
 
 def get_all_ngrams(tokens):
     key = "<||>".join(tokens)
-    if key not in _NGRAMS_CACHE:
-        ngrams = compute_all_ngrams(tokens, len(tokens))
-        _NGRAMS_CACHE[key] = ngrams
-    return _NGRAMS_CACHE[key]
+    return _NGRAMS_CACHE.get_or_compute(
+        key, lambda: compute_all_ngrams(tokens, len(tokens)))
 
 
 def get_shape(string):
@@ -52,13 +49,6 @@ def initial_string_from_tokens(tokens):
     return s
 
 
-def entity_filter(entity, start, end):
-    entity_start = entity[RES_MATCH_RANGE][START]
-    entity_end = entity[RES_MATCH_RANGE][END]
-    return (entity_start <= start < entity_end) \
-           and (entity_start < end <= entity_end)
-
-
 def get_intent_custom_entities(dataset, intent):
     intent_entities = set()
     for utterance in dataset[INTENTS][intent][UTTERANCES]:
@@ -9,7 +9,6 @@ from builtins import str
 from builtins import zip
 from future.utils import iteritems
 from snips_nlu_utils import normalize
-from num2words import num2words
 
 from snips_nlu.builtin_entities import get_builtin_entities
 from snips_nlu.constants import (
@@ -96,6 +95,8 @@ def digit_value(number_entity):
 
 
 def alphabetic_value(number_entity, language):
+    from num2words import num2words
+
     value = number_entity[ENTITY][VALUE]
     if value != int(value):  # num2words does not handle floats correctly
         return None
@@ -2,10 +2,15 @@ from __future__ import unicode_literals
 
 from snips_nlu_ontology import get_all_languages
 
+from mock import patch
+
 from snips_nlu.builtin_entities import (
-    get_builtin_entities, BuiltinEntityParser)
-from snips_nlu.constants import ENTITY_KIND
+    get_builtin_entities, BuiltinEntityParser, get_builtin_entities_index)
+from snips_nlu.constants import (
+    ENTITY_KIND, LANGUAGE_EN, SNIPS_DATETIME, SNIPS_NUMBER, START, END)
 from snips_nlu.tests.utils import SnipsTest
+from snips_nlu.tokenization import tokenize
+from snips_nlu.utils import LRUCache
 
 
 class TestBuiltInEntities(SnipsTest):
@@ -54,3 +59,49 @@ class TestBuiltInEntities(SnipsTest):
         # Then
         self.assertEqual(len(parse), 1)
         self.assertEqual(parse[0][ENTITY_KIND], "snips/number")
+
+    def test_should_index_builtin_entities(self):
+        # Given
+        text = "one tea tomorrow at 2pm"
+        tokens = tokenize(text, LANGUAGE_EN)
+        parser = BuiltinEntityParser(LANGUAGE_EN)
+
+        # When
+        # The indexes cache is shared by the parsers of a language, hence the
+        # parser gets a fresh one so that its index is not built by another
+        # test
+        with patch.object(parser, "parse", wraps=parser.parse) as mock_parse, \
+                patch.object(parser, "_indexes_cache", LRUCache(10)):
+            index = parser.get_index(text)
+            datetime_tokens_entities = index.get_tokens_entities(
+                SNIPS_DATETIME, tokens)
+            number_tokens_entities = index.get_tokens_entities(
+                SNIPS_NUMBER, tokens)
+            index.get_tokens_entities(SNIPS_NUMBER, tokens)
+            number_entity = index.get_entity(
+                SNIPS_NUMBER, {START: 0, END: 3}, scope=[SNIPS_NUMBER])
+            missing_entity = index.get_entity(
+                SNIPS_NUMBER, {START: 0, END: 7}, scope=[SNIPS_NUMBER])
+            cached_index = parser.get_index(text)
+
+        # Then
+        self.assertIs(index, cached_index)
+        self.assertEqual(2, mock_parse.call_count)
+        self.assertListEqual([(0,), None, (2, 3, 4), (2, 3, 4), (2, 3, 4)],
+                             datetime_tokens_entities)
+        self.assertListEqual([(0,), None, None, None, None],
+                             number_tokens_entities)
+        self.assertEqual(SNIPS_NUMBER, number_entity[ENTITY_KIND])
+        self.assertIsNone(missing_entity)
+
+    def test_should_share_builtin_entities_index(self):
+        # Given
+        text = "meet me at 10 p.m."
+
+        # When
+        index = get_builtin_entities_index(text, LANGUAGE_EN)
+
+        # Then
+        self.assertIs(index, get_builtin_entities_index(text, LANGUAGE_EN))
+        self.assertListEqual(get_builtin_entities(text, LANGUAGE_EN),
+                             index.get_entities())
@@ -0,0 +1,77 @@
+# coding=utf-8
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from snips_nlu.compact_storage import CompactStringMapping, CompactStringSet
+from snips_nlu.tests.utils import SnipsTest
+
+
+class TestCompactStorage(SnipsTest):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_compact_string_set_should_behave_as_set(self):
+        # Given
+        strings = {"hello", "world", "àéèç", "a"}
+
+        # When
+        compact_set = CompactStringSet.from_strings(strings)
+
+        # Then
+        self.assertEqual(4, len(compact_set))
+        self.assertSetEqual(strings, set(compact_set))
+        self.assertIn("àéèç", compact_set)
+        self.assertIn("a", compact_set)
+        self.assertNotIn("hell", compact_set)
+        self.assertNotIn("a very long string not in the set", compact_set)
+        self.assertNotIn(None, compact_set)
+
+    def test_compact_string_mapping_should_behave_as_dict(self):
+        # Given
+        dictionary = {"hello": "0110", "world": "111", "àéèç": "0110"}
+
+        # When
+        mapping = CompactStringMapping.from_dict(dictionary)
+
+        # Then
+        self.assertDictEqual(dictionary, dict(mapping))
+        self.assertEqual("0110", mapping["àéèç"])
+        self.assertEqual("111", mapping.get("world"))
+        self.assertIsNone(mapping.get("unknown"))
+        self.assertIn("hello", mapping)
+        self.assertNotIn("unknown", mapping)
+        with self.assertRaises(KeyError):
+            _ = mapping["unknown"]
+
+    def test_should_be_memory_mapped_from_file(self):
+        # Given
+        strings = {"hello", "world"}
+        dictionary = {"hello": "0110", "world": "111"}
+        set_path = os.path.join(self.tmp_dir, "set.bin")
+        mapping_path = os.path.join(self.tmp_dir, "mapping.bin")
+        CompactStringSet.from_strings(strings).to_file(set_path)
+        CompactStringMapping.from_dict(dictionary).to_file(mapping_path)
+
+        # When
+        compact_set = CompactStringSet.from_file(set_path)
+        mapping = CompactStringMapping.from_file(mapping_path)
+
+        # Then
+        self.assertSetEqual(strings, set(compact_set))
+        self.assertDictEqual(dictionary, dict(mapping))
+
+    def test_should_handle_empty_storage(self):
+        # When
+        compact_set = CompactStringSet.from_strings([])
+        mapping = CompactStringMapping.from_dict(dict())
+
+        # Then
+        self.assertEqual(0, len(compact_set))
+        self.assertNotIn("hello", compact_set)
+        self.assertIsNone(mapping.get("hello"))
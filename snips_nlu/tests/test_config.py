@@ -101,7 +101,9 @@ class TestConfig(SnipsTest):
             "exhaustive_permutations_threshold": 42,
             "data_augmentation_config":
                 SlotFillerDataAugmentationConfig().to_dict(),
-            "random_seed": 43
+            "random_seed": 43,
+            "inference_backend": "numpy",
+            "constrained_decoding": True
         }
 
         # When
@@ -118,6 +120,7 @@ class TestConfig(SnipsTest):
             "intent_classifier_config":
                 LogRegIntentClassifierConfig().to_dict(),
             "slot_filler_config": CRFSlotFillerConfig().to_dict(),
+            "n_jobs": 4
         }
 
         # When
@@ -0,0 +1,156 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+from builtins import range, zip
+from itertools import product
+
+import numpy as np
+from future.utils import iteritems
+from sklearn_crfsuite import CRF
+
+from snips_nlu.slot_filler.crf_decoder import CRFDecoder
+from snips_nlu.tests.utils import SnipsTest
+from snips_nlu.utils import check_random_state
+
+
+def _features(words):
+    return [{"word": word, "is_vowel": word in "ae", "position": i / 3.}
+            for i, word in enumerate(words)]
+
+
+def _labels(words):
+    return ["B" if word in "ab" else "I" if word == "c" else "O"
+            for word in words]
+
+
+class TestCRFDecoder(SnipsTest):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.random_state = check_random_state(42)
+        sequences = [self._random_words() for _ in range(200)]
+        x = [_features(words) for words in sequences]
+        y = [_labels(words) for words in sequences]
+        model_filename = os.path.join(self.tmp_dir, "model.crfsuite")
+        self.crf = CRF(model_filename=model_filename, c1=.1, c2=.1)
+        self.crf.fit(x, y)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _get_decoder(self):
+        with open(self.crf.modelfile.name, "rb") as f:
+            return CRFDecoder.from_model_data(f.read())
+
+    def _random_words(self, vocabulary="abcdef"):
+        length = self.random_state.randint(1, 7)
+        return [vocabulary[i] for i in
+                self.random_state.randint(len(vocabulary), size=length)]
+
+    def test_should_predict_like_crfsuite(self):
+        # Given
+        decoder = self._get_decoder()
+        sequences = [self._random_words("abcdefz") for _ in range(100)]
+
+        # When
+        predictions = [decoder.predict_single(_features(words))
+                       for words in sequences]
+
+        # Then
+        expected_predictions = [self.crf.predict_single(_features(words))
+                                for words in sequences]
+        self.assertListEqual(expected_predictions, predictions)
+        self.assertListEqual([], decoder.predict_single([]))
+
+    def test_should_read_weights_of_crfsuite_model(self):
+        # Given
+        decoder = self._get_decoder()
+        labels_indexes = {label: i for i, label in enumerate(decoder.labels)}
+
+        # Then
+        # The weights exposed by sklearn_crfsuite are rounded to 6 decimals
+        self.assertListEqual(list(self.crf.tagger_.labels()), decoder.labels)
+        for (label_from, label_to), weight in iteritems(
+                self.crf.transition_features_):
+            self.assertAlmostEqual(weight, decoder.transition_weights[
+                labels_indexes[label_from], labels_indexes[label_to]],
+                                   delta=1e-6)
+        for (attribute, label), weight in iteritems(
+                self.crf.state_features_):
+            self.assertAlmostEqual(weight, decoder.state_weights[
+                decoder.attributes[attribute], labels_indexes[label]],
+                                   delta=1e-6)
+
+    def test_should_compute_probability_like_crfsuite(self):
+        # Given
+        decoder = self._get_decoder()
+        tagger = self.crf.tagger_
+
+        for _ in range(100):
+            words = self._random_words("abcdefz")
+            features = _features(words)
+            labels = [["B", "I", "O"][i] for i in
+                      self.random_state.randint(3, size=len(words))]
+
+            # When
+            probability = decoder.probability(features, labels)
+
+            # Then
+            tagger.set(features)
+            self.assertAlmostEqual(tagger.probability(labels), probability,
+                                   places=10)
+
+    def test_should_decode_best_candidates_of_segments(self):
+        # Given
+        decoder = self._get_decoder()
+        candidates_pool = [
+            [["O"]],
+            [["B"], ["I"], ["O"]],
+            [["B", "I"], ["O", "O"]],
+            [["B", "I", "I"], ["I", "I", "I"], ["O", "O", "O"]]
+        ]
+
+        for _ in range(50):
+            segments = [candidates_pool[i] for i in
+                        self.random_state.randint(4, size=3)]
+            length = sum(len(candidates[0]) for candidates in segments)
+            words = [self._random_words("abcdefz")[0] for _ in range(length)]
+            features = decoder.index_features(_features(words))
+
+            # When
+            choices = decoder.constrained_decode(features, segments)
+
+            # Then
+            def _score(indexes):
+                labels = [label for candidates, i in zip(segments, indexes)
+                          for label in candidates[i]]
+                return decoder.sequence_probability(features, labels)
+
+            expected_choices = max(
+                product(*(range(len(candidates)) for candidates in segments)),
+                key=_score)
+            self.assertAlmostEqual(_score(expected_choices), _score(choices))
+        self.assertListEqual([], decoder.constrained_decode([], []))
+
+    def test_should_be_serializable(self):
+        # Given
+        decoder = self._get_decoder()
+        sequences = [self._random_words("abcdefz") for _ in range(20)]
+
+        # When
+        decoder_dict = decoder.to_dict()
+        deserialized_decoder = CRFDecoder.from_dict(decoder_dict)
+
+        # Then
+        self.assertListEqual(decoder.labels, deserialized_decoder.labels)
+        self.assertDictEqual(decoder.attributes,
+                             deserialized_decoder.attributes)
+        np.testing.assert_array_equal(decoder.state_weights,
+                                      deserialized_decoder.state_weights)
+        np.testing.assert_array_equal(decoder.transition_weights,
+                                      deserialized_decoder.transition_weights)
+        for words in sequences:
+            self.assertListEqual(
+                decoder.predict_single(_features(words)),
+                deserialized_decoder.predict_single(_features(words)))
@@ -1,6 +1,7 @@
 # coding=utf-8
 from __future__ import unicode_literals
 
+from builtins import range
 from copy import deepcopy
 
 from mock import patch, MagicMock
@@ -298,6 +299,30 @@ class TestCRFFeatures(SnipsTest):
         self.assertEqual(features[0].base_name, "ngram_2")
         self.assertEqual(res, "beautiful rare_word")
 
+    @patch("snips_nlu.slot_filler.feature_factory.get_gazetteer")
+    def test_ngram_factories_should_share_gazetteer(self, mock_get_gazetteer):
+        # Given
+        config = {
+            "factory_name": "ngram",
+            "args": {
+                "n": 1,
+                "use_stemming": False,
+                "common_words_gazetteer_name": "mocked_shared_gazetteer",
+                "language_code": LANGUAGE_EN
+            },
+            "offsets": [0]
+        }
+        mock_get_gazetteer.side_effect = lambda language, name: {"hello"}
+
+        # When
+        factory_1 = get_feature_factory(deepcopy(config))
+        factory_2 = get_feature_factory(deepcopy(config))
+
+        # Then
+        self.assertIs(factory_1.gazetteer, factory_2.gazetteer)
+        mock_get_gazetteer.assert_called_once_with(
+            LANGUAGE_EN, "mocked_shared_gazetteer")
+
     def test_shape_ngram_factory(self):
         # Given
         config = {
@@ -416,6 +441,70 @@ class TestCRFFeatures(SnipsTest):
         self.assertEqual(res8, None)
         self.assertEqual(res9, UNIT_PREFIX)
 
+    def test_entity_match_factory_should_use_longest_matches(self):
+        # Given
+        config = {
+            "factory_name": "entity_match",
+            "args": {
+                "tagging_scheme_code": TaggingScheme.BIO.value,
+                "use_stemming": False,
+                "collections": {
+                    "entity_1": ["a b", "b c d", "c"],
+                    "entity_2": ["d"]
+                },
+                "language_code": LANGUAGE_EN
+            },
+            "offsets": [0, 1]
+        }
+        tokens = tokenize("a b c d", LANGUAGE_EN)
+        cache = [{TOKEN_NAME: token} for token in tokens]
+        factory = get_feature_factory(config)
+
+        # When
+        features = factory.build_features()
+        features = sorted(features, key=lambda f: (f.base_name, f.offset))
+        values = [[f.compute(i, cache) for i in range(len(tokens))]
+                  for f in features]
+
+        # Then
+        expected_values = [
+            [BEGINNING_PREFIX, BEGINNING_PREFIX, INSIDE_PREFIX,
+             INSIDE_PREFIX],
+            [BEGINNING_PREFIX, INSIDE_PREFIX, INSIDE_PREFIX, None],
+            [None, None, None, BEGINNING_PREFIX],
+            [None, None, BEGINNING_PREFIX, None]
+        ]
+        self.assertListEqual(expected_values, values)
+
+    def test_entity_match_factory_should_compute_query_features(self):
+        # Given
+        config = {
+            "factory_name": "entity_match",
+            "args": {
+                "tagging_scheme_code": TaggingScheme.BIO.value,
+                "use_stemming": False,
+                "collections": {
+                    "entity_1": ["a b", "b c d", "c"],
+                    "entity_2": ["d"]
+                },
+                "language_code": LANGUAGE_EN
+            },
+            "offsets": [0]
+        }
+        tokens = tokenize("a b c d", LANGUAGE_EN)
+        factory = get_feature_factory(config)
+
+        # When
+        query_features = factory.compute_query_features(tokens)
+
+        # Then
+        expected_query_features = {
+            feature.base_name: [feature.function(tokens, i)
+                                for i in range(len(tokens))]
+            for feature in factory.build_features()
+        }
+        self.assertDictEqual(expected_query_features, query_features)
+
     @patch("snips_nlu.slot_filler.feature_factory.get_supported_entities")
     def test_builtin_entity_match_factory(self, mock_supported_entities):
         # Given
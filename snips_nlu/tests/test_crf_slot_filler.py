@@ -3,8 +3,10 @@ from __future__ import unicode_literals
 
 import io
 import os
-from builtins import range
+from builtins import range, zip
+from threading import Thread
 
+import numpy as np
 from mock import patch, MagicMock
 
 from snips_nlu.constants import (
@@ -12,14 +14,17 @@ from snips_nlu.constants import (
     SNIPS_DATETIME, END, START, ENTITY_KIND)
 from snips_nlu.dataset import validate_and_format_dataset
 from snips_nlu.pipeline.configs import CRFSlotFillerConfig
+from snips_nlu.pipeline.configs.slot_filler import (
+    CRFSUITE_BACKEND, NUMPY_BACKEND)
 from snips_nlu.result import unresolved_slot
 from snips_nlu.slot_filler.crf_slot_filler import (
     CRFSlotFiller, _spans_to_tokens_indexes, _filter_overlapping_builtins,
-    _generate_slots_permutations, _exhaustive_slots_permutations)
+    _generate_slots_permutations, _exhaustive_slots_permutations,
+    _decode_tag)
 from snips_nlu.slot_filler.crf_utils import (
     TaggingScheme, BEGINNING_PREFIX, INSIDE_PREFIX)
 from snips_nlu.slot_filler.feature_factory import (
-    IsDigitFactory, ShapeNgramFactory, NgramFactory)
+    EntityMatchFactory, IsDigitFactory, ShapeNgramFactory, NgramFactory)
 from snips_nlu.tests.utils import (
     SAMPLE_DATASET, BEVERAGE_DATASET, TEST_PATH, WEATHER_DATASET, SnipsTest)
 from snips_nlu.tokenization import tokenize, Token
@@ -179,6 +184,236 @@ class TestCRFSlotFiller(SnipsTest):
                             slot_name='number_of_cups')]
         self.assertListEqual(expected_slots, slots)
 
+    def test_should_get_same_slots_with_numpy_backend(self):
+        # Given
+        dataset = validate_and_format_dataset(WEATHER_DATASET)
+        intent = "SearchWeatherForecast"
+        crfsuite_config = CRFSlotFillerConfig(random_seed=42)
+        numpy_config = CRFSlotFillerConfig(random_seed=42,
+                                           inference_backend="numpy")
+        crfsuite_slot_filler = CRFSlotFiller(crfsuite_config).fit(
+            dataset, intent)
+        numpy_slot_filler = CRFSlotFiller(numpy_config).fit(dataset, intent)
+        texts = [
+            "Give me the weather at 9p.m. in Paris",
+            "what is the weather in Paris tomorrow",
+            "will it rain in new york",
+        ]
+
+        # When
+        crfsuite_slots = [crfsuite_slot_filler.get_slots(text)
+                          for text in texts]
+        numpy_slots = [numpy_slot_filler.get_slots(text) for text in texts]
+
+        # Then
+        self.assertIsNotNone(numpy_slot_filler.crf_decoder)
+        self.assertListEqual(crfsuite_slot_filler.labels,
+                             numpy_slot_filler.labels)
+        self.assertListEqual(crfsuite_slots, numpy_slots)
+
+    @patch("snips_nlu.slot_filler.crf_slot_filler._decode_tag",
+           wraps=_decode_tag)
+    def test_should_decode_labels_once(self, mocked_decode_tag):
+        # Given
+        dataset = validate_and_format_dataset(BEVERAGE_DATASET)
+        slot_filler = CRFSlotFiller().fit(dataset, "MakeTea")
+        tokens = tokenize("make me two cups of hot tea", LANGUAGE_EN)
+        labels = ["O"] * len(tokens)
+
+        # When
+        slot_filler.get_sequence_probability(tokens, labels)
+        num_calls = mocked_decode_tag.call_count
+        slot_filler.get_sequence_probability(tokens, labels)
+
+        # Then
+        self.assertEqual(num_calls, mocked_decode_tag.call_count)
+
+    def test_should_persist_decoder_weights_in_binary_dict_only(self):
+        # Given
+        dataset = validate_and_format_dataset(WEATHER_DATASET)
+        config = CRFSlotFillerConfig(random_seed=42,
+                                     inference_backend=NUMPY_BACKEND)
+        intent = "SearchWeatherForecast"
+        slot_filler = CRFSlotFiller(config).fit(dataset, intent)
+        text = "Give me the weather at 9p.m. in Paris"
+
+        # When
+        slot_filler_dict = slot_filler.to_dict()
+        binary_dict = CRFSlotFiller.to_binary_dict(slot_filler_dict)
+        deserialized_slot_filler = CRFSlotFiller.from_dict(binary_dict)
+
+        # Then
+        self.assertNotIn("crf_decoder", slot_filler_dict)
+        self.assertIsInstance(binary_dict["crf_decoder"]["state_weights"],
+                              np.ndarray)
+        self.assertDictEqual(slot_filler_dict,
+                             deserialized_slot_filler.to_dict())
+        self.assertListEqual(slot_filler.get_slots(text),
+                             deserialized_slot_filler.get_slots(text))
+
+    def test_should_get_slots_concurrently(self):
+        # Given
+        dataset = validate_and_format_dataset(WEATHER_DATASET)
+        config = CRFSlotFillerConfig(random_seed=42)
+        slot_filler = CRFSlotFiller(config).fit(
+            dataset, "SearchWeatherForecast")
+        texts = [
+            "Give me the weather at 9p.m. in Paris",
+            "what's the weather in wagga wagga tomorrow?",
+            "weather for clicquot oregon on november the 4th",
+            "is it going to rain in Berlin next monday and tuesday"
+        ]
+        expected_slots = [slot_filler.get_slots(text) for text in texts]
+        results = [[] for _ in range(8)]
+        taggers = []
+
+        def parse(thread_results):
+            for _ in range(10):
+                for text in texts:
+                    thread_results.append(slot_filler.get_slots(text))
+            taggers.append(slot_filler.crf_model.tagger_)
+
+        threads = [Thread(target=parse, args=(thread_results,))
+                   for thread_results in results]
+
+        # When
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Then
+        for thread_results in results:
+            self.assertListEqual(expected_slots * 10, thread_results)
+        self.assertEqual(1, len(set(id(t) for t in taggers)))
+
+    def test_should_compute_indexed_features(self):
+        # Given
+        dataset = validate_and_format_dataset(WEATHER_DATASET)
+        config = CRFSlotFillerConfig(random_seed=42,
+                                     inference_backend="numpy")
+        slot_filler = CRFSlotFiller(config).fit(
+            dataset, "SearchWeatherForecast")
+        tokens = tokenize("what is the weather in unknownplace at 9pm",
+                          LANGUAGE_EN)
+
+        # When
+        indexed_features = slot_filler._compute_indexed_features(tokens)
+
+        # Then
+        expected_indexed_features = slot_filler.crf_decoder.index_features(
+            slot_filler.compute_features(tokens))
+        self.assertEqual(len(expected_indexed_features),
+                         len(indexed_features))
+        for (expected_indexes, expected_weights), (indexes, weights) in zip(
+                expected_indexed_features, indexed_features):
+            self.assertListEqual(
+                sorted(zip(expected_indexes.tolist(),
+                           expected_weights.tolist())),
+                sorted(zip(indexes.tolist(), weights.tolist())))
+
+    def test_should_get_slots_after_deserialization_with_numpy_backend(self):
+        # Given
+        dataset = validate_and_format_dataset(BEVERAGE_DATASET)
+        config = CRFSlotFillerConfig(random_seed=42,
+                                     inference_backend="numpy")
+        intent = "MakeTea"
+        slot_filler = CRFSlotFiller(config)
+        slot_filler.fit(dataset, intent)
+        slot_filler_dict = slot_filler.to_dict()
+        deserialized_slot_filler = CRFSlotFiller.from_dict(slot_filler_dict)
+
+        # When
+        slots = deserialized_slot_filler.get_slots("make me two cups of tea")
+
+        # Then
+        expected_slots = [
+            unresolved_slot(match_range={START: 8, END: 11},
+                            value='two',
+                            entity='snips/number',
+                            slot_name='number_of_cups')]
+        self.assertIsNone(deserialized_slot_filler.crf_model)
+        self.assertListEqual(expected_slots, slots)
+        self.assertDictEqual(slot_filler_dict,
+                             deserialized_slot_filler.to_dict())
+
+    def test_should_memoize_position_independent_features(self):
+        # Given
+        features_factories = [
+            {
+                "factory_name": NgramFactory.name,
+                "args": {
+                    "n": 1,
+                    "use_stemming": False,
+                    "common_words_gazetteer_name": None
+                },
+                "offsets": [-1, 0]
+            },
+            {
+                "factory_name": NgramFactory.name,
+                "args": {
+                    "n": 2,
+                    "use_stemming": False,
+                    "common_words_gazetteer_name": None
+                },
+                "offsets": [0]
+            },
+            {
+                "factory_name": IsDigitFactory.name,
+                "args": {},
+                "offsets": [0]
+            }
+        ]
+        config = CRFSlotFillerConfig(
+            feature_factory_configs=features_factories, random_seed=42)
+        dataset = validate_and_format_dataset(SAMPLE_DATASET)
+        slot_filler = CRFSlotFiller(config).fit(dataset, "dummy_intent_1")
+        # pylint:disable=protected-access
+        cache = slot_filler._token_features_cache
+        # pylint:enable=protected-access
+        cache.clear()
+        cache.reset_stats()
+        tokens = tokenize("foo 42 foo bar", LANGUAGE_EN)
+
+        # When
+        features = slot_filler.compute_features(tokens)
+        first_stats = cache.stats()
+        same_features = slot_filler.compute_features(tokens)
+
+        # Then
+        self.assertEqual(1, first_stats["hits"])
+        self.assertEqual(3, first_stats["misses"])
+        self.assertEqual(5, cache.hits)
+        self.assertListEqual(features, same_features)
+        self.assertEqual("foo", features[2]["ngram_1"])
+        self.assertEqual("42", features[2]["ngram_1[-1]"])
+        self.assertEqual("foo bar", features[2]["ngram_2"])
+        self.assertEqual("1", features[1]["is_digit"])
+        self.assertNotIn("is_digit", features[2])
+
+    @patch("snips_nlu.slot_filler.feature_factory.EntityMatchFactory"
+           "._compute_tokens_matches", autospec=True,
+           side_effect=EntityMatchFactory._compute_tokens_matches)
+    def test_should_compute_entity_matches_once_per_query(
+            self, mocked_compute_tokens_matches):
+        # Given
+        dataset = validate_and_format_dataset(BEVERAGE_DATASET)
+        tokens = tokenize("make me two cups of hot tea", LANGUAGE_EN)
+
+        for backend in (CRFSUITE_BACKEND, NUMPY_BACKEND):
+            config = CRFSlotFillerConfig(random_seed=42,
+                                         inference_backend=backend)
+            slot_filler = CRFSlotFiller(config).fit(dataset, "MakeTea")
+            mocked_compute_tokens_matches.reset_mock()
+
+            # When
+            # pylint:disable=protected-access
+            slot_filler._compute_inference_features(tokens)
+            # pylint:enable=protected-access
+
+            # Then
+            self.assertEqual(1, mocked_compute_tokens_matches.call_count)
+
     def test_should_be_serializable_before_fit(self):
         # Given
         features_factories = [
@@ -573,6 +808,30 @@ class TestCRFSlotFiller(SnipsTest):
         ]
         self.assertListEqual(augmented_slots, expected_slots)
 
+    def test_should_augment_slots_with_constrained_decoding(self):
+        # Given
+        dataset = validate_and_format_dataset(WEATHER_DATASET)
+        intent = "SearchWeatherForecast"
+        texts = [
+            "Give me the weather at 9p.m. in Paris",
+            "weather in Paris tomorrow at 9am and next monday",
+            "what's the forecast for today and tomorrow in Berlin",
+            "weather"
+        ]
+
+        for backend in (CRFSUITE_BACKEND, NUMPY_BACKEND):
+            config = CRFSlotFillerConfig(random_seed=42,
+                                         inference_backend=backend)
+            slot_filler = CRFSlotFiller(config).fit(dataset, intent)
+            expected_slots = [slot_filler.get_slots(text) for text in texts]
+
+            # When
+            slot_filler.config.constrained_decoding = True
+            slots = [slot_filler.get_slots(text) for text in texts]
+
+            # Then
+            self.assertListEqual(expected_slots, slots)
+
     def test_filter_overlapping_builtins(self):
         # Given
         language = LANGUAGE_EN
@@ -3,8 +3,8 @@ from __future__ import unicode_literals
 
 import io
 import os
-import re
-from builtins import range
+from builtins import chr, range, str
+from copy import deepcopy
 
 from mock import patch
 
@@ -560,27 +560,28 @@ class TestDeterministicIntentParser(SnipsTest):
             "language_code": None,
             "group_names_to_slot_names": None,
             "patterns": None,
+            "entity_utterances": None,
             "slot_names_to_entities": None
         }
 
         self.assertDictEqual(actual_dict, expected_dict)
 
     @patch("snips_nlu.intent_parser.deterministic_intent_parser"
-           "._generate_regexes")
-    def test_should_be_serializable(self, mocked_generate_regexes):
+           "._generate_patterns")
+    def test_should_be_serializable(self, mocked_generate_patterns):
         # Given
 
         # pylint: disable=unused-argument
-        def mock_generate_regexes(utterances, joined_entity_utterances,
-                                  group_names_to_slot_names, language):
-            regexes = [re.compile(r"mocked_regex_%s" % i)
-                       for i in range(len(utterances))]
-            group_to_slot = {"group_0": "dummy slot name"}
-            return regexes, group_to_slot
+        def mock_generate_patterns(utterances, group_names_to_slot_names,
+                                   language):
+            patterns = [["mocked", "pattern", {"group": "group_0"}]
+                        for _ in range(len(utterances))]
+            group_to_slot = {"group_0": "dummy_slot_name"}
+            return patterns, group_to_slot
 
         # pylint: enable=unused-argument
 
-        mocked_generate_regexes.side_effect = mock_generate_regexes
+        mocked_generate_patterns.side_effect = mock_generate_patterns
         dataset = validate_and_format_dataset(SAMPLE_DATASET)
         config = DeterministicIntentParserConfig(max_queries=42,
                                                  max_entities=100)
@@ -588,8 +589,11 @@ class TestDeterministicIntentParser(SnipsTest):
 
         # When
         actual_dict = parser.to_dict()
+        entity_utterances = actual_dict.pop("entity_utterances")
 
         # Then
+        self.assertListEqual(["dummy_entity_1"], list(entity_utterances))
+        self.assertIn(["dummy_a"], entity_utterances["dummy_entity_1"])
         expected_dict = {
             "unit_name": "deterministic_intent_parser",
             "config": {
@@ -599,17 +603,17 @@ class TestDeterministicIntentParser(SnipsTest):
             },
             "language_code": "en",
             "group_names_to_slot_names": {
-                "group_0": "dummy slot name"
+                "group_0": "dummy_slot_name"
             },
             "patterns": {
                 "dummy_intent_1": [
-                    "mocked_regex_0",
-                    "mocked_regex_1",
-                    "mocked_regex_2",
-                    "mocked_regex_3"
+                    ["mocked", "pattern", {"group": "group_0"}],
+                    ["mocked", "pattern", {"group": "group_0"}],
+                    ["mocked", "pattern", {"group": "group_0"}],
+                    ["mocked", "pattern", {"group": "group_0"}]
                 ],
                 "dummy_intent_2": [
-                    "mocked_regex_0"
+                    ["mocked", "pattern", {"group": "group_0"}]
                 ]
             },
             "slot_names_to_entities": {
@@ -636,10 +640,14 @@ class TestDeterministicIntentParser(SnipsTest):
             },
             "patterns": {
                 "intent_name": [
-                    "(?P<hello_group>hello?)",
-                    "(?P<world_group>world$)"
+                    [{"group": "hello_group"}],
+                    ["hi", {"group": "world_group"}]
                 ]
             },
+            "entity_utterances": {
+                "hello_entity": [["hello"]],
+                "world_entity": [["world"], ["big", "world"]]
+            },
             "slot_names_to_entities": {
                 "hello_slot": "hello_entity",
                 "world_slot": "world_entity"
@@ -652,10 +660,14 @@ class TestDeterministicIntentParser(SnipsTest):
         # Then
         patterns = {
             "intent_name": [
-                "(?P<hello_group>hello?)",
-                "(?P<world_group>world$)"
+                [{"group": "hello_group"}],
+                ["hi", {"group": "world_group"}]
             ]
         }
+        entity_utterances = {
+            "hello_entity": [["hello"]],
+            "world_entity": [["world"], ["big", "world"]]
+        }
         group_names_to_slot_names = {
             "hello_group": "hello_slot",
             "world_group": "world_slot"
@@ -671,9 +683,116 @@ class TestDeterministicIntentParser(SnipsTest):
         expected_parser.group_names_to_slot_names = group_names_to_slot_names
         expected_parser.slot_names_to_entities = slot_names_to_entities
         expected_parser.patterns = patterns
+        expected_parser.entity_utterances = entity_utterances
 
         self.assertEqual(parser.to_dict(), expected_parser.to_dict())
 
+    def test_should_parse_after_deserialization_from_patterns(self):
+        # Given
+        parser_dict = {
+            "config": {
+                "max_queries": 42,
+                "max_entities": 43
+            },
+            "language_code": "en",
+            "group_names_to_slot_names": {
+                "world_group": "world_slot"
+            },
+            "patterns": {
+                "intent_name": [
+                    ["hi", {"group": "world_group"}]
+                ]
+            },
+            "entity_utterances": {
+                "world_entity": [["world"], ["big", "world"]]
+            },
+            "slot_names_to_entities": {
+                "world_slot": "world_entity"
+            }
+        }
+        parser = DeterministicIntentParser.from_dict(parser_dict)
+        text = "Hi, big world!"
+
+        # When
+        parsing = parser.parse(text)
+
+        # Then
+        expected_slots = [
+            unresolved_slot(match_range=(4, 13), value="big world",
+                            entity="world_entity", slot_name="world_slot")
+        ]
+        self.assertEqual("intent_name", parsing[RES_INTENT][RES_INTENT_NAME])
+        self.assertListEqual(expected_slots, parsing[RES_SLOTS])
+
+    def test_should_ignore_punctuation_when_parsing(self):
+        # Given
+        dataset = validate_and_format_dataset({
+            "entities": {},
+            "intents": {
+                "MakeCoffee": {
+                    "utterances": [
+                        {
+                            "data": [
+                                {
+                                    "text": "make me a coffee!"
+                                }
+                            ]
+                        }
+                    ]
+                }
+            },
+            "language": "en",
+            "snips_nlu_version": "1.0.1"
+        })
+        parser = DeterministicIntentParser().fit(dataset)
+        texts = ["make me a coffee", "make me a coffee ?",
+                 "Make me, a coffee !!", " make me a coffee. "]
+
+        for text in texts:
+            # When
+            parsing = parser.parse(text)
+
+            # Then
+            self.assertEqual("MakeCoffee",
+                             parsing[RES_INTENT][RES_INTENT_NAME])
+
+    def test_should_ignore_punctuation_around_slots(self):
+        # Given
+        parser_dict = {
+            "config": {
+                "max_queries": 42,
+                "max_entities": 43
+            },
+            "language_code": "en",
+            "group_names_to_slot_names": {
+                "world_group": "world_slot"
+            },
+            "patterns": {
+                "intent_name": [
+                    ["hi", {"group": "world_group"}]
+                ]
+            },
+            "entity_utterances": {
+                "world_entity": [["world"], ["big", "world"]]
+            },
+            "slot_names_to_entities": {
+                "world_slot": "world_entity"
+            }
+        }
+        parser = DeterministicIntentParser.from_dict(parser_dict)
+        text = "Hi!! big world ?"
+
+        # When
+        parsing = parser.parse(text)
+
+        # Then
+        expected_slots = [
+            unresolved_slot(match_range=(5, 14), value="big world",
+                            entity="world_entity", slot_name="world_slot")
+        ]
+        self.assertEqual("intent_name", parsing[RES_INTENT][RES_INTENT_NAME])
+        self.assertListEqual(expected_slots, parsing[RES_SLOTS])
+
     def test_should_be_deserializable_before_fitting(self):
         # Given
         parser_dict = {
@@ -684,6 +803,7 @@ class TestDeterministicIntentParser(SnipsTest):
             "language_code": None,
             "group_names_to_slot_names": None,
             "patterns": None,
+            "entity_utterances": None,
             "slot_names_to_entities": None
         }
 
@@ -770,8 +890,57 @@ class TestDeterministicIntentParser(SnipsTest):
         # Then
         not_fitted_intent = "dummy_intent_1"
         fitted_intent = "dummy_intent_2"
-        self.assertGreater(len(parser.regexes_per_intent[fitted_intent]), 0)
-        self.assertListEqual(parser.regexes_per_intent[not_fitted_intent], [])
+        self.assertGreater(len(parser.patterns[fitted_intent]), 0)
+        self.assertListEqual(parser.patterns[not_fitted_intent], [])
+
+    def test_should_refit_only_patterns_of_changed_intents(self):
+        # Given
+        dataset = deepcopy(SAMPLE_DATASET)
+        parser = DeterministicIntentParser().fit(dataset)
+        unchanged_patterns = parser.patterns["dummy_intent_2"]
+        dataset["intents"]["dummy_intent_1"]["utterances"].append(
+            {"data": [{"text": "this is a brand new "},
+                      {"text": "dummy_a", "entity": "dummy_entity_1",
+                       "slot_name": "dummy_slot_name"},
+                      {"text": " query"}]})
+        text = "this is a brand new dummy_a query"
+
+        # When
+        parser.refit(dataset, ["dummy_intent_1"])
+        parsing = parser.parse(text)
+
+        # Then
+        self.assertIs(unchanged_patterns, parser.patterns["dummy_intent_2"])
+        expected_parsing = DeterministicIntentParser().fit(dataset).parse(text)
+        self.assertDictEqual(expected_parsing, parsing)
+        self.assertEqual("dummy_intent_1",
+                         parsing[RES_INTENT][RES_INTENT_NAME])
+
+    def test_should_parse_intents_with_many_entity_values(self):
+        # Given
+        dataset = deepcopy(self.slots_dataset)
+        # Use letters instead of digits so that values are not parsed as
+        # builtin numbers
+        values = ("".join(chr(ord("a") + int(d)) for d in str(i))
+                  for i in range(5000))
+        dataset["entities"]["dummy_entity_1"]["data"] += [
+            {"value": "dummy value %s" % v, "synonyms": []} for v in values]
+        dataset = validate_and_format_dataset(dataset)
+        parser = DeterministicIntentParser().fit(dataset)
+        text = "this is a dummy value edcb"
+
+        # When
+        parsing = parser.parse(text)
+
+        # Then
+        expected_slots = [
+            unresolved_slot(match_range=(10, 26), value="dummy value edcb",
+                            entity="dummy_entity_1",
+                            slot_name="dummy_slot_name")
+        ]
+        self.assertEqual("dummy_intent_1",
+                         parsing[RES_INTENT][RES_INTENT_NAME])
+        self.assertListEqual(expected_slots, parsing[RES_SLOTS])
 
     @patch('snips_nlu.intent_parser.deterministic_intent_parser'
            '.get_builtin_entities')
@@ -2,15 +2,18 @@
 from __future__ import unicode_literals
 
 import json
-from builtins import bytes
+from builtins import bytes, range
 
+import numpy as np
 from future.utils import iteritems
 from mock import patch, mock
+from snips_nlu_utils import normalize
 
 from snips_nlu.constants import LANGUAGE_EN
 from snips_nlu.dataset import validate_and_format_dataset
 from snips_nlu.intent_classifier.featurizer import (
-    Featurizer, _get_tfidf_vectorizer, _get_utterances_to_features_names)
+    Featurizer, _build_entity_utterances_trie, _get_dataset_entities_features,
+    _get_tfidf_vectorizer, _get_utterances_to_features_names)
 from snips_nlu.languages import get_default_sep
 from snips_nlu.pipeline.configs import FeaturizerConfig
 from snips_nlu.tests.utils import SnipsTest
@@ -213,10 +216,11 @@ class TestIntentClassifierFeaturizer(SnipsTest):
             utterance_to_feature_names, expected_utterance_to_entity_names)
 
     @patch("snips_nlu.intent_classifier.featurizer.get_word_clusters")
-    @patch("snips_nlu.intent_classifier.featurizer.stem")
+    @patch("snips_nlu.intent_classifier.featurizer.normalize_and_stem")
     @patch("snips_nlu.intent_classifier.featurizer."
            "CLUSTER_USED_PER_LANGUAGES", {LANGUAGE_EN: "brown_clusters"})
-    def test_preprocess_queries(self, mocked_stem, mocked_word_cluster):
+    def test_preprocess_queries(self, mocked_normalize_and_stem,
+                                mocked_word_cluster):
         # Given
         language = LANGUAGE_EN
 
@@ -231,9 +235,9 @@ class TestIntentClassifierFeaturizer(SnipsTest):
                 s = t
             return s
 
-        def stem_function(text, language):
+        def normalize_and_stem_function(text, language):
             return get_default_sep(language).join(
-                [_stem(t) for t in tokenize_light(text, language)])
+                [_stem(t) for t in tokenize_light(normalize(text), language)])
 
         mocked_word_cluster.return_value = {
             "brown_clusters": {
@@ -243,7 +247,7 @@ class TestIntentClassifierFeaturizer(SnipsTest):
             }
         }
 
-        mocked_stem.side_effect = stem_function
+        mocked_normalize_and_stem.side_effect = normalize_and_stem_function
 
         dataset = {
             "intents": {
@@ -313,6 +317,157 @@ class TestIntentClassifierFeaturizer(SnipsTest):
 
         self.assertListEqual(queries, expected_queries)
 
+    @patch("snips_nlu.intent_classifier.featurizer."
+           "CLUSTER_USED_PER_LANGUAGES", {LANGUAGE_EN: "brown_clusters"})
+    def test_transform_should_match_tfidf_vectorizer(self):
+        # Given
+        language = LANGUAGE_EN
+        dataset = {
+            "entities": {
+                "Dummy_Entity": {
+                    "data": [
+                        {
+                            "value": "living room",
+                            "synonyms": ["main room"]
+                        },
+                        {
+                            "value": "kitchen",
+                            "synonyms": []
+                        }
+                    ],
+                    "use_synonyms": True,
+                    "automatically_extensible": False
+                }
+            },
+            "intents": {},
+            "snips_nlu_version": "1.0.1",
+            "language": "en"
+        }
+        dataset = validate_and_format_dataset(dataset)
+        queries = [
+            "hello world",
+            "hello hello beautiful World in the kitchen",
+            "turn on the lights in the living room",
+            "bird birdy",
+            "beautiful bird in the main room",
+            "lights in the kitchen please"
+        ]
+        classes = [0, 0, 1, 2, 2, 1]
+        config = FeaturizerConfig(sublinear_tf=True)
+        featurizer = Featurizer(language, None, config=config,
+                                pvalue_threshold=0.9)
+        featurizer.fit(dataset, queries, classes)
+        test_queries = queries + ["unknown words", "", "KITCHEN kitchen"]
+
+        # When
+        x = featurizer.transform(test_queries)
+
+        # Then
+        expected_x = featurizer.tfidf_vectorizer.transform(
+            featurizer.preprocess_queries(test_queries))
+        expected_x = expected_x[:, featurizer.best_features]
+        self.assertTupleEqual(expected_x.shape, x.shape)
+        np.testing.assert_array_almost_equal(
+            expected_x.toarray(), x.toarray())
+
+    def test_fit_should_prune_vocabulary_to_best_features(self):
+        # Given
+        language = LANGUAGE_EN
+        dataset = validate_and_format_dataset({
+            "entities": {},
+            "intents": {},
+            "snips_nlu_version": "1.0.1",
+            "language": "en"
+        })
+        queries = [
+            "hello world",
+            "beautiful world",
+            "hello here",
+            "bird birdy",
+            "beautiful bird"
+        ]
+        classes = [0, 0, 0, 1, 1]
+        featurizer = Featurizer(language, None, pvalue_threshold=0.3)
+
+        # When
+        featurizer.fit(dataset, queries, classes)
+
+        # Then
+        vocabulary = featurizer.tfidf_vectorizer.vocabulary_
+        # pylint: disable=W0212
+        idf_diag = featurizer.tfidf_vectorizer._tfidf._idf_diag.data
+        # pylint: enable=W0212
+        self.assertGreater(len(vocabulary), 0)
+        self.assertLess(len(vocabulary), 4)
+        self.assertEqual(len(vocabulary), len(idf_diag))
+        self.assertListEqual(list(range(len(vocabulary))),
+                             featurizer.best_features)
+        self.assertListEqual(list(range(len(vocabulary))),
+                             sorted(vocabulary.values()))
+
+    def test_should_transform_with_unpruned_vocabulary(self):
+        # Given
+        featurizer_dict = {
+            "config": FeaturizerConfig().to_dict(),
+            "language_code": LANGUAGE_EN,
+            "tfidf_vectorizer": {
+                "idf_diag": [1.52, 1.21, 1.04],
+                "vocab": {"hello": 0, "beautiful": 1, "world": 2}
+            },
+            "best_features": [0, 2],
+            "pvalue_threshold": 0.4,
+            "entity_utterances_to_feature_names": {},
+            "unknown_words_replacement_string": None
+        }
+        featurizer = Featurizer.from_dict(featurizer_dict)
+
+        # When
+        x = featurizer.transform(["hello beautiful world", "beautiful"])
+
+        # Then
+        norm = np.sqrt(1.52 ** 2 + 1.21 ** 2 + 1.04 ** 2)
+        expected_x = [[1.52 / norm, 1.04 / norm], [0., 0.]]
+        np.testing.assert_array_almost_equal(expected_x, x.toarray())
+
+    def test_should_get_dataset_entities_features(self):
+        # Given
+        entity_utterances_to_feature_names = {
+            "living room": {"entityfeatureroom"},
+            "room": {"entityfeatureroom", "entityfeaturetype"},
+            "live": {"entityfeaturemusic"},
+            "in the": {"entityfeaturedummy"}
+        }
+        trie = _build_entity_utterances_trie(
+            entity_utterances_to_feature_names)
+        # The stem of a token may contain several words
+        tokens = ["lights", "in the", "living", "room", "live", "room"]
+
+        # When
+        features = _get_dataset_entities_features(tokens, trie)
+
+        # Then
+        expected_features = [
+            "entityfeaturedummy",
+            "entityfeatureroom",
+            "entityfeatureroom",
+            "entityfeaturetype",
+            "entityfeaturemusic",
+            "entityfeatureroom",
+            "entityfeaturetype"
+        ]
+        self.assertListEqual(sorted(expected_features), sorted(features))
+
+    def test_should_not_match_entities_across_tokens_words(self):
+        # Given
+        trie = _build_entity_utterances_trie({"the": {"entityfeaturedummy"}})
+        tokens = ["in the", "room"]
+
+        # When
+        features = _get_dataset_entities_features(tokens, trie)
+
+        # Then
+        self.assertListEqual([], features)
+
     def test_featurizer_should_exclude_replacement_string(self):
         # Given
         language = LANGUAGE_EN
@@ -0,0 +1,115 @@
+from __future__ import unicode_literals
+
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+
+from snips_nlu.constants import LANGUAGE_EN
+from snips_nlu.dataset import validate_and_format_dataset
+from snips_nlu.intent_classifier.featurizer import Featurizer
+from snips_nlu.intent_classifier.linear_scorer import LinearScorer
+from snips_nlu.pipeline.configs import FeaturizerConfig
+from snips_nlu.tests.utils import SnipsTest
+
+
+class TestLinearScorer(SnipsTest):
+    def setUp(self):
+        self.dataset = validate_and_format_dataset({
+            "entities": {},
+            "intents": {},
+            "snips_nlu_version": "1.0.1",
+            "language": "en"
+        })
+        self.queries = [
+            "turn on the lights",
+            "switch the lights on please",
+            "turn the lights off",
+            "switch off the lights",
+            "set the temperature to twenty",
+            "what is the temperature",
+            "play some music",
+            "play the last song please"
+        ]
+        self.test_queries = self.queries + [
+            "unknown words",
+            "lights lights lights on",
+            "please please play"
+        ]
+
+    def _fit(self, classes, sublinear_tf):
+        config = FeaturizerConfig(sublinear_tf=sublinear_tf)
+        featurizer = Featurizer(LANGUAGE_EN, None, config=config,
+                                pvalue_threshold=0.9)
+        featurizer.fit(self.dataset, self.queries, classes)
+        classifier = SGDClassifier(loss="log", random_state=42, max_iter=5)
+        classifier.fit(featurizer.transform(self.queries), classes)
+        return featurizer, classifier
+
+    def test_should_predict_same_probabilities_as_classifier(self):
+        # Given
+        classes = [0, 0, 1, 1, 2, 2, 3, 3]
+        featurizer, classifier = self._fit(classes, sublinear_tf=True)
+        scorer = LinearScorer.from_classifier(featurizer, classifier)
+
+        # When
+        probas = scorer.predict_proba(self.test_queries)
+
+        # Then
+        expected_probas = classifier.predict_proba(
+            featurizer.transform(self.test_queries))
+        np.testing.assert_array_almost_equal(expected_probas, probas)
+
+    def test_should_predict_same_probabilities_with_binary_classifier(self):
+        # Given
+        classes = [0, 0, 0, 0, 1, 1, 1, 1]
+        featurizer, classifier = self._fit(classes, sublinear_tf=False)
+        scorer = LinearScorer.from_classifier(featurizer, classifier)
+
+        # When
+        probas = scorer.predict_proba(self.test_queries)
+
+        # Then
+        expected_probas = classifier.predict_proba(
+            featurizer.transform(self.test_queries))
+        self.assertTupleEqual((len(self.test_queries), 2), probas.shape)
+        np.testing.assert_array_almost_equal(expected_probas, probas)
+
+    def test_should_score_with_unpruned_vocabulary(self):
+        # Given
+        featurizer = Featurizer.from_dict({
+            "config": FeaturizerConfig().to_dict(),
+            "language_code": LANGUAGE_EN,
+            "tfidf_vectorizer": {
+                "idf_diag": [1.52, 1.21, 1.04],
+                "vocab": {"hello": 0, "beautiful": 1, "world": 2}
+            },
+            "best_features": [0, 2],
+            "pvalue_threshold": 0.4,
+            "entity_utterances_to_feature_names": {},
+            "unknown_words_replacement_string": None
+        })
+        coef = np.array([[1.0, -2.0], [0.5, 3.0]])
+        intercept = np.array([0.1, -0.2])
+        scorer = LinearScorer(featurizer, coef, intercept)
+
+        # When
+        scores = scorer.get_scores("hello beautiful world")
+
+        # Then
+        x = featurizer.transform(["hello beautiful world"]).toarray()[0]
+        expected_scores = np.dot(coef, x) + intercept
+        np.testing.assert_array_almost_equal(expected_scores, scores)
+
+    def test_should_score_batch_of_queries(self):
+        # Given
+        classes = [0, 0, 1, 1, 2, 2, 3, 3]
+        featurizer, classifier = self._fit(classes, sublinear_tf=True)
+        scorer = LinearScorer.from_classifier(featurizer, classifier)
+
+        # When
+        scores = scorer.get_batch_scores(self.test_queries)
+        empty_scores = scorer.get_batch_scores([])
+
+        # Then
+        expected_scores = [scorer.get_scores(q) for q in self.test_queries]
+        np.testing.assert_array_almost_equal(expected_scores, scores)
+        self.assertTupleEqual((0, 4), empty_scores.shape)
@@ -69,6 +69,21 @@ class TestLogRegIntentClassifier(SnipsTest):
         self.assertEqual("MakeCoffee", res2[RES_INTENT_NAME])
         self.assertEqual(None, res3)
 
+    def test_should_get_intent_batch(self):
+        # Given
+        dataset = validate_and_format_dataset(BEVERAGE_DATASET)
+        classifier = LogRegIntentClassifier().fit(dataset)
+        texts = ["Make me two cups of tea", "", "bla bla bla",
+                 "brew me an espresso"]
+
+        # When
+        results = classifier.get_intent_batch(texts, ["MakeCoffee"])
+
+        # Then
+        expected_results = [classifier.get_intent(text, ["MakeCoffee"])
+                            for text in texts]
+        self.assertListEqual(expected_results, results)
+
     def test_should_get_none_if_empty_dataset(self):
         # Given
         dataset = validate_and_format_dataset(get_empty_dataset(LANGUAGE_EN))
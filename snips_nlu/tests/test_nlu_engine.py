@@ -2,6 +2,11 @@
 from __future__ import unicode_literals
 
 import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 from builtins import str
 from copy import deepcopy
 
@@ -17,7 +22,10 @@ from snips_nlu.constants import (
 from snips_nlu.dataset import validate_and_format_dataset
 from snips_nlu.intent_parser import IntentParser
 from snips_nlu.nlu_engine import SnipsNLUEngine
-from snips_nlu.pipeline.configs import ProcessingUnitConfig, NLUEngineConfig
+from snips_nlu.pipeline.configs import (
+    CRFSlotFillerConfig, DeterministicIntentParserConfig, NLUEngineConfig,
+    ProbabilisticIntentParserConfig, ProcessingUnitConfig)
+from snips_nlu.pipeline.configs.slot_filler import NUMPY_BACKEND
 from snips_nlu.pipeline.units_registry import (register_processing_unit,
                                                reset_processing_units)
 from snips_nlu.result import (
@@ -221,6 +229,75 @@ class TestSnipsNLUEngine(SnipsTest):
         self.assertDictEqual(dict(fitted=True, calls=1),
                              intent_parser.sub_unit_2)
 
+    def test_should_refit_parsers_with_changed_intents(self):
+        # Given
+        class TestIntentParserConfig(ProcessingUnitConfig):
+            unit_name = "test_intent_parser"
+
+            def to_dict(self):
+                return {"unit_name": self.unit_name}
+
+            @classmethod
+            def from_dict(cls, obj_dict):
+                return TestIntentParserConfig()
+
+        class TestIntentParser(IntentParser):
+            unit_name = "test_intent_parser"
+            config_type = TestIntentParserConfig
+
+            def __init__(self, config):
+                super(TestIntentParser, self).__init__(config)
+                self.fit_calls = 0
+                self.refitted_intents = []
+
+            def fit(self, dataset, force_retrain):
+                self.fit_calls += 1
+                return self
+
+            def refit(self, dataset, intents):
+                self.refitted_intents.append(intents)
+                return self
+
+            @property
+            def fitted(self):
+                return self.fit_calls > 0
+
+            def parse(self, text, intents):
+                return empty_result(text)
+
+            def to_dict(self):
+                return {
+                    "unit_name": self.unit_name,
+                }
+
+            @classmethod
+            def from_dict(cls, unit_dict):
+                conf = cls.config_type()
+                return TestIntentParser(conf)
+
+        register_processing_unit(TestIntentParser)
+
+        config = NLUEngineConfig([TestIntentParserConfig()])
+        engine = SnipsNLUEngine(config).fit(BEVERAGE_DATASET)
+        parser = engine.intent_parsers[0]
+
+        coffee_dataset = deepcopy(BEVERAGE_DATASET)
+        coffee_dataset["intents"]["MakeCoffee"]["utterances"].append(
+            {"data": [{"text": "brew some coffee please"}]})
+        temperature_dataset = deepcopy(coffee_dataset)
+        temperature_dataset["entities"]["Temperature"]["data"].append(
+            {"value": "warm", "synonyms": []})
+
+        # When
+        engine.fit(BEVERAGE_DATASET, force_retrain=False)
+        engine.fit(coffee_dataset, force_retrain=False)
+        engine.fit(temperature_dataset, force_retrain=False)
+
+        # Then
+        self.assertEqual(1, parser.fit_calls)
+        self.assertListEqual([["MakeCoffee"], ["MakeTea"]],
+                             parser.refitted_intents)
+
     def test_should_handle_empty_dataset(self):
         # Given
         dataset = validate_and_format_dataset(get_empty_dataset(LANGUAGE_EN))
@@ -317,6 +394,12 @@ class TestSnipsNLUEngine(SnipsTest):
         actual_engine_dict = engine.to_dict()
 
         # Then
+        metadata = actual_engine_dict["dataset_metadata"]
+        intents_hashes = metadata.pop("intents_hashes")
+        entities_hashes = metadata.pop("entities_hashes")
+        self.assertSetEqual({"MakeCoffee", "MakeTea"}, set(intents_hashes))
+        self.assertSetEqual({"Temperature"}, set(entities_hashes))
+
         parser1_config = TestIntentParser1Config()
         parser2_config = TestIntentParser2Config()
         parsers_configs = [parser1_config, parser2_config]
@@ -512,6 +595,151 @@ class TestSnipsNLUEngine(SnipsTest):
         self.assertEqual(result[RES_INTENT][RES_INTENT_NAME], 'MakeTea')
         self.assertListEqual(result[RES_SLOTS], expected_slots)
 
+    def test_load_engine_should_not_import_training_dependencies(self):
+        # Given
+        slot_filler_config = CRFSlotFillerConfig(
+            inference_backend=NUMPY_BACKEND)
+        config = NLUEngineConfig([
+            DeterministicIntentParserConfig(),
+            ProbabilisticIntentParserConfig(
+                slot_filler_config=slot_filler_config)
+        ])
+        engine = SnipsNLUEngine(config).fit(BEVERAGE_DATASET)
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        engine_path = os.path.join(tmp_dir, "engine.bin")
+        engine.to_binary(engine_path)
+        script = """
+import json
+import sys
+
+import snips_nlu
+
+engine = snips_nlu.load_engine(%r)
+engine.parse("make me two cups of tea please")
+training_modules = ["sklearn", "scipy", "sklearn_crfsuite", "pycrfsuite",
+                    "num2words"]
+print(json.dumps([m for m in training_modules if m in sys.modules]))
+""" % engine_path
+
+        # When
+        output = subprocess.check_output([sys.executable, "-c", script])
+
+        # Then
+        self.assertListEqual([], json.loads(output.decode("utf8")))
+
+    def test_should_parse_after_binary_serialization(self):
+        # Given
+        engine = SnipsNLUEngine().fit(BEVERAGE_DATASET)
+        texts = ["Give me 3 cups of hot tea please", "make me a coffee"]
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, "engine.bin")
+
+        # When
+        engine.to_binary(path)
+        deserialized_engine = SnipsNLUEngine.from_binary(path)
+        results = [deserialized_engine.parse(text) for text in texts]
+        engine_dict = deserialized_engine.to_dict()
+        del deserialized_engine
+        shutil.rmtree(tmp_dir)
+
+        # Then
+        expected_results = [engine.parse(text) for text in texts]
+        self.assertListEqual(expected_results, results)
+        self.assertDictEqual(engine.to_dict(), engine_dict)
+
+    def test_should_parse_batch(self):
+        # Given
+        engine = SnipsNLUEngine().fit(BEVERAGE_DATASET)
+        texts = [
+            "Give me 3 cups of hot tea please",
+            "make me a coffee",
+            "hello world",
+            ""
+        ]
+
+        # When
+        results = engine.parse_batch(texts)
+
+        # Then
+        expected_results = [engine.parse(text) for text in texts]
+        self.assertListEqual(expected_results, results)
+
+    def test_should_parse_batch_with_intents_filter(self):
+        # Given
+        engine = SnipsNLUEngine().fit(BEVERAGE_DATASET)
+        texts = ["Make me two cups of tea", "brew me an espresso"]
+
+        # When
+        results = engine.parse_batch(texts, intents="MakeCoffee")
+
+        # Then
+        expected_results = [engine.parse(text, intents="MakeCoffee")
+                            for text in texts]
+        self.assertListEqual(expected_results, results)
+
+    def test_should_cache_parsing_results(self):
+        # Given
+        engine = SnipsNLUEngine().fit(BEVERAGE_DATASET)
+        engine.enable_parse_cache(capacity=10)
+        text = "Make me two cups of tea"
+
+        # When
+        result = engine.parse(text, intents=["MakeTea", "MakeCoffee"])
+        expected_result = deepcopy(result)
+        result[RES_SLOTS].append("poisoned slot")
+        cached_result = engine.parse(text, intents=["MakeCoffee", "MakeTea"])
+
+        # Then
+        self.assertDictEqual(expected_result, cached_result)
+        self.assertEqual(1, engine.parse_cache.hits)
+        self.assertEqual(1, engine.parse_cache.misses)
+
+    def test_should_not_share_cached_results_across_intents_filters(self):
+        # Given
+        engine = SnipsNLUEngine().enable_parse_cache()
+        engine.fit(BEVERAGE_DATASET)
+        text = "Make me two cups of tea"
+
+        # When
+        result = engine.parse(text)
+        filtered_result = engine.parse(text, intents="MakeCoffee")
+
+        # Then
+        self.assertEqual("MakeTea", result[RES_INTENT][RES_INTENT_NAME])
+        self.assertNotEqual(result, filtered_result)
+        self.assertEqual(0, engine.parse_cache.hits)
+        self.assertEqual(2, engine.parse_cache.misses)
+
+    def test_should_use_parse_cache_in_batch(self):
+        # Given
+        engine = SnipsNLUEngine().fit(BEVERAGE_DATASET)
+        engine.enable_parse_cache()
+        texts = ["Make me two cups of tea", "brew me an espresso"]
+        engine.parse(texts[0])
+
+        # When
+        results = engine.parse_batch(texts)
+        cached_results = engine.parse_batch(texts)
+
+        # Then
+        expected_results = [engine.disable_parse_cache().parse(text)
+                            for text in texts]
+        self.assertListEqual(expected_results, results)
+        self.assertListEqual(expected_results, cached_results)
+
+    def test_should_clear_parse_cache_when_fitted(self):
+        # Given
+        engine = SnipsNLUEngine().fit(BEVERAGE_DATASET)
+        engine.enable_parse_cache()
+        engine.parse("Make me two cups of tea")
+
+        # When
+        engine.fit(BEVERAGE_DATASET)
+
+        # Then
+        self.assertEqual(0, len(engine.parse_cache))
+
     @patch(
         "snips_nlu.intent_parser.probabilistic_intent_parser"
         ".ProbabilisticIntentParser.parse")
@@ -741,3 +969,14 @@ class TestSnipsNLUEngine(SnipsTest):
             engine.parse(bytes_input)
         message = str(cm.exception.args[0])
         self.assertTrue("Expected unicode but received" in message)
+
+    def test_nlu_engine_should_raise_error_with_bytes_input_in_batch(self):
+        # Given
+        inputs = ["make me a tea", b"brew me an espresso"]
+        engine = SnipsNLUEngine().fit(BEVERAGE_DATASET)
+
+        # When / Then
+        with self.assertRaises(TypeError) as cm:
+            engine.parse_batch(inputs)
+        message = str(cm.exception.args[0])
+        self.assertTrue("Expected unicode but received" in message)
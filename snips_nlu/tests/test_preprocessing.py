@@ -0,0 +1,66 @@
+from __future__ import unicode_literals
+
+from mock import patch
+
+from snips_nlu.constants import LANGUAGE_EN
+from snips_nlu.preprocessing import has_stems, normalize_and_stem, stem
+from snips_nlu.tests.utils import SnipsTest
+from snips_nlu.tokenization import tokenize_light
+from snips_nlu.utils import get_cache
+
+
+class TestPreprocessing(SnipsTest):
+    @patch("snips_nlu.preprocessing.get_stems")
+    @patch("snips_nlu.preprocessing.tokenize_light")
+    def test_should_memoize_stems(self, mocked_tokenize_light,
+                                  mocked_get_stems):
+        # Given
+        mocked_tokenize_light.side_effect = tokenize_light
+        mocked_get_stems.return_value = {"memoizedwords": "memoizedword"}
+        text = "some memoizedwords"
+
+        # When
+        stems = [stem(text, LANGUAGE_EN) for _ in range(3)]
+
+        # Then
+        self.assertListEqual(["some memoizedword"] * 3, stems)
+        self.assertEqual(1, mocked_tokenize_light.call_count)
+
+    @patch("snips_nlu.preprocessing.get_cache", wraps=get_cache)
+    def test_should_resolve_stems_caches_once(self, mocked_get_cache):
+        # Given
+        texts = ["hello", "beautiful", "world"]
+
+        # When
+        with patch.dict("snips_nlu.preprocessing._LANGUAGES_CACHES", {},
+                        clear=True):
+            for text in texts:
+                stem(text, LANGUAGE_EN)
+                normalize_and_stem(text, LANGUAGE_EN)
+
+        # Then
+        self.assertEqual(2, mocked_get_cache.call_count)
+
+    @patch("snips_nlu.preprocessing.get_stems")
+    def test_should_normalize_and_stem(self, mocked_get_stems):
+        # Given
+        mocked_get_stems.return_value = {"normalizedwords": "normalizedword"}
+
+        # When
+        normalized_stem = normalize_and_stem("Some NormalizedWords",
+                                             LANGUAGE_EN)
+
+        # Then
+        self.assertEqual("some normalizedword", normalized_stem)
+
+    @patch("snips_nlu.preprocessing.get_stems")
+    def test_should_only_tokenize_when_no_stems(self, mocked_get_stems):
+        # Given
+        mocked_get_stems.return_value = dict()
+
+        # When
+        stemmed = stem("unstemmedword   other unstemmedwords", LANGUAGE_EN)
+
+        # Then
+        self.assertFalse(has_stems(LANGUAGE_EN))
+        self.assertEqual("unstemmedword other unstemmedwords", stemmed)
@@ -1,5 +1,8 @@
 from __future__ import unicode_literals
 
+from copy import deepcopy
+
+from future.utils import iteritems
 from mock import patch
 
 from snips_nlu.dataset import validate_and_format_dataset
@@ -67,6 +70,42 @@ class TestProbabilisticIntentParser(SnipsTest):
             parser.fit(BEVERAGE_DATASET, force_retrain=False)
             self.assertEqual(1, mock_fit.call_count)
 
+    def test_should_refit_only_slot_fillers_of_changed_intents(self):
+        # Given
+        parser = ProbabilisticIntentParser().fit(BEVERAGE_DATASET)
+        tea_slot_filler = parser.slot_fillers["MakeTea"]
+        dataset = deepcopy(BEVERAGE_DATASET)
+        dataset["intents"]["MakeCoffee"]["utterances"].append(
+            {"data": [{"text": "brew some coffee please"}]})
+
+        # When
+        with patch("snips_nlu.intent_classifier.log_reg_classifier"
+                   ".LogRegIntentClassifier.fit") as mock_classifier_fit, \
+                patch("snips_nlu.slot_filler.crf_slot_filler.CRFSlotFiller"
+                      ".fit") as mock_slot_filler_fit:
+            parser.refit(dataset, ["MakeCoffee"])
+
+        # Then
+        mock_classifier_fit.assert_called_once()
+        mock_slot_filler_fit.assert_called_once()
+        self.assertEqual("MakeCoffee", mock_slot_filler_fit.call_args[0][1])
+        self.assertIs(tea_slot_filler, parser.slot_fillers["MakeTea"])
+
+    def test_should_drop_slot_fillers_of_removed_intents_when_refitting(self):
+        # Given
+        parser = ProbabilisticIntentParser().fit(BEVERAGE_DATASET)
+        dataset = deepcopy(BEVERAGE_DATASET)
+        dataset["intents"].pop("MakeCoffee")
+
+        # When
+        with patch("snips_nlu.slot_filler.crf_slot_filler.CRFSlotFiller"
+                   ".fit") as mock_slot_filler_fit:
+            parser.refit(dataset, [])
+
+        # Then
+        mock_slot_filler_fit.assert_not_called()
+        self.assertListEqual(["MakeTea"], list(parser.slot_fillers))
+
     def test_should_be_serializable_before_fitting(self):
         # Given
         parser = ProbabilisticIntentParser()
@@ -81,7 +120,8 @@ class TestProbabilisticIntentParser(SnipsTest):
                 "unit_name": "probabilistic_intent_parser",
                 "slot_filler_config": CRFSlotFillerConfig().to_dict(),
                 "intent_classifier_config":
-                    LogRegIntentClassifierConfig().to_dict()
+                    LogRegIntentClassifierConfig().to_dict(),
+                "n_jobs": 1
             },
             "intent_classifier": None,
             "slot_fillers": dict(),
@@ -185,7 +225,9 @@ class TestProbabilisticIntentParser(SnipsTest):
         expected_parser_config = {
             "unit_name": "probabilistic_intent_parser",
             "slot_filler_config": {"unit_name": "test_slot_filler"},
-            "intent_classifier_config": {"unit_name": "test_intent_classifier"}
+            "intent_classifier_config": {
+                "unit_name": "test_intent_classifier"},
+            "n_jobs": 1
         }
         expected_parser_dict = {
             "unit_name": "probabilistic_intent_parser",
@@ -314,3 +356,34 @@ class TestProbabilisticIntentParser(SnipsTest):
         feature_weights_2 = fitted_parser_2.slot_fillers[
             "MakeTea"].crf_model.state_features_
         self.assertEqual(feature_weights_1, feature_weights_2)
+
+    def test_parallel_fitting_should_match_sequential_fitting(self):
+        # Given
+        dataset = validate_and_format_dataset(BEVERAGE_DATASET)
+        sequential_config = ProbabilisticIntentParserConfig(
+            intent_classifier_config=LogRegIntentClassifierConfig(
+                random_seed=666),
+            slot_filler_config=CRFSlotFillerConfig(random_seed=42))
+        parallel_config = ProbabilisticIntentParserConfig(
+            intent_classifier_config=LogRegIntentClassifierConfig(
+                random_seed=666),
+            slot_filler_config=CRFSlotFillerConfig(random_seed=42),
+            n_jobs=2)
+
+        # When
+        sequential_parser = ProbabilisticIntentParser(sequential_config).fit(
+            dataset)
+        parallel_parser = ProbabilisticIntentParser(parallel_config).fit(
+            dataset)
+
+        # Then
+        self.assertTrue(parallel_parser.fitted)
+        self.assertListEqual(sorted(sequential_parser.slot_fillers),
+                             sorted(parallel_parser.slot_fillers))
+        for intent, slot_filler in iteritems(sequential_parser.slot_fillers):
+            self.assertEqual(
+                slot_filler.crf_model.state_features_,
+                parallel_parser.slot_fillers[intent].crf_model.state_features_)
+        text = "make me two cups of hot tea"
+        self.assertDictEqual(sequential_parser.parse(text),
+                             parallel_parser.parse(text))
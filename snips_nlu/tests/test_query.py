@@ -0,0 +1,60 @@
+from __future__ import unicode_literals
+
+from mock import patch
+
+from snips_nlu.constants import LANGUAGE_EN
+from snips_nlu.query import ParsedQuery, get_parsed_query
+from snips_nlu.tests.utils import SnipsTest
+from snips_nlu.tokenization import tokenize
+
+
+class TestParsedQuery(SnipsTest):
+    def test_parsed_query_should_behave_as_text(self):
+        # Given
+        text = "Make me two cups of tea"
+
+        # When
+        query = ParsedQuery(text, LANGUAGE_EN)
+
+        # Then
+        self.assertEqual(text, query)
+        self.assertEqual(text, query.text)
+        self.assertEqual(text.lower(), query.lower())
+        self.assertEqual("cups", query[12:16])
+
+    @patch("snips_nlu.builtin_entities.BuiltinEntityParser.parse")
+    @patch("snips_nlu.query.tokenize")
+    def test_should_analyse_query_once(self, mocked_tokenize, mocked_parse):
+        # Given
+        mocked_tokenize.side_effect = tokenize
+        mocked_parse.return_value = []
+        query = ParsedQuery("Brew three large cups of green tea", LANGUAGE_EN)
+
+        # When
+        tokens = query.tokens
+        stemmed_tokens = query.stemmed_tokens
+        builtin_entities = query.builtin_entities
+        reused_query = get_parsed_query(query, LANGUAGE_EN)
+
+        # Then
+        self.assertIs(query, reused_query)
+        self.assertIs(tokens, reused_query.tokens)
+        self.assertIs(stemmed_tokens, reused_query.stemmed_tokens)
+        self.assertIs(builtin_entities, reused_query.builtin_entities)
+        self.assertEqual(1, mocked_tokenize.call_count)
+        self.assertEqual(1, mocked_parse.call_count)
+        self.assertListEqual([t.value for t in tokens],
+                             [t.value for t in stemmed_tokens])
+        self.assertTrue(all(t.stem is not None for t in stemmed_tokens))
+
+    def test_should_wrap_text_in_parsed_query(self):
+        # Given
+        text = "Make me two cups of tea"
+
+        # When
+        query = get_parsed_query(text, LANGUAGE_EN)
+
+        # Then
+        self.assertIsInstance(query, ParsedQuery)
+        self.assertEqual(LANGUAGE_EN, query.language)
+        self.assertEqual(text, query.text)
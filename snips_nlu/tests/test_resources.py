@@ -1,11 +1,22 @@
 from __future__ import unicode_literals
 
-from future.builtins import str
-from mock import patch
+import io
+import os
+import shutil
+import tempfile
+from threading import Thread
+
+from future.builtins import range, str
+from future.utils import iteritems
+from mock import MagicMock, patch
 from snips_nlu_ontology import get_all_languages
 
+from snips_nlu.constants import (
+    GAZETTEERS, NOISE, STEMS, STOP_WORDS, WORD_CLUSTERS)
 from snips_nlu.resources import RESOURCE_INDEX, get_stop_words, get_resource, \
-    UnloadedResources, UnknownResource
+    UnloadedResources, UnknownResource, load_resources, get_word_clusters, \
+    get_gazetteers, RESOURCES_CACHE_DIR_ENV, get_shared_resource
+from snips_nlu.tokenization import tokenize
 from snips_nlu.tests.utils import SnipsTest
 
 
@@ -54,3 +65,151 @@ class TestResources(SnipsTest):
         self.assertEqual(
             str(ctx.exception.args[0]),
             "Unknown resource 'my_resource' for 'en' language")
+
+    def test_should_load_resources_lazily(self):
+        # Given
+        mocked_value = dict()
+
+        with patch("snips_nlu.resources._RESOURCES", mocked_value):
+            # When
+            load_resources("en")
+            loaded_after_init = set(mocked_value["en"])
+            stop_words = get_stop_words("en")
+
+            # Then
+            self.assertSetEqual(set(), loaded_after_init)
+            self.assertGreater(len(stop_words), 0)
+            self.assertSetEqual({STOP_WORDS}, set(mocked_value["en"]))
+
+    def test_should_load_resources_eagerly(self):
+        # Given
+        mocked_value = dict()
+
+        with patch("snips_nlu.resources._RESOURCES", mocked_value):
+            # When
+            load_resources("en", only=[GAZETTEERS, NOISE])
+
+            # Then
+            self.assertSetEqual({GAZETTEERS, NOISE}, set(mocked_value["en"]))
+            with self.assertRaises(ValueError):
+                load_resources("en", only=["unknown_resource"])
+
+    def test_should_raise_unknown_resource_when_missing_for_language(self):
+        # Given
+        mocked_value = dict()
+
+        with patch("snips_nlu.resources._RESOURCES", mocked_value):
+            load_resources("fr")
+
+            # When / Then
+            with self.assertRaises(UnknownResource):
+                get_word_clusters("fr")
+            self.assertIsNone(mocked_value["fr"][WORD_CLUSTERS])
+
+    def test_should_load_resource_once_when_accessed_concurrently(self):
+        # Given
+        mocked_value = dict()
+        mocked_loader = MagicMock(return_value={"hello"})
+        loaders = {STOP_WORDS: mocked_loader}
+
+        with patch("snips_nlu.resources._RESOURCES", mocked_value), \
+                patch.dict("snips_nlu.resources._RESOURCES_LOADERS", loaders):
+            load_resources("en")
+            threads = [Thread(target=get_stop_words, args=("en",))
+                       for _ in range(10)]
+
+            # When
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            # Then
+            mocked_loader.assert_called_once_with("en")
+            self.assertSetEqual({"hello"}, get_stop_words("en"))
+
+    @patch("snips_nlu.resources.tokenize")
+    def test_should_reuse_precompiled_resources(self, mocked_tokenize):
+        # Given
+        mocked_tokenize.side_effect = tokenize
+        cache_dir = tempfile.mkdtemp()
+        environ = {RESOURCES_CACHE_DIR_ENV: cache_dir}
+
+        with patch.dict(os.environ, environ):
+            with patch("snips_nlu.resources._RESOURCES", dict()):
+                load_resources("en")
+                gazetteers = get_gazetteers("en")
+            tokenize_calls = mocked_tokenize.call_count
+            cache_files = os.listdir(cache_dir)
+
+            # When
+            with patch("snips_nlu.resources._RESOURCES", dict()):
+                load_resources("en")
+                cached_gazetteers = get_gazetteers("en")
+        shutil.rmtree(cache_dir)
+
+        # Then
+        self.assertGreater(tokenize_calls, 0)
+        self.assertEqual(tokenize_calls, mocked_tokenize.call_count)
+        self.assertEqual(len(gazetteers), len(cache_files))
+        self.assertSetEqual(set(gazetteers), set(cached_gazetteers))
+        for name, gazetteer in iteritems(gazetteers):
+            self.assertSetEqual(set(gazetteer), set(cached_gazetteers[name]))
+
+    def test_should_not_cache_resources_by_default(self):
+        # Given
+        environ = dict(os.environ)
+        environ.pop(RESOURCES_CACHE_DIR_ENV, None)
+
+        # When
+        with patch.dict(os.environ, environ, clear=True):
+            with patch("snips_nlu.resources._RESOURCES", dict()), \
+                    patch("snips_nlu.resources._write_cache") as mocked_write:
+                load_resources("en")
+                get_gazetteers("en")
+
+        # Then
+        mocked_write.assert_not_called()
+
+    def test_should_remove_outdated_precompiled_resources(self):
+        # Given
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        outdated_file = "en_%s_%s.bin" % (STEMS, "0" * 40)
+        other_file = "fr_%s_%s.bin" % (STEMS, "0" * 40)
+        for filename in (outdated_file, other_file):
+            with io.open(os.path.join(cache_dir, filename), "wb") as f:
+                f.write(b"outdated")
+        environ = {RESOURCES_CACHE_DIR_ENV: cache_dir}
+
+        # When
+        with patch.dict(os.environ, environ):
+            with patch("snips_nlu.resources._RESOURCES", dict()):
+                load_resources("en", only=[STEMS])
+        cache_files = os.listdir(cache_dir)
+
+        # Then
+        self.assertNotIn(outdated_file, cache_files)
+        self.assertIn(other_file, cache_files)
+        self.assertEqual(2, len(cache_files))
+
+    def test_should_share_resources_while_they_are_used(self):
+        # Given
+        built_resources = []
+
+        def build_fn():
+            resource = {"hello"}
+            built_resources.append(id(resource))
+            return resource
+
+        # When
+        resource = get_shared_resource("en", "dummy", True, build_fn)
+        same_resource = get_shared_resource("en", "dummy", True, build_fn)
+        other_resource = get_shared_resource("en", "dummy", False, build_fn)
+        num_built_resources = len(built_resources)
+        del resource, same_resource, other_resource
+        get_shared_resource("en", "dummy", True, build_fn)
+
+        # Then
+        self.assertEqual(2, num_built_resources)
+        self.assertEqual(3, len(built_resources))
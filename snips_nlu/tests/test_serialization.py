@@ -0,0 +1,75 @@
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from snips_nlu.serialization import dump_binary, is_binary_file, load_binary
+from snips_nlu.tests.utils import SnipsTest
+
+
+class TestSerialization(SnipsTest):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "unit.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_should_store_float_arrays_as_buffers(self):
+        # Given
+        unit_dict = {
+            "unit_name": "dummy_unit",
+            "coeffs": [[0.5, -1.25], [2.0, 3.5]],
+            "intercept": [0.1, 0.2],
+            "offsets": [-1, 0, 1],
+            "vocab": {"hello": 0, "world": 1},
+            "intents": ["intent_1", None],
+            "empty": [],
+            "t_": 3.0
+        }
+
+        for mmap in [True, False]:
+            # When
+            dump_binary(unit_dict, self.path)
+            loaded_dict = load_binary(self.path, mmap=mmap)
+
+            # Then
+            self.assertIsInstance(loaded_dict["coeffs"], np.ndarray)
+            self.assertIsInstance(loaded_dict["intercept"], np.ndarray)
+            self.assertFalse(loaded_dict["coeffs"].flags.writeable)
+            loaded_dict["coeffs"] = loaded_dict["coeffs"].tolist()
+            loaded_dict["intercept"] = loaded_dict["intercept"].tolist()
+            self.assertDictEqual(unit_dict, loaded_dict)
+
+    def test_should_align_arrays(self):
+        # Given
+        unit_dict = {"arrays": [[1.0, 2.0, 3.0], [[4.0]], [5.0, 6.0]]}
+
+        # When
+        dump_binary(unit_dict, self.path)
+        loaded_dict = load_binary(self.path)
+
+        # Then
+        for array in loaded_dict["arrays"]:
+            self.assertEqual(0, array.ctypes.data % 64)
+        self.assertListEqual(unit_dict["arrays"],
+                             [a.tolist() for a in loaded_dict["arrays"]])
+
+    def test_should_detect_binary_files(self):
+        # Given
+        json_path = os.path.join(self.tmp_dir, "unit.json")
+        with io.open(json_path, "w", encoding="utf8") as f:
+            f.write("{}")
+
+        # When
+        dump_binary({"unit_name": "dummy_unit"}, self.path)
+
+        # Then
+        self.assertTrue(is_binary_file(self.path))
+        self.assertFalse(is_binary_file(json_path))
+        with self.assertRaises(ValueError):
+            load_binary(json_path)
@@ -0,0 +1,41 @@
+from __future__ import unicode_literals
+
+from snips_nlu.tests.utils import SnipsTest
+from snips_nlu.trie import TokenTrie
+
+
+class TestTokenTrie(SnipsTest):
+    def test_should_get_values(self):
+        # Given
+        trie = TokenTrie()
+        trie.add(["new", "york"], "city")
+        trie.add(["new", "york"], "state")
+        trie.add(["new", "york"], "city")
+        trie.add(["paris"], "city")
+
+        # When / Then
+        self.assertEqual(2, len(trie))
+        self.assertListEqual(["city", "state"], trie.get(["new", "york"]))
+        self.assertListEqual(["city"], trie.get(["paris"]))
+        self.assertIsNone(trie.get(["new"]))
+        self.assertIn(["paris"], trie)
+        self.assertNotIn(["new"], trie)
+
+    def test_should_find_all_matches(self):
+        # Given
+        trie = TokenTrie()
+        trie.add(["new", "york"], "city")
+        trie.add(["new", "york", "city"], "city")
+        trie.add(["york"], "city")
+        tokens = ["flights", "to", "new", "york", "city"]
+
+        # When
+        matches = trie.find_all(tokens)
+
+        # Then
+        expected_matches = [
+            (2, 4, ["city"]),
+            (2, 5, ["city"]),
+            (3, 4, ["city"])
+        ]
+        self.assertListEqual(expected_matches, matches)
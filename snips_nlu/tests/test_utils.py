@@ -1,7 +1,14 @@
+from __future__ import unicode_literals
+
+from builtins import range
+from threading import Thread
+
 from future.utils import iteritems
 
 from snips_nlu.tests.utils import SnipsTest
-from snips_nlu.utils import LimitedSizeDict, ranges_overlap
+from snips_nlu.utils import (
+    LimitedSizeDict, LRUCache, _CACHES, _CACHES_LOCK, configure_cache,
+    get_cache, get_caches_stats, ranges_overlap)
 
 
 class TestLimitedSizeDict(SnipsTest):
@@ -54,6 +61,131 @@ class TestLimitedSizeDict(SnipsTest):
         self.assertListEqual(items, sequence[size_limit:])
 
 
+class TestLRUCache(SnipsTest):
+    def tearDown(self):
+        with _CACHES_LOCK:
+            _CACHES.pop("test_cache", None)
+
+    def test_should_evict_least_recently_used_entries(self):
+        # Given
+        cache = LRUCache(capacity=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+
+        # When
+        cache.get("a")
+        cache.put("c", 3)
+
+        # Then
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(1, cache.evictions)
+
+    def test_should_expire_entries(self):
+        # Given
+        now = [0.0]
+        cache = LRUCache(capacity=10, ttl=5, timer=lambda: now[0])
+        cache.put("a", 1)
+
+        # When
+        value_before_expiration = cache.get("a")
+        now[0] = 6.0
+        value_after_expiration = cache.get("a")
+
+        # Then
+        self.assertEqual(1, value_before_expiration)
+        self.assertIsNone(value_after_expiration)
+        self.assertEqual(1, cache.evictions)
+
+    def test_should_count_hits_and_misses(self):
+        # Given
+        cache = LRUCache(capacity=10)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 42
+
+        # When
+        values = [cache.get_or_compute("a", compute) for _ in range(3)]
+        cache.get("b")
+
+        # Then
+        self.assertListEqual([42, 42, 42], values)
+        self.assertEqual(1, len(calls))
+        expected_stats = {
+            "capacity": 10,
+            "size": 1,
+            "hits": 2,
+            "misses": 2,
+            "evictions": 0
+        }
+        self.assertDictEqual(expected_stats, cache.stats())
+
+    def test_should_shrink_when_reducing_capacity(self):
+        # Given
+        cache = LRUCache(capacity=3)
+        for i in range(3):
+            cache.put(i, i)
+
+        # When
+        cache.capacity = 1
+
+        # Then
+        self.assertEqual(1, len(cache))
+        self.assertIn(2, cache)
+
+    def test_should_support_concurrent_accesses(self):
+        # Given
+        cache = LRUCache(capacity=50)
+
+        def worker(offset):
+            for i in range(1000):
+                key = (offset + i) % 100
+                cache.get_or_compute(key, lambda: key)
+
+        threads = [Thread(target=worker, args=(i,)) for i in range(8)]
+
+        # When
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Then
+        self.assertEqual(50, len(cache))
+        self.assertEqual(8000, cache.hits + cache.misses)
+
+    def test_should_configure_registered_caches(self):
+        # Given
+        cache = get_cache("test_cache")
+
+        # When
+        configure_cache("test_cache", capacity=3, ttl=10)
+
+        # Then
+        self.assertIs(cache, get_cache("test_cache"))
+        self.assertEqual(3, cache.capacity)
+        self.assertEqual(10, cache.ttl)
+        self.assertIn("test_cache", get_caches_stats())
+        self.assertIn("ngrams", get_caches_stats())
+
+    def test_should_remove_ttl_of_registered_cache(self):
+        # Given
+        cache = get_cache("test_cache", ttl=10)
+
+        # When
+        configure_cache("test_cache", capacity=3)
+        ttl = cache.ttl
+        configure_cache("test_cache", ttl=None)
+
+        # Then
+        self.assertEqual(10, ttl)
+        self.assertIsNone(cache.ttl)
+        self.assertEqual(3, cache.capacity)
+
+
 class TestUtils(SnipsTest):
     def test_ranges_overlap(self):
         # Given
@@ -0,0 +1,75 @@
+from __future__ import unicode_literals
+
+from builtins import object, range
+
+_VALUES = None  # tokens are strings, hence this key never collides
+
+
+class TokenTrie(object):
+    """Trie of token sequences
+
+    A :class:`TokenTrie` maps sequences of tokens (such as tokenized entity
+    values) to the list of values which were added with them. It allows to
+    find all the known sequences occurring in a tokenized input in a single
+    scan, instead of enumerating and probing all the n-grams of the input.
+    """
+
+    def __init__(self):
+        self.root = dict()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, tokens, value=None):
+        """Adds the sequence of *tokens*, associated with *value*"""
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, dict())
+        values = node.get(_VALUES)
+        if values is None:
+            values = node[_VALUES] = []
+            self._size += 1
+        if value not in values:
+            values.append(value)
+        return self
+
+    def get(self, tokens, default=None):
+        """Returns the values associated with the sequence of *tokens*"""
+        node = self.root
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                return default
+        return node.get(_VALUES, default)
+
+    def __contains__(self, tokens):
+        return self.get(tokens) is not None
+
+    def prefix_matches(self, tokens, start=0):
+        """Yields the *(end, values)* pairs of all the known sequences equal
+        to *tokens[start:end]*, by increasing *end*"""
+        node = self.root
+        for end in range(start, len(tokens)):
+            node = node.get(tokens[end])
+            if node is None:
+                return
+            values = node.get(_VALUES)
+            if values is not None:
+                yield end + 1, values
+
+    def find_all(self, tokens):
+        """Returns all the *(start, end, values)* triplets of known sequences
+        occurring in *tokens*"""
+        return [(start, end, values) for start in range(len(tokens))
+                for end, values in self.prefix_matches(tokens, start)]
+
+    @staticmethod
+    def child(node, token):
+        """Returns the child of *node* reached with *token*, or *None*"""
+        return node.get(token)
+
+    @staticmethod
+    def node_values(node):
+        """Returns the values of the sequence ending at *node*, or *None*"""
+        return node.get(_VALUES)
@@ -3,10 +3,13 @@ from __future__ import unicode_literals
 import errno
 import numbers
 import os
+import threading
+import time
 from builtins import object
 from collections import OrderedDict, namedtuple, Mapping
 
 import numpy as np
+from future.utils import iteritems
 
 from snips_nlu.constants import (INTENTS, UTTERANCES, DATA, SLOT_NAME, ENTITY,
                                  RESOURCES_PATH, END, START)
@@ -112,6 +115,175 @@ class LimitedSizeDict(OrderedDict):
         return super(LimitedSizeDict, self).__eq__(other)
 
 
+class LRUCache(object):
+    """Thread-safe bounded cache with a least recently used eviction policy
+
+    Args:
+        capacity (int): Maximum number of entries of the cache
+        ttl (float, optional): If defined, entries expire *ttl* seconds after
+            being stored
+        timer (callable, optional): Function returning the current time in
+            seconds, used to expire the entries (default=time.time)
+
+    Attributes:
+        hits (int): Number of lookups which found a valid entry
+        misses (int): Number of lookups which did not find a valid entry
+        evictions (int): Number of entries evicted, either because the cache
+            was full or because they expired
+    """
+
+    _MISSING = object()
+
+    def __init__(self, capacity, ttl=None, timer=time.time):
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._capacity = None
+        self.capacity = capacity
+        self.ttl = ttl
+        self.timer = timer
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, value):
+        if value < 0:
+            raise ValueError("Cache capacity must be positive but received: "
+                             "%s" % value)
+        with self._lock:
+            self._capacity = value
+            self._evict()
+
+    def get(self, key, default=None):
+        """Returns the value stored for *key*, or *default*"""
+        with self._lock:
+            value = self._get(key)
+            if value is self._MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Stores *value* for *key*"""
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, self.timer())
+            self._evict()
+
+    def get_or_compute(self, key, compute_fn):
+        """Returns the value stored for *key*, after having computed and
+        stored it with *compute_fn* if needed
+
+        The value is computed outside of the lock so that slow computations
+        do not block the other threads.
+        """
+        with self._lock:
+            value = self._get(key)
+            if value is not self._MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = compute_fn()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        """Removes all the entries, counters are kept"""
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """Returns the counters of the cache as a dict"""
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._get(key) is not self._MISSING
+
+    def __len__(self):
+        return len(self._data)
+
+    def _get(self, key):
+        item = self._data.pop(key, None)
+        if item is None:
+            return self._MISSING
+        value, timestamp = item
+        if self.ttl is not None and self.timer() - timestamp > self.ttl:
+            self.evictions += 1
+            return self._MISSING
+        # Re-insert the item to mark it as the most recently used
+        self._data[key] = item
+        return value
+
+    def _evict(self):
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+
+_CACHES = dict()
+_CACHES_LOCK = threading.Lock()
+
+DEFAULT_CACHE_CAPACITY = 1000
+
+
+def get_cache(name, capacity=DEFAULT_CACHE_CAPACITY, ttl=None):
+    """Returns the shared :class:`LRUCache` registered as *name*, after having
+    created it with *capacity* and *ttl* if it does not exist yet"""
+    with _CACHES_LOCK:
+        if name not in _CACHES:
+            _CACHES[name] = LRUCache(capacity, ttl)
+        return _CACHES[name]
+
+
+_UNCHANGED = object()
+
+
+def configure_cache(name, capacity=None, ttl=_UNCHANGED):
+    """Sets the *capacity* and/or the *ttl* of the cache registered as
+    *name*, which is created if needed
+
+    Args:
+        name (str): Name of the cache
+        capacity (int, optional): New capacity of the cache, which is left
+            unchanged when *None*
+        ttl (float, optional): New time to live of the cache entries, in
+            seconds, *None* meaning that entries never expire. The ttl is left
+            unchanged when it is not passed.
+    """
+    cache = get_cache(name)
+    if capacity is not None:
+        cache.capacity = capacity
+    if ttl is not _UNCHANGED:
+        cache.ttl = ttl
+    return cache
+
+
+def get_caches_stats():
+    """Returns the counters of all the registered caches, by name"""
+    with _CACHES_LOCK:
+        caches = dict(_CACHES)
+    return {name: cache.stats() for name, cache in iteritems(caches)}
+
+
 class UnupdatableDict(dict):
     def __setitem__(self, key, value):
         if key in self:
@@ -8,4 +8,4 @@ VERSION_FILE_NAME = "__version__"
 with io.open(os.path.join(PACKAGE_PATH, VERSION_FILE_NAME)) as f:
     __version__ = f.readline().strip()
 
-__model_version__ = "0.13.0"
+__model_version__ = "0.14.0"